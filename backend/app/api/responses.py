@@ -0,0 +1,22 @@
+"""
+Response classes for the FastAPI backend.
+"""
+
+from typing import Any
+
+from fastapi.responses import JSONResponse
+
+from app.core.serialization import dumps
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSON response rendered with app.core.serialization.dumps.
+
+    Accepts NumPy arrays in the payload and skips jsonable_encoder.
+    Subclasses JSONResponse so routes keep their response_model schemas
+    in the OpenAPI docs.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -2,83 +2,46 @@
 API routes for telemetry runs.
 """
 
-import math
 from pathlib import Path
 from typing import Optional
 
 import numpy as np
-from fastapi import APIRouter, HTTPException, Query
-
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+
+from app.api.responses import FastJSONResponse
+from app.core.compression import accepts_gzip, gzip_bytes
+from app.core.payloads import (
+    iter_run_records,
+    masked_playback_columns,
+    playback_payload,
+    run_data_payload,
+)
+from app.core.serialization import ndjson_lines
 from app.api.schemas import (
     RunSummaryResponse,
     RunMetadataResponse,
     RunDataResponse,
     RunReloadRequest,
-    OriginResponse,
     SetFolderRequest,
     FolderInfoResponse,
-    PlaybackDataResponse,
-    PlaybackSampleResponse,
+    PlaybackDataColumnarResponse,
     PlaybackRangeRequest,
 )
 from app.services.repository import get_repository
-from app.models.telemetry import TelemetryRun
 
 
 router = APIRouter(prefix="/runs", tags=["runs"])
 
 
-def _nan_to_none(value: float) -> Optional[float]:
-    """Convert NaN to None for JSON serialization."""
-    if math.isnan(value):
-        return None
-    return value
-
-
-def _clean_array(arr: np.ndarray) -> list[float]:
-    """Convert numpy array to list, replacing NaN with None."""
-    return [None if math.isnan(x) else float(x) for x in arr]
-
-def _clean_validity(arr: np.ndarray) -> list[bool]:
-    """Convert numpy bool array to list."""
-    return [bool(x) for x in arr]
-
-
-def _build_channel_info(run: TelemetryRun) -> dict:
-    """Build channel metadata response."""
-    result = {}
-    for key, info in run.channel_info.items():
-        result[key] = {
-            "unit": info.unit,
-            "provenance": info.provenance.value,
-            "frame": info.frame.value if info.frame is not None else None,
-        }
-    return result
-
-
-def _build_metadata_response(run: TelemetryRun) -> RunMetadataResponse:
-    """Build metadata response from TelemetryRun."""
-    return RunMetadataResponse(
-        id=run.metadata.id,
-        name=run.metadata.name,
-        source_file=str(run.metadata.source_file),
-        recorded_at=run.metadata.recorded_at.isoformat() if run.metadata.recorded_at else None,
-        duration_s=run.metadata.duration_s,
-        sample_count=run.metadata.sample_count,
-        sample_rate_hz=run.metadata.sample_rate_hz,
-        has_gps=run.metadata.has_gps,
-        has_imu=run.metadata.has_imu,
-        has_speed=run.metadata.has_speed,
-        canonical_version=run.metadata.canonical_version,
-        origin=OriginResponse(
-            lat=run.origin.lat,
-            lon=run.origin.lon,
-            alt=run.origin.alt,
-            manual_override=run.origin.manual_override,
-        ),
-        bounding_box=run.get_bounding_box(),
-        time_range=run.get_time_range(),
-    )
+def _payload_response(body: bytes, gzipped: bool) -> Response:
+    """Wrap cached payload bytes, marking pre-compressed bodies."""
+    # Both variants vary on Accept-Encoding so shared caches keep them apart
+    headers = {"Vary": "Accept-Encoding"}
+    if gzipped:
+        headers["Content-Encoding"] = "gzip"
+    return Response(content=body, media_type="application/json", headers=headers)
 
 
 @router.get("", response_model=list[RunSummaryResponse])
@@ -89,21 +52,11 @@ async def list_runs():
     Returns summaries sorted by recording date (newest first).
     """
     repo = get_repository()
-    summaries = repo.list_runs()
-    
-    return [
-        RunSummaryResponse(
-            id=s.id,
-            name=s.name,
-            source_file=s.source_file,
-            recorded_at=s.recorded_at,
-            duration_s=s.duration_s,
-            sample_count=s.sample_count,
-            has_gps=s.has_gps,
-            has_imu=s.has_imu,
-        )
-        for s in summaries
-    ]
+    
+    # Serialized once per scan/reload; fields mirror RunSummaryResponse.
+    # A cold listing parses files, so keep it off the event loop
+    content = await run_in_threadpool(repo.list_runs_json)
+    return Response(content=content, media_type="application/json")
 
 
 @router.get("/{run_id}", response_model=RunMetadataResponse)
@@ -117,37 +70,76 @@ async def get_run_metadata(run_id: str):
     if run is None:
         raise HTTPException(status_code=404, detail=f"Run not found: {run_id}")
     
-    return _build_metadata_response(run)
+    return FastJSONResponse(run.metadata_dict())
+
+
+ENCODING_QUERY = Query(
+    "json",
+    pattern=r"^(json|b64\.f32le)$",
+    description=(
+        "'json' for numeric arrays, 'b64.f32le' for base64 little-endian float32 "
+        "channels (float64 time axis, bit-packed validity)"
+    ),
+)
+
+PLAYBACK_ENCODING_QUERY = Query(
+    "json",
+    pattern=r"^(json|b64\.f32le|q\.i16)$",
+    description=(
+        "'json' for numeric arrays, 'b64.f32le' for base64 float32 channels, "
+        "'q.i16' for int16 channels with per-channel scale/offset"
+    ),
+)
 
 
 @router.get("/{run_id}/data", response_model=RunDataResponse)
-async def get_run_data(run_id: str):
+async def get_run_data(
+    request: Request,
+    run_id: str,
+    encoding: str = ENCODING_QUERY,
+    layout: str = Query(
+        "json",
+        alias="format",
+        pattern="^(json|ndjson)$",
+        description="'json' for one document, 'ndjson' to stream one line per array",
+    ),
+):
     """
     Get full telemetry data for a run.
     
     Warning: This can be a large response for high-sample-rate runs.
-    Consider using /playback endpoint for visualization.
+    Consider using /playback endpoint for visualization, or format=ndjson
+    to stream the arrays as newline-delimited JSON records.
     """
     repo = get_repository()
+    
+    if layout == "ndjson":
+        run = repo.get_run(run_id)
+        if run is None:
+            raise HTTPException(status_code=404, detail=f"Run not found: {run_id}")
+        return StreamingResponse(
+            ndjson_lines(iter_run_records(run, encoding)),
+            media_type="application/x-ndjson",
+        )
+    
+    # Gzip-capable clients get the cached pre-compressed body
+    gzip_ok = accepts_gzip(request.headers.get("accept-encoding", ""))
+    variant = f"{encoding}.gz" if gzip_ok else encoding
+    
+    cached = repo.payload_cache.get(run_id, variant)
+    if cached is not None:
+        return _payload_response(cached, gzip_ok)
+    
     run = repo.get_run(run_id)
     
     if run is None:
         raise HTTPException(status_code=404, detail=f"Run not found: {run_id}")
     
-    return RunDataResponse(
-        metadata=_build_metadata_response(run),
-        timestamps=run.timestamps.tolist(),
-        x=_clean_array(run.x),
-        y=_clean_array(run.y),
-        speed=_clean_array(run.speed),
-        heading=_clean_array(run.heading),
-        ax=_clean_array(run.ax_body),
-        ay=_clean_array(run.ay_body),
-        yaw_rate=_clean_array(run.yaw_rate),
-        total_g=_clean_array(run.total_g),
-        validity={k: _clean_validity(v) for k, v in run.validity.items()},
-        channels=_build_channel_info(run),
-    )
+    response = FastJSONResponse(run_data_payload(run, encoding))
+    
+    body = gzip_bytes(response.body) if gzip_ok else response.body
+    repo.payload_cache.put(run_id, body, variant)
+    return _payload_response(body, gzip_ok)
 
 
 @router.post("/{run_id}/reload", response_model=RunMetadataResponse)
@@ -173,22 +165,37 @@ async def reload_run(run_id: str, request: RunReloadRequest):
     if run is None:
         raise HTTPException(status_code=500, detail="Failed to reload run")
     
-    return _build_metadata_response(run)
+    return FastJSONResponse(run.metadata_dict())
 
 
-@router.get("/{run_id}/playback", response_model=PlaybackDataResponse)
+@router.get("/{run_id}/playback", response_model=PlaybackDataColumnarResponse)
 async def get_playback_data(
     run_id: str,
     start_time: float = Query(0.0, description="Start time in seconds"),
     end_time: Optional[float] = Query(None, description="End time in seconds (defaults to run end)"),
     target_rate: float = Query(10.0, ge=1.0, le=100.0, description="Target sample rate for playback"),
+    layout: str = Query(
+        "columns",
+        alias="format",
+        pattern="^(columns|rows)$",
+        description="'columns' for parallel arrays, 'rows' for a list of sample objects",
+    ),
+    encoding: str = PLAYBACK_ENCODING_QUERY,
 ):
     """
     Get downsampled playback data for a run.
     
     This endpoint returns data suitable for smooth playback visualization,
     downsampled to the target rate to reduce data transfer.
+    
+    The default columnar layout returns one array per channel; pass
+    format=rows for the legacy list of sample objects. Columns can be
+    shipped as base64 float32 buffers with encoding=b64.f32le, or
+    quantized to int16 with encoding=q.i16.
     """
+    if layout == "rows" and encoding != "json":
+        raise HTTPException(status_code=400, detail="Binary encodings require format=columns")
+    
     repo = get_repository()
     run = repo.get_run(run_id)
     
@@ -214,30 +221,15 @@ async def get_playback_data(
     # Generate sample times
     sample_times = np.linspace(start_time, end_time, n_samples)
     
-    # Get interpolated samples
-    samples = []
-    for t in sample_times:
-        sample = run.sample_at_time(t)
-        valid = sample.get("valid", {})
-        samples.append(PlaybackSampleResponse(
-            time=sample['time'],
-            x=_nan_to_none(sample['x']) if valid.get("x", False) else 0.0,
-            y=_nan_to_none(sample['y']) if valid.get("y", False) else 0.0,
-            speed=_nan_to_none(sample['speed']) if valid.get("speed", False) else 0.0,
-            heading=_nan_to_none(sample['heading']) if valid.get("heading", False) else 0.0,
-            ax=_nan_to_none(sample['ax']) if valid.get("ax", False) else 0.0,
-            ay=_nan_to_none(sample['ay']) if valid.get("ay", False) else 0.0,
-            yaw_rate=_nan_to_none(sample['yaw_rate']) if valid.get("yaw_rate", False) else 0.0,
-            total_g=_nan_to_none(sample['total_g']) if valid.get("total_g", False) else 0.0,
-            valid={k: bool(v) for k, v in valid.items()},
-        ))
+    # Interpolate all sample times in one vectorized pass
+    batch = run.sample_batch(sample_times)
     
-    return PlaybackDataResponse(
-        run_id=run_id,
-        duration_s=duration,
-        sample_rate_hz=target_rate,
-        samples=samples,
-    )
+    # Invalid samples are reported as 0.0 in every float layout; the masked
+    # columns are pooled, so the body is encoded before they are released
+    with masked_playback_columns(batch) as columns:
+        return FastJSONResponse(playback_payload(
+            run_id, duration, target_rate, layout, encoding, batch, columns
+        ))
 
 
 # ============================================================================
@@ -254,7 +246,7 @@ async def get_folder_info():
     
     return FolderInfoResponse(
         path=str(repo.data_folder) if repo.data_folder else None,
-        run_count=len(repo._index),
+        run_count=repo.run_count,
     )
 
 
@@ -115,6 +115,25 @@ class PlaybackDataResponse(BaseModel):
     samples: list[PlaybackSampleResponse]
 
 
+class PlaybackDataColumnarResponse(BaseModel):
+    """Playback data for a run as parallel per-channel arrays."""
+    run_id: str
+    duration_s: float
+    sample_rate_hz: float
+    format: str = "columns"
+    
+    time: list[float]
+    x: list[float]
+    y: list[float]
+    speed: list[float]
+    heading: list[float]
+    ax: list[float]
+    ay: list[float]
+    yaw_rate: list[float]
+    total_g: list[float]
+    valid: dict[str, list[bool]]
+
+
 class PlaybackRangeRequest(BaseModel):
     """Request for playback data in a time range."""
     start_time: float = 0.0
@@ -0,0 +1,60 @@
+"""
+Reusable NumPy scratch buffers.
+
+Request handlers that build same-sized temporaries on every call (e.g.
+playback at a fixed rate) borrow them from a pool instead of allocating.
+Free lists are thread-local, so a buffer is never shared between threads.
+"""
+
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Iterator
+
+import numpy as np
+
+
+class BufferPool:
+    """Thread-local free lists of NumPy arrays keyed by shape and dtype."""
+
+    def __init__(self, max_per_key: int = 4, max_keys: int = 32):
+        self.max_per_key = max_per_key
+        self.max_keys = max_keys
+        self._local = threading.local()
+
+    def _free_lists(self) -> OrderedDict:
+        free = getattr(self._local, "free", None)
+        if free is None:
+            free = self._local.free = OrderedDict()
+        return free
+
+    def acquire(self, shape: tuple[int, ...], dtype=np.float64) -> np.ndarray:
+        """Return an uninitialized array, reusing a released one if possible."""
+        key = (tuple(shape), np.dtype(dtype).str)
+        free = self._free_lists()
+        stack = free.get(key)
+        if stack:
+            free.move_to_end(key)
+            return stack.pop()
+        return np.empty(shape, dtype=dtype)
+
+    def release(self, arr: np.ndarray) -> None:
+        """Return an array to this thread's pool; it must not be used afterwards."""
+        key = (arr.shape, arr.dtype.str)
+        free = self._free_lists()
+        stack = free.setdefault(key, [])
+        free.move_to_end(key)
+        if len(stack) < self.max_per_key:
+            stack.append(arr)
+        # Drop the least recently used shapes beyond the bound
+        while len(free) > self.max_keys:
+            free.popitem(last=False)
+
+    @contextmanager
+    def borrow(self, shape: tuple[int, ...], dtype=np.float64) -> Iterator[np.ndarray]:
+        """Context manager pairing acquire and release."""
+        arr = self.acquire(shape, dtype)
+        try:
+            yield arr
+        finally:
+            self.release(arr)
@@ -0,0 +1,49 @@
+"""
+HTTP response compression settings shared by the FastAPI and Flask backends.
+"""
+
+import gzip
+
+
+# Responses smaller than this are sent uncompressed
+MIN_COMPRESS_SIZE = 1024
+
+# Fast level: numeric JSON compresses well even at low effort
+GZIP_LEVEL = 4
+
+
+def accepts_gzip(accept_encoding: str) -> bool:
+    """
+    Whether an Accept-Encoding header value allows gzip.
+
+    An explicit gzip entry decides; otherwise a "*" entry does. Either is
+    refused by q=0 (e.g. "gzip;q=0").
+    """
+    wildcard = False
+    for coding in (accept_encoding or "").lower().split(","):
+        name, *params = coding.split(";")
+        name = name.strip()
+        if name not in ("gzip", "x-gzip", "*"):
+            continue
+        allowed = _qvalue(params) > 0
+        if name != "*":
+            return allowed
+        wildcard = allowed
+    return wildcard
+
+
+def _qvalue(params: list[str]) -> float:
+    """The q parameter of one Accept-Encoding entry (1 when absent or malformed)."""
+    for param in params:
+        key, _, value = param.partition("=")
+        if key.strip() == "q":
+            try:
+                return float(value)
+            except ValueError:
+                return 1.0
+    return 1.0
+
+
+def gzip_bytes(body: bytes) -> bytes:
+    """Compress a response body at the shared gzip level."""
+    return gzip.compress(body, compresslevel=GZIP_LEVEL)
@@ -0,0 +1,27 @@
+"""
+Optional Numba JIT support.
+
+Exposes njit/prange that compile with Numba when it is installed and fall
+back to plain Python otherwise. Callers check HAVE_NUMBA to pick a NumPy
+implementation instead of running the undecorated loops.
+"""
+
+try:
+    import numba
+except ImportError:  # optional dependency
+    numba = None
+
+
+HAVE_NUMBA = numba is not None
+
+
+def njit(*args, **kwargs):
+    """numba.njit when available, otherwise an identity decorator."""
+    if numba is not None:
+        return numba.njit(*args, **kwargs)
+    if len(args) == 1 and callable(args[0]) and not kwargs:
+        return args[0]
+    return lambda fn: fn
+
+
+prange = numba.prange if numba is not None else range
@@ -0,0 +1,184 @@
+"""
+Response payload builders shared by the FastAPI and Flask backends.
+
+Each function returns plain dicts (NumPy arrays allowed) for
+app.core.serialization to encode; the apps only wrap the result in their
+own Response type.
+"""
+
+from contextlib import contextmanager
+from typing import Iterator
+
+import numpy as np
+
+from app.core.buffers import BufferPool
+from app.core.serialization import B64_F32LE, Q_I16, b64_bits, b64_f32, b64_f64, quantize_i16
+from app.models.telemetry import CHANNEL_DTYPE, SAMPLE_CHANNELS, TelemetryRun
+
+
+# Scratch buffers for masked playback columns
+_PLAYBACK_BUFFERS = BufferPool()
+
+
+def build_channel_info(run: TelemetryRun) -> dict:
+    """Build channel metadata, keyed by channel name."""
+    result = {}
+    for key, info in run.channel_info.items():
+        result[key] = {
+            "unit": info.unit,
+            "provenance": info.provenance.value,
+            "frame": info.frame.value if info.frame is not None else None,
+        }
+    return result
+
+
+def run_channels(run: TelemetryRun) -> dict:
+    """Per-sample channel arrays served by /data, keyed by response name."""
+    return {
+        "x": run.x,
+        "y": run.y,
+        "speed": run.speed,
+        "heading": run.heading,
+        "ax": run.ax_body,
+        "ay": run.ay_body,
+        "yaw_rate": run.yaw_rate,
+        "total_g": run.total_g,
+    }
+
+
+def run_data_payload(run: TelemetryRun, encoding: str) -> dict:
+    """Build the single-document /data payload."""
+    channels = run_channels(run)
+
+    if encoding == B64_F32LE:
+        return {
+            "metadata": run.metadata_dict(),
+            "encoding": B64_F32LE,
+            "timestamps": b64_f64(run.timestamps),
+            **{key: b64_f32(arr) for key, arr in channels.items()},
+            "validity": {key: b64_bits(arr) for key, arr in run.validity.items()},
+            "channels": build_channel_info(run),
+        }
+
+    # Arrays are handed to the serializer as-is (NaN -> null)
+    return {
+        "metadata": run.metadata_dict(),
+        "timestamps": run.timestamps,
+        **channels,
+        "validity": run.validity,
+        "channels": build_channel_info(run),
+    }
+
+
+def iter_run_records(run: TelemetryRun, encoding: str):
+    """
+    Yield /data as NDJSON records: a header, then one line per array.
+
+    Only one channel is encoded at a time, so peak memory is a single
+    channel rather than the whole payload.
+    """
+    binary = encoding == B64_F32LE
+    channels = run_channels(run)
+    yield {
+        "metadata": run.metadata_dict(),
+        "encoding": encoding,
+        "channels": build_channel_info(run),
+    }
+    yield {"channel": "timestamps", "data": b64_f64(run.timestamps) if binary else run.timestamps}
+    for key, arr in channels.items():
+        yield {"channel": key, "data": b64_f32(arr) if binary else arr}
+    for key, mask in run.validity.items():
+        yield {"validity": key, "data": b64_bits(mask) if binary else mask}
+
+
+@contextmanager
+def masked_playback_columns(batch: dict) -> Iterator[dict]:
+    """
+    Yield the sampled channels with invalid samples set to 0.0.
+
+    The columns are rows of a pooled buffer, reused once the block exits,
+    so the response body must be encoded inside it. They are narrowed to
+    the storage dtype (float32), so JSON carries the shortest float32 repr
+    rather than float64 digits no channel holds.
+    """
+    valid = batch["valid"]
+    with _PLAYBACK_BUFFERS.borrow(
+        (len(SAMPLE_CHANNELS), len(batch["time"])), CHANNEL_DTYPE
+    ) as masked:
+        columns = {}
+        for row, key in zip(masked, SAMPLE_CHANNELS):
+            row.fill(0.0)
+            np.copyto(row, batch[key], where=valid[key])
+            columns[key] = row
+        yield columns
+
+
+def playback_payload(
+    run_id: str,
+    duration: float,
+    target_rate: float,
+    layout: str,
+    encoding: str,
+    batch: dict,
+    columns: dict,
+) -> dict:
+    """Build sampled playback data in the requested layout and encoding."""
+    valid = batch["valid"]
+
+    if layout == "columns" and encoding == Q_I16:
+        return {
+            "run_id": run_id,
+            "duration_s": duration,
+            "sample_rate_hz": target_rate,
+            "format": "columns",
+            "encoding": Q_I16,
+            "length": len(batch["time"]),
+            "time": b64_f64(batch["time"]),
+            **{key: quantize_i16(batch[key]) for key in SAMPLE_CHANNELS},
+            "valid": {key: b64_bits(valid[key]) for key in SAMPLE_CHANNELS},
+        }
+
+    if layout == "columns" and encoding == B64_F32LE:
+        return {
+            "run_id": run_id,
+            "duration_s": duration,
+            "sample_rate_hz": target_rate,
+            "format": "columns",
+            "encoding": B64_F32LE,
+            "length": len(batch["time"]),
+            "time": b64_f64(batch["time"]),
+            **{key: b64_f32(columns[key]) for key in SAMPLE_CHANNELS},
+            "valid": {key: b64_bits(valid[key]) for key in SAMPLE_CHANNELS},
+        }
+
+    if layout == "columns":
+        return {
+            "run_id": run_id,
+            "duration_s": duration,
+            "sample_rate_hz": target_rate,
+            "format": "columns",
+            "time": batch["time"],
+            **columns,
+            "valid": valid,
+        }
+
+    # Columns arrive already masked (no NaN left), so stacking straight to
+    # float64 (N, channels) materializes values with a single tolist call
+    values = np.stack([columns[key] for key in SAMPLE_CHANNELS], axis=1, dtype=np.float64).tolist()
+    flags = np.stack([valid[key] for key in SAMPLE_CHANNELS], axis=1).tolist()
+
+    samples = [
+        {
+            "time": t,
+            **dict(zip(SAMPLE_CHANNELS, row)),
+            "valid": dict(zip(SAMPLE_CHANNELS, row_valid)),
+        }
+        for t, row, row_valid in zip(batch["time"].tolist(), values, flags)
+    ]
+
+    return {
+        "run_id": run_id,
+        "duration_s": duration,
+        "sample_rate_hz": target_rate,
+        "samples": samples,
+    }
@@ -0,0 +1,139 @@
+"""
+JSON serialization helpers shared by the FastAPI and Flask backends.
+
+Uses orjson when it is installed (native NumPy serialization, NaN -> null)
+and falls back to the stdlib json module otherwise.
+"""
+
+import base64
+import json
+from datetime import date, datetime
+from enum import Enum
+from pathlib import Path
+from typing import Any, Iterable, Iterator
+
+import numpy as np
+from pydantic import BaseModel
+
+try:
+    import orjson
+except ImportError:  # optional dependency
+    orjson = None
+
+
+# Array encodings accepted by the data endpoints ("encoding" query param)
+JSON_ENCODING = "json"
+B64_F32LE = "b64.f32le"
+Q_I16 = "q.i16"
+ARRAY_ENCODINGS = (JSON_ENCODING, B64_F32LE)
+# Lossy quantization is only offered where values are for display
+PLAYBACK_ENCODINGS = ARRAY_ENCODINGS + (Q_I16,)
+
+# int16 code reserved for missing values in quantized channels
+I16_SENTINEL = -32768
+
+
+if orjson is not None:
+    _ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+else:
+    _ORJSON_OPTIONS = 0
+
+
+def clean_array(arr: np.ndarray) -> list:
+    """Convert numpy array to list, replacing NaN with None."""
+    # Widened exactly; shortest float32 reprs are left to orjson, which
+    # emits them natively for float32 arrays
+    values = np.asarray(arr).astype(np.float64, copy=False)
+    nan_mask = np.isnan(values)
+    if not nan_mask.any():
+        return values.tolist()
+    # Substitute None in C via an object array, then materialize once
+    cleaned = values.astype(object)
+    cleaned[nan_mask] = None
+    return cleaned.tolist()
+
+
+def clean_validity(arr: np.ndarray) -> list:
+    """Convert numpy bool array to list."""
+    return np.asarray(arr).astype(bool, copy=False).tolist()
+
+
+def b64_f32(arr: np.ndarray) -> str:
+    """Encode an array as base64 little-endian float32 (NaN preserved)."""
+    return base64.b64encode(np.ascontiguousarray(arr, dtype="<f4").tobytes()).decode("ascii")
+
+
+def b64_f64(arr: np.ndarray) -> str:
+    """Encode an array as base64 little-endian float64 (used for time axes)."""
+    return base64.b64encode(np.ascontiguousarray(arr, dtype="<f8").tobytes()).decode("ascii")
+
+
+def b64_bits(arr: np.ndarray) -> str:
+    """Encode a bool array as base64 bits, least significant bit first."""
+    packed = np.packbits(np.asarray(arr, dtype=np.bool_), bitorder="little")
+    return base64.b64encode(packed.tobytes()).decode("ascii")
+
+
+def quantize_i16(arr: np.ndarray) -> dict:
+    """
+    Quantize an array to int16 with a per-array scale and offset.
+
+    Decode with value = data * scale + offset. NaN maps to I16_SENTINEL;
+    finite values use the remaining 65535 codes across [min, max].
+    """
+    values = np.asarray(arr, dtype=np.float64)
+    finite = np.isfinite(values)
+    if finite.any():
+        lo = float(values[finite].min())
+        hi = float(values[finite].max())
+    else:
+        lo = hi = 0.0
+    offset = (lo + hi) / 2
+    scale = (hi - lo) / 65534 if hi > lo else 1.0
+
+    codes = np.full(values.shape, I16_SENTINEL, dtype="<i2")
+    codes[finite] = np.round((values[finite] - offset) / scale)
+    return {
+        "scale": scale,
+        "offset": offset,
+        "data": base64.b64encode(codes.tobytes()).decode("ascii"),
+    }
+
+
+def _default(obj: Any) -> Any:
+    """Fallback encoder for types neither orjson nor json handle natively."""
+    if isinstance(obj, np.ndarray):
+        if obj.dtype == np.bool_:
+            return clean_validity(obj)
+        if np.issubdtype(obj.dtype, np.floating):
+            return clean_array(obj)
+        return obj.tolist()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    if isinstance(obj, Path):
+        return str(obj)
+    if isinstance(obj, Enum):
+        return obj.value
+    if isinstance(obj, BaseModel):
+        # Response models passed straight to dumps / FastJSONResponse
+        return obj.model_dump(mode="json")
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(payload: Any) -> bytes:
+    """
+    Serialize a payload to JSON bytes.
+
+    NumPy arrays may be passed directly; NaN values are emitted as null.
+    """
+    if orjson is not None:
+        return orjson.dumps(payload, default=_default, option=_ORJSON_OPTIONS)
+    return json.dumps(payload, default=_default, separators=(",", ":")).encode("utf-8")
+
+
+def ndjson_lines(records: Iterable[Any]) -> Iterator[bytes]:
+    """Serialize records lazily as newline-delimited JSON."""
+    for record in records:
+        yield dumps(record) + b"\n"
@@ -7,17 +7,35 @@ Same API structure, different framework.
 
 import json
 import logging
-import math
 from pathlib import Path
 from typing import Optional
 
 import numpy as np
-from flask import Flask, jsonify, request
-
-from app.models.telemetry import TelemetryRun, RunSummary
+from flask import Flask, Response, jsonify, request
+from flask.json.provider import DefaultJSONProvider
+
+from app.core.compression import GZIP_LEVEL, MIN_COMPRESS_SIZE, accepts_gzip, gzip_bytes
+from app.core.payloads import (
+    iter_run_records,
+    masked_playback_columns,
+    playback_payload,
+    run_data_payload,
+)
+from app.core.serialization import (
+    ARRAY_ENCODINGS,
+    PLAYBACK_ENCODINGS,
+    dumps,
+    ndjson_lines,
+)
+from app.models.telemetry import RunSummary
 from app.services.repository import RunRepository, init_repository, get_repository
 from app.services.csv_parser import parse_trackaddict_csv
 
+try:
+    from flask_compress import Compress
+except ImportError:  # optional dependency
+    Compress = None
+
 
 # Configure logging
 logging.basicConfig(
@@ -27,66 +45,54 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+class FastJSONProvider(DefaultJSONProvider):
+    """
+    Flask JSON provider backed by app.core.serialization.dumps.
+
+    Makes jsonify encode with orjson when it is installed (NumPy arrays
+    walked in C, NaN -> null), matching the FastAPI backend's
+    FastJSONResponse. Parsing request bodies is left to the default.
+    """
+
+    def dumps(self, obj, **kwargs) -> str:
+        return dumps(obj).decode("utf-8")
+
+    def response(self, *args, **kwargs) -> Response:
+        # Skip the bytes -> str -> bytes round trip of the base class
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(dumps(obj), mimetype="application/json")
+
+
 # Create Flask app
 app = Flask(__name__)
+app.json = FastJSONProvider(app)
+
+# Compress large responses when flask-compress is installed (gzip or
+# brotli); pre-compressed /data bodies carry Content-Encoding and are skipped
+if Compress is not None:
+    app.config.update(
+        COMPRESS_MIN_SIZE=MIN_COMPRESS_SIZE,
+        COMPRESS_LEVEL=GZIP_LEVEL,
+    )
+    Compress(app)
 
 
 # Default data folder
 DEFAULT_DATA_FOLDER = Path("./data/runs")
 
+def _json_response(payload) -> Response:
+    """Serialize payload (NumPy arrays allowed) into a JSON response."""
+    return Response(dumps(payload), mimetype="application/json")
+
 
-def _nan_to_none(value: float) -> Optional[float]:
-    """Convert NaN to None for JSON serialization."""
-    if value is None:
-        return None
-    if math.isnan(value):
-        return None
-    return value
-
-
-def _clean_array(arr: np.ndarray) -> list:
-    """Convert numpy array to list, replacing NaN with None."""
-    return [None if (x is None or math.isnan(x)) else float(x) for x in arr]
-
-def _clean_validity(arr: np.ndarray) -> list:
-    """Convert numpy bool array to list."""
-    return [bool(x) for x in arr]
-
-
-def _build_channel_info(run: TelemetryRun) -> dict:
-    """Build channel metadata dict."""
-    result = {}
-    for key, info in run.channel_info.items():
-        result[key] = {
-            "unit": info.unit,
-            "provenance": info.provenance.value,
-            "frame": info.frame.value if info.frame is not None else None,
-        }
-    return result
-
-def _build_metadata_dict(run: TelemetryRun) -> dict:
-    """Build metadata dict from TelemetryRun."""
-    return {
-        "id": run.metadata.id,
-        "name": run.metadata.name,
-        "source_file": str(run.metadata.source_file),
-        "recorded_at": run.metadata.recorded_at.isoformat() if run.metadata.recorded_at else None,
-        "duration_s": run.metadata.duration_s,
-        "sample_count": run.metadata.sample_count,
-        "sample_rate_hz": run.metadata.sample_rate_hz,
-        "has_gps": run.metadata.has_gps,
-        "has_imu": run.metadata.has_imu,
-        "has_speed": run.metadata.has_speed,
-        "canonical_version": run.metadata.canonical_version,
-        "origin": {
-            "lat": run.origin.lat,
-            "lon": run.origin.lon,
-            "alt": run.origin.alt,
-            "manual_override": run.origin.manual_override,
-        },
-        "bounding_box": run.get_bounding_box(),
-        "time_range": run.get_time_range(),
-    }
+def _payload_response(body: bytes, gzipped: bool) -> Response:
+    """Wrap cached payload bytes, marking pre-compressed bodies."""
+    response = Response(body, mimetype="application/json")
+    # Both variants vary on Accept-Encoding so shared caches keep them apart
+    response.headers["Vary"] = "Accept-Encoding"
+    if gzipped:
+        response.headers["Content-Encoding"] = "gzip"
+    return response
 
 
 # ============================================================================
@@ -110,7 +116,8 @@ def health_check():
     return jsonify({
         "status": "healthy",
         "data_folder": str(repo.data_folder) if repo.data_folder else None,
-        "run_count": len(repo._index),
+        "run_count": repo.run_count,
+        "payload_cache": repo.payload_cache.stats(),
     })
 
 
@@ -124,7 +131,7 @@ def get_folder_info():
     repo = get_repository()
     return jsonify({
         "path": str(repo.data_folder) if repo.data_folder else None,
-        "run_count": len(repo._index),
+        "run_count": repo.run_count,
     })
 
 
@@ -176,21 +183,7 @@ def rescan_folder():
 def list_runs():
     """List all available telemetry runs."""
     repo = get_repository()
-    summaries = repo.list_runs()
-    
-    return jsonify([
-        {
-            "id": s.id,
-            "name": s.name,
-            "source_file": s.source_file,
-            "recorded_at": s.recorded_at,
-            "duration_s": s.duration_s,
-            "sample_count": s.sample_count,
-            "has_gps": s.has_gps,
-            "has_imu": s.has_imu,
-        }
-        for s in summaries
-    ])
+    return Response(repo.list_runs_json(), mimetype="application/json")
 
 
 @app.route("/runs/<run_id>", methods=["GET"])
@@ -202,32 +195,53 @@ def get_run_metadata(run_id: str):
     if run is None:
         return jsonify({"detail": f"Run not found: {run_id}"}), 404
     
-    return jsonify(_build_metadata_dict(run))
+    return jsonify(run.metadata_dict())
 
 
 @app.route("/runs/<run_id>/data", methods=["GET"])
 def get_run_data(run_id: str):
-    """Get full telemetry data for a run."""
+    """
+    Get full telemetry data for a run.
+    
+    Pass encoding=b64.f32le for base64 float32 channel buffers, and
+    format=ndjson to stream one newline-delimited record per array.
+    """
     repo = get_repository()
+    encoding = request.args.get("encoding", "json")
+    layout = request.args.get("format", "json")
+    
+    if encoding not in ARRAY_ENCODINGS:
+        return jsonify({"detail": f"encoding must be one of {', '.join(ARRAY_ENCODINGS)}"}), 400
+    if layout not in ("json", "ndjson"):
+        return jsonify({"detail": "format must be 'json' or 'ndjson'"}), 400
+    
+    if layout == "ndjson":
+        run = repo.get_run(run_id)
+        if run is None:
+            return jsonify({"detail": f"Run not found: {run_id}"}), 404
+        return Response(
+            ndjson_lines(iter_run_records(run, encoding)),
+            mimetype="application/x-ndjson",
+        )
+    
+    # Gzip-capable clients get the cached pre-compressed body
+    gzip_ok = accepts_gzip(request.headers.get("Accept-Encoding", ""))
+    variant = f"{encoding}.gz" if gzip_ok else encoding
+    
+    cached = repo.payload_cache.get(run_id, variant)
+    if cached is not None:
+        return _payload_response(cached, gzip_ok)
+    
     run = repo.get_run(run_id)
     
     if run is None:
         return jsonify({"detail": f"Run not found: {run_id}"}), 404
     
-    return jsonify({
-        "metadata": _build_metadata_dict(run),
-        "timestamps": run.timestamps.tolist(),
-        "x": _clean_array(run.x),
-        "y": _clean_array(run.y),
-        "speed": _clean_array(run.speed),
-        "heading": _clean_array(run.heading),
-        "ax": _clean_array(run.ax_body),
-        "ay": _clean_array(run.ay_body),
-        "yaw_rate": _clean_array(run.yaw_rate),
-        "total_g": _clean_array(run.total_g),
-        "validity": {k: _clean_validity(v) for k, v in run.validity.items()},
-        "channels": _build_channel_info(run),
-    })
+    body = dumps(run_data_payload(run, encoding))
+    if gzip_ok:
+        body = gzip_bytes(body)
+    repo.payload_cache.put(run_id, body, variant)
+    return _payload_response(body, gzip_ok)
 
 
 @app.route("/runs/<run_id>/reload", methods=["POST"])
@@ -250,12 +264,18 @@ def reload_run(run_id: str):
     if run is None:
         return jsonify({"detail": "Failed to reload run"}), 500
     
-    return jsonify(_build_metadata_dict(run))
+    return jsonify(run.metadata_dict())
 
 
 @app.route("/runs/<run_id>/playback", methods=["GET"])
 def get_playback_data(run_id: str):
-    """Get downsampled playback data for a run."""
+    """
+    Get downsampled playback data for a run.
+    
+    Returns parallel per-channel arrays by default; pass format=rows for
+    the legacy list of sample objects, encoding=b64.f32le for base64
+    float32 column buffers, or encoding=q.i16 for int16-quantized columns.
+    """
     repo = get_repository()
     run = repo.get_run(run_id)
     
@@ -266,6 +286,16 @@ def get_playback_data(run_id: str):
     start_time = float(request.args.get("start_time", 0.0))
     end_time = request.args.get("end_time")
     target_rate = float(request.args.get("target_rate", 10.0))
+    layout = request.args.get("format", "columns")
+    
+    encoding = request.args.get("encoding", "json")
+    
+    if layout not in ("columns", "rows"):
+        return jsonify({"detail": "format must be 'columns' or 'rows'"}), 400
+    if encoding not in PLAYBACK_ENCODINGS:
+        return jsonify({"detail": f"encoding must be one of {', '.join(PLAYBACK_ENCODINGS)}"}), 400
+    if layout == "rows" and encoding != "json":
+        return jsonify({"detail": "Binary encodings require format=columns"}), 400
     
     # Validate target_rate
     target_rate = max(1.0, min(100.0, target_rate))
@@ -291,30 +321,15 @@ def get_playback_data(run_id: str):
     # Generate sample times
     sample_times = np.linspace(start_time, end_time, n_samples)
     
-    # Get interpolated samples
-    samples = []
-    for t in sample_times:
-        sample = run.sample_at_time(t)
-        valid = sample.get("valid", {})
-        samples.append({
-            "time": sample["time"],
-            "x": _nan_to_none(sample["x"]) if valid.get("x", False) else 0.0,
-            "y": _nan_to_none(sample["y"]) if valid.get("y", False) else 0.0,
-            "speed": _nan_to_none(sample["speed"]) if valid.get("speed", False) else 0.0,
-            "heading": _nan_to_none(sample["heading"]) if valid.get("heading", False) else 0.0,
-            "ax": _nan_to_none(sample["ax"]) if valid.get("ax", False) else 0.0,
-            "ay": _nan_to_none(sample["ay"]) if valid.get("ay", False) else 0.0,
-            "yaw_rate": _nan_to_none(sample["yaw_rate"]) if valid.get("yaw_rate", False) else 0.0,
-            "total_g": _nan_to_none(sample["total_g"]) if valid.get("total_g", False) else 0.0,
-            "valid": {k: bool(v) for k, v in valid.items()},
-        })
+    # Interpolate all sample times in one vectorized pass
+    batch = run.sample_batch(sample_times)
     
-    return jsonify({
-        "run_id": run_id,
-        "duration_s": duration,
-        "sample_rate_hz": target_rate,
-        "samples": samples,
-    })
+    # Invalid samples are reported as 0.0 in every float layout; the masked
+    # columns are pooled, so the body is encoded before they are released
+    with masked_playback_columns(batch) as columns:
+        return _json_response(playback_payload(
+            run_id, duration, target_rate, layout, encoding, batch, columns
+        ))
 
 
 # ============================================================================
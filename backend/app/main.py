@@ -12,8 +12,12 @@ from typing import Optional
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from starlette.datastructures import Headers
 
+from app.api.responses import FastJSONResponse
 from app.api.runs import router as runs_router, folder_router
+from app.core.compression import GZIP_LEVEL, MIN_COMPRESS_SIZE, accepts_gzip
 from app.services.repository import init_repository, get_repository
 
 
@@ -73,6 +77,7 @@ app = FastAPI(
     """,
     version="0.1.0",
     lifespan=lifespan,
+    default_response_class=FastJSONResponse,
 )
 
 
@@ -86,6 +91,20 @@ app.add_middleware(
 )
 
 
+class _GZipMiddleware(GZipMiddleware):
+    """GZipMiddleware that honours q=0; Starlette only looks for the substring."""
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] == "http" and not accepts_gzip(Headers(scope=scope).get("accept-encoding", "")):
+            await self.app(scope, receive, send)
+            return
+        await super().__call__(scope, receive, send)
+
+
+# Compress large JSON responses; already-encoded bodies pass through
+app.add_middleware(_GZipMiddleware, minimum_size=MIN_COMPRESS_SIZE, compresslevel=GZIP_LEVEL)
+
+
 # Include routers
 app.include_router(runs_router)
 app.include_router(folder_router)
@@ -104,11 +123,11 @@ async def root():
 @app.get("/health")
 async def health_check():
     """Health check endpoint."""
-    from app.services.repository import get_repository
     repo = get_repository()
     
     return {
         "status": "healthy",
         "data_folder": str(repo.data_folder) if repo.data_folder else None,
-        "run_count": len(repo._index),
+        "run_count": repo.run_count,
+        "payload_cache": repo.payload_cache.stats(),
     }
@@ -17,9 +17,127 @@ from typing import Optional
 import numpy as np
 from numpy.typing import NDArray
 
+from app.core.jit import HAVE_NUMBA, njit
+
 
 CANONICAL_VERSION = "v1"
 
+# Channels returned by sample_at_time / sample_batch, in response order
+SAMPLE_CHANNELS = ("x", "y", "speed", "heading", "ax", "ay", "yaw_rate", "total_g")
+
+# Per-sample float channels on TelemetryRun, each stored as its own array.
+# Channels are float32 (ample for metre-scale ENU and G-scale accel);
+# timestamps stay float64 so long runs keep sub-millisecond resolution.
+FLOAT_CHANNELS = (
+    "x", "y", "z", "speed", "heading", "yaw_rate",
+    "ax_body", "ay_body", "gps_accuracy",
+)
+CHANNEL_DTYPE = np.float32
+
+# Interpolated channels (total_g is derived from ax/ay after interpolation)
+_LERP_CHANNELS = ("x", "y", "speed", "heading", "ax", "ay", "yaw_rate")
+_LERP_IS_ANGLE = np.array([key == "heading" for key in _LERP_CHANNELS])
+
+
+@njit(cache=True)
+def _interp_at(timestamps, values, valid, is_angle, times):
+    """
+    Interpolate each row of `values` at `times` (compiled when Numba is available).
+
+    Same semantics as TelemetryRun._interp_matrix_numpy: clamp to the endpoints,
+    fall back to whichever neighbour is valid, wrap angles to [0, 360).
+    Returns (sample_times, values, validity) with one row per channel.
+
+    The first query time is bracketed with a binary search, so a single
+    lookup (sample_at_time) is O(log N). Later non-decreasing times (the
+    playback case) advance a cursor from the previous bracket; a step
+    backwards falls back to a binary search.
+    """
+    n = timestamps.shape[0]
+    k = values.shape[0]
+    m = times.shape[0]
+    out_time = np.empty(m)
+    out = np.empty((k, m))
+    out_valid = np.empty((k, m), dtype=np.bool_)
+
+    cursor = 0
+    prev = -np.inf
+    if m > 0:
+        cursor = np.searchsorted(timestamps, times[0])
+        prev = times[0]
+    for j in range(m):
+        t = times[j]
+        if t >= prev:
+            # First index with timestamps[cursor] >= t, as searchsorted(side="left")
+            while cursor < n and timestamps[cursor] < t:
+                cursor += 1
+        else:
+            cursor = np.searchsorted(timestamps, t)
+        prev = t
+
+        hi = cursor
+        if hi <= 0:
+            lo = hi = 0
+            alpha = 0.0
+            out_time[j] = timestamps[0]
+        elif hi >= n:
+            lo = hi = n - 1
+            alpha = 0.0
+            out_time[j] = timestamps[n - 1]
+        else:
+            lo = hi - 1
+            span = timestamps[hi] - timestamps[lo]
+            alpha = (t - timestamps[lo]) / span if span != 0 else 0.0
+            out_time[j] = t
+
+        for c in range(k):
+            # Stored at CHANNEL_DTYPE; widened so the blend runs in float64
+            v0 = np.float64(values[c, lo])
+            v1 = np.float64(values[c, hi])
+            valid0 = valid[c, lo]
+            valid1 = valid[c, hi]
+            if valid0 and valid1:
+                diff = v1 - v0
+                if is_angle[c]:
+                    # Shortest signed arc in [-180, 180)
+                    diff = (diff + 180.0) % 360.0 - 180.0
+                result = v0 + alpha * diff
+            elif valid1:
+                result = v1
+            elif valid0:
+                result = v0
+            else:
+                out[c, j] = np.nan
+                out_valid[c, j] = False
+                continue
+            if is_angle[c]:
+                result = result % 360.0
+            out[c, j] = result
+            out_valid[c, j] = True
+
+    return out_time, out, out_valid
+
+
+def _own_contiguous(arr: NDArray, dtype: type) -> NDArray:
+    """Return arr as a contiguous array that does not view a 2-D buffer."""
+    arr = np.ascontiguousarray(arr, dtype=dtype)
+    base = arr.base
+    # Read-only inputs include broadcast placeholders, which stay zero-stride
+    # views when they hold at most one sample
+    if (isinstance(base, np.ndarray) and base.ndim > 1) or not arr.flags.writeable:
+        arr = arr.copy()
+    return arr
+
+
+def warm_sampling_kernel() -> None:
+    """Compile the Numba sampling kernel ahead of the first request."""
+    if not HAVE_NUMBA:
+        return
+    timestamps = np.array([0.0, 1.0])
+    values = np.zeros((len(_LERP_CHANNELS), 2), dtype=CHANNEL_DTYPE)
+    valid = np.ones((len(_LERP_CHANNELS), 2), dtype=np.bool_)
+    _interp_at(timestamps, values, valid, _LERP_IS_ANGLE, np.array([0.5]))
+
 
 class DataProvenance(Enum):
     """Provenance for a telemetry channel."""
@@ -35,7 +153,7 @@ class ReferenceFrame(Enum):
     GLOBAL = "global"  # Global ENU frame (X east, Y north)
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class RunMetadata:
     """Metadata about a telemetry run."""
 
@@ -52,7 +170,7 @@ class RunMetadata:
     canonical_version: str = CANONICAL_VERSION
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class OriginConfig:
     """Configuration for coordinate origin."""
 
@@ -62,23 +180,29 @@ class OriginConfig:
     manual_override: bool = False
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ChannelInfo:
-    """Metadata for a single telemetry channel."""
+    """Metadata for a single telemetry channel (immutable, shared across runs)."""
 
     unit: str
     provenance: DataProvenance
     frame: Optional[ReferenceFrame] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class TelemetryRun:
     """
     Canonical representation of a single telemetry run.
 
+    Not frozen: derived values (total_g, bounding box, metadata_dict) are
+    memoized on the instance. Its metadata and origin are frozen, so the
+    memoized views cannot go stale.
+
     Coordinate system:
     - Global ENU: X east, Y north, Z up (meters)
     - Vehicle body: X forward, Y left (accel in G)
+
+    Channel arrays are stored as float32; timestamps as float64.
     """
 
     metadata: RunMetadata
@@ -87,52 +211,79 @@ class TelemetryRun:
     timestamps: NDArray[np.float64]   # Seconds from run start
 
     # Position (ENU, meters)
-    x: NDArray[np.float64]
-    y: NDArray[np.float64]
-    z: NDArray[np.float64]
+    x: NDArray[np.float32]
+    y: NDArray[np.float32]
+    z: NDArray[np.float32]
 
     # Velocity / orientation
-    speed: NDArray[np.float64]        # m/s
-    heading: NDArray[np.float64]      # degrees, 0=N, 90=E
-    yaw_rate: NDArray[np.float64]     # deg/s
+    speed: NDArray[np.float32]        # m/s
+    heading: NDArray[np.float32]      # degrees, 0=N, 90=E
+    yaw_rate: NDArray[np.float32]     # deg/s
 
     # Acceleration (body frame, G)
-    ax_body: NDArray[np.float64]
-    ay_body: NDArray[np.float64]
+    ax_body: NDArray[np.float32]
+    ay_body: NDArray[np.float32]
 
     # GPS metadata
-    gps_accuracy: NDArray[np.float64]
+    gps_accuracy: NDArray[np.float32]
     gps_update: NDArray[np.bool_]
 
     # Lap info (optional)
     lap_number: Optional[NDArray[np.int32]] = None
 
-    # Per-sample validity masks (channel name -> bool array)
+    # Per-sample validity masks (channel name -> bool array). Kept one byte
+    # per sample: the sampling kernel reads them by index and the JSON view
+    # lists them; b64_bits packs them to bits only for the wire
     validity: dict[str, NDArray[np.bool_]] = field(default_factory=dict)
 
     # Channel metadata (channel name -> ChannelInfo)
     channel_info: dict[str, ChannelInfo] = field(default_factory=dict)
 
     # Cached derived values
-    _total_g: Optional[NDArray[np.float64]] = field(default=None, repr=False)
+    _total_g: Optional[NDArray[np.float32]] = field(default=None, repr=False)
+    _lerp_matrix: Optional[tuple[NDArray[np.float32], NDArray[np.bool_]]] = field(
+        default=None, repr=False
+    )
+    _bounding_box: Optional[tuple[float, float, float, float]] = field(default=None, repr=False)
+    _metadata_dict: Optional[dict] = field(default=None, repr=False)
+
+    def __post_init__(self) -> None:
+        # Struct-of-arrays: each channel owns a contiguous buffer so a scan
+        # over one channel never strides across the others
+        self.timestamps = _own_contiguous(self.timestamps, np.float64)
+        for name in FLOAT_CHANNELS:
+            setattr(self, name, _own_contiguous(getattr(self, name), CHANNEL_DTYPE))
+        self.gps_update = _own_contiguous(self.gps_update, np.bool_)
+        if self._total_g is not None:
+            self._total_g = _own_contiguous(self._total_g, CHANNEL_DTYPE)
+        self.validity = {
+            key: _own_contiguous(mask, np.bool_) for key, mask in self.validity.items()
+        }
+
+    def _channel_validity(self, key: str, arr: NDArray) -> NDArray[np.bool_]:
+        """Validity mask for a channel, defaulting to non-NaN samples (memoized)."""
+        mask = self.validity.get(key)
+        if mask is None:
+            mask = self.validity[key] = ~np.isnan(arr)
+        return mask
 
     @property
-    def lateral_g(self) -> NDArray[np.float64]:
+    def lateral_g(self) -> NDArray[np.float32]:
         return self.ay_body
 
     @property
-    def longitudinal_g(self) -> NDArray[np.float64]:
+    def longitudinal_g(self) -> NDArray[np.float32]:
         return self.ax_body
 
     @property
-    def total_g(self) -> NDArray[np.float64]:
+    def total_g(self) -> NDArray[np.float32]:
         """Total G-force magnitude (derived)."""
         if self._total_g is None:
-            valid_ax = self.validity.get("ax", ~np.isnan(self.ax_body))
-            valid_ay = self.validity.get("ay", ~np.isnan(self.ay_body))
+            valid_ax = self._channel_validity("ax", self.ax_body)
+            valid_ay = self._channel_validity("ay", self.ay_body)
             valid_total = valid_ax & valid_ay
-            total = np.sqrt(self.ax_body**2 + self.ay_body**2)
-            total = np.where(valid_total, total, np.nan)
+            total = np.hypot(self.ax_body, self.ay_body)
+            total[~valid_total] = np.nan
             self._total_g = total
             if "total_g" not in self.validity:
                 self.validity["total_g"] = valid_total
@@ -144,152 +295,201 @@ class TelemetryRun:
         return (float(self.timestamps[0]), float(self.timestamps[-1]))
 
     def get_bounding_box(self) -> tuple[float, float, float, float]:
-        valid_x = self.validity.get("x", ~np.isnan(self.x))
-        valid_y = self.validity.get("y", ~np.isnan(self.y))
-        valid = valid_x & valid_y
-        if not np.any(valid):
-            return (0.0, 0.0, 0.0, 0.0)
-        return (
-            float(np.min(self.x[valid])),
-            float(np.min(self.y[valid])),
-            float(np.max(self.x[valid])),
-            float(np.max(self.y[valid])),
-        )
+        """(min_x, min_y, max_x, max_y) over valid positions, computed once."""
+        if self._bounding_box is None:
+            valid_x = self._channel_validity("x", self.x)
+            valid_y = self._channel_validity("y", self.y)
+            valid = valid_x & valid_y
+            # Masked reductions skip the boolean gather copies; an empty
+            # mask leaves the +-inf initial values in place
+            bounds = (
+                self.x.min(where=valid, initial=np.inf),
+                self.y.min(where=valid, initial=np.inf),
+                self.x.max(where=valid, initial=-np.inf),
+                self.y.max(where=valid, initial=-np.inf),
+            )
+            if np.isinf(bounds[0]):
+                self._bounding_box = (0.0, 0.0, 0.0, 0.0)
+            else:
+                self._bounding_box = tuple(float(b) for b in bounds)
+        return self._bounding_box
+
+    def metadata_dict(self) -> dict:
+        """
+        JSON-ready run metadata (the RunMetadataResponse shape), built once.
+
+        The same dict is returned on every call; treat it as read-only.
+        """
+        if self._metadata_dict is None:
+            meta = self.metadata
+            self._metadata_dict = {
+                "id": meta.id,
+                "name": meta.name,
+                "source_file": str(meta.source_file),
+                "recorded_at": meta.recorded_at.isoformat() if meta.recorded_at else None,
+                "duration_s": meta.duration_s,
+                "sample_count": meta.sample_count,
+                "sample_rate_hz": meta.sample_rate_hz,
+                "has_gps": meta.has_gps,
+                "has_imu": meta.has_imu,
+                "has_speed": meta.has_speed,
+                "canonical_version": meta.canonical_version,
+                "origin": {
+                    "lat": self.origin.lat,
+                    "lon": self.origin.lon,
+                    "alt": self.origin.alt,
+                    "manual_override": self.origin.manual_override,
+                },
+                "bounding_box": self.get_bounding_box(),
+                "time_range": self.get_time_range(),
+            }
+        return self._metadata_dict
 
     def sample_at_time(self, t: float) -> dict:
         """
         Get interpolated sample at time t, including validity.
+
+        Shares the batch interpolation path (_interp_matrix) with
+        sample_batch, so scalar and batch queries agree exactly.
         """
         if len(self.timestamps) == 0:
-            return {
-                "time": 0.0,
-                "x": np.nan,
-                "y": np.nan,
-                "speed": np.nan,
-                "heading": np.nan,
-                "ax": np.nan,
-                "ay": np.nan,
-                "yaw_rate": np.nan,
-                "total_g": np.nan,
-                "valid": {},
-            }
-
-        idx = int(np.searchsorted(self.timestamps, t))
-        if idx <= 0:
-            return self._sample_at_index(0)
-        if idx >= len(self.timestamps):
-            return self._sample_at_index(len(self.timestamps) - 1)
-
-        t0, t1 = self.timestamps[idx - 1], self.timestamps[idx]
-        alpha = (t - t0) / (t1 - t0) if t1 != t0 else 0.0
-
-        x, valid_x = self._lerp_with_valid(self.x, "x", idx, alpha)
-        y, valid_y = self._lerp_with_valid(self.y, "y", idx, alpha)
-        speed, valid_speed = self._lerp_with_valid(self.speed, "speed", idx, alpha)
-        heading, valid_heading = self._lerp_angle_with_valid(self.heading, "heading", idx, alpha)
-        ax, valid_ax = self._lerp_with_valid(self.ax_body, "ax", idx, alpha)
-        ay, valid_ay = self._lerp_with_valid(self.ay_body, "ay", idx, alpha)
-        yaw_rate, valid_yaw = self._lerp_with_valid(self.yaw_rate, "yaw_rate", idx, alpha)
-
-        total_g = np.sqrt(ax**2 + ay**2) if valid_ax and valid_ay else np.nan
-        valid_total = bool(valid_ax and valid_ay)
-
-        return {
-            "time": float(t),
-            "x": float(x),
-            "y": float(y),
-            "speed": float(speed),
-            "heading": float(heading),
-            "ax": float(ax),
-            "ay": float(ay),
-            "yaw_rate": float(yaw_rate),
-            "total_g": float(total_g) if valid_total else np.nan,
-            "valid": {
-                "x": valid_x,
-                "y": valid_y,
-                "speed": valid_speed,
-                "heading": valid_heading,
-                "ax": valid_ax,
-                "ay": valid_ay,
-                "yaw_rate": valid_yaw,
-                "total_g": valid_total,
-            },
-        }
+            sample = {key: np.nan for key in SAMPLE_CHANNELS}
+            return {"time": 0.0, **sample, "valid": {}}
+
+        sample_times, out, out_valid = self._interp_matrix(np.array([t], dtype=np.float64))
+        # One tolist per matrix column instead of a float()/bool() per channel
+        sample = dict(zip(_LERP_CHANNELS, out[:, 0].tolist()))
+        valid = dict(zip(_LERP_CHANNELS, out_valid[:, 0].tolist()))
+        valid["total_g"] = valid["ax"] and valid["ay"]
+        sample["total_g"] = (
+            float(np.hypot(sample["ax"], sample["ay"])) if valid["total_g"] else np.nan
+        )
+        return {"time": float(sample_times[0]), **sample, "valid": valid}
 
-    def _sample_at_index(self, idx: int) -> dict:
-        valid = {
-            "x": bool(self.validity.get("x", ~np.isnan(self.x))[idx]),
-            "y": bool(self.validity.get("y", ~np.isnan(self.y))[idx]),
-            "speed": bool(self.validity.get("speed", ~np.isnan(self.speed))[idx]),
-            "heading": bool(self.validity.get("heading", ~np.isnan(self.heading))[idx]),
-            "ax": bool(self.validity.get("ax", ~np.isnan(self.ax_body))[idx]),
-            "ay": bool(self.validity.get("ay", ~np.isnan(self.ay_body))[idx]),
-            "yaw_rate": bool(self.validity.get("yaw_rate", ~np.isnan(self.yaw_rate))[idx]),
-        }
-        total_g = self.total_g[idx] if valid["ax"] and valid["ay"] else np.nan
-        valid["total_g"] = bool(valid["ax"] and valid["ay"])
-
-        return {
-            "time": float(self.timestamps[idx]),
-            "x": float(self.x[idx]),
-            "y": float(self.y[idx]),
-            "speed": float(self.speed[idx]),
-            "heading": float(self.heading[idx]),
-            "ax": float(self.ax_body[idx]),
-            "ay": float(self.ay_body[idx]),
-            "yaw_rate": float(self.yaw_rate[idx]),
-            "total_g": float(total_g) if valid["total_g"] else np.nan,
-            "valid": valid,
-        }
+    def sample_batch(self, times: NDArray[np.float64]) -> dict:
+        """
+        Get interpolated samples at each of `times`, including validity.
 
-    def _lerp_with_valid(
-        self,
-        arr: NDArray[np.float64],
-        key: str,
-        idx: int,
-        alpha: float,
-    ) -> tuple[float, bool]:
-        v0, v1 = arr[idx - 1], arr[idx]
-        valid_arr = self.validity.get(key)
-        valid0 = bool(valid_arr[idx - 1]) if valid_arr is not None else not np.isnan(v0)
-        valid1 = bool(valid_arr[idx]) if valid_arr is not None else not np.isnan(v1)
-
-        if not valid0 and not valid1:
-            return (np.nan, False)
-        if valid0 and valid1:
-            return (float(v0 + alpha * (v1 - v0)), True)
-        if valid1:
-            return (float(v1), True)
-        return (float(v0), True)
-
-    def _lerp_angle_with_valid(
+        Vectorized equivalent of sample_at_time: the compiled kernel binary
+        searches for the first query time and advances a cursor for ordered
+        ones; without Numba, np.searchsorted brackets all times at once.
+        Returns a dict of arrays keyed like sample_at_time, with "valid"
+        mapping to bool arrays.
+        """
+        times = np.asarray(times, dtype=np.float64)
+        if len(self.timestamps) == 0:
+            nan = np.full(times.shape, np.nan)
+            result = {key: nan.copy() for key in SAMPLE_CHANNELS}
+            result["time"] = np.zeros(times.shape)
+            result["valid"] = {}
+            return result
+        return self._batch_from_matrix(*self._interp_matrix(times))
+
+    def _interp_matrix(
+        self, times: NDArray[np.float64]
+    ) -> tuple[NDArray[np.float64], NDArray[np.float64], NDArray[np.bool_]]:
+        """(sample_times, values, validity) with one row per _LERP_CHANNELS entry."""
+        if HAVE_NUMBA:
+            values, valid = self._get_lerp_matrix()
+            return _interp_at(self.timestamps, values, valid, _LERP_IS_ANGLE, times)
+        return self._interp_matrix_numpy(times)
+
+    def _get_lerp_matrix(self) -> tuple[NDArray[np.float32], NDArray[np.bool_]]:
+        """Interpolated channels and their validity stacked as (channels, samples)."""
+        if self._lerp_matrix is None:
+            arrays = (
+                self.x, self.y, self.speed, self.heading,
+                self.ax_body, self.ay_body, self.yaw_rate,
+            )
+            # Kept at storage precision so the cache costs no more than the
+            # channels it mirrors; samplers widen the gathered values
+            values = np.empty((len(arrays), len(self.timestamps)), dtype=CHANNEL_DTYPE)
+            for row, arr in zip(values, arrays):
+                np.copyto(row, arr)
+            valid = np.stack([
+                self._channel_validity(key, arr)
+                for key, arr in zip(_LERP_CHANNELS, arrays)
+            ])
+            self._lerp_matrix = (values, valid)
+        return self._lerp_matrix
+
+    def _sample_batch_numpy(self, times: NDArray[np.float64]) -> dict:
+        """sample_batch through the NumPy path regardless of HAVE_NUMBA."""
+        return self._batch_from_matrix(*self._interp_matrix_numpy(times))
+
+    def _interp_matrix_numpy(
+        self, times: NDArray[np.float64]
+    ) -> tuple[NDArray[np.float64], NDArray[np.float64], NDArray[np.bool_]]:
+        n = len(self.timestamps)
+
+        # Bracketing indices; queries outside the run clamp to an endpoint
+        hi = np.searchsorted(self.timestamps, times)
+        clamp_start = hi <= 0
+        clamp_end = hi >= n
+        hi = np.clip(hi, 1, n - 1) if n > 1 else np.zeros_like(hi)
+        lo = np.maximum(hi - 1, 0)
+        hi[clamp_start] = 0
+        lo[clamp_start] = 0
+        hi[clamp_end] = n - 1
+        lo[clamp_end] = n - 1
+
+        t0 = self.timestamps[lo]
+        t1 = self.timestamps[hi]
+        span = t1 - t0
+        alpha = np.divide(times - t0, span, out=np.zeros_like(times), where=span != 0)
+
+        clamped = clamp_start | clamp_end
+        sample_times = np.where(clamped, t0, times)
+
+        # One gather per bracket across all channels of the stacked matrix
+        values, valid_matrix = self._get_lerp_matrix()
+        v0 = values[:, lo].astype(np.float64)
+        v1 = values[:, hi].astype(np.float64)
+        valid0 = valid_matrix[:, lo]
+        valid1 = valid_matrix[:, hi]
+
+        diff = v1 - v0
+        # Shortest signed arc in [-180, 180), reduced in place on the angle rows
+        angle = diff[_LERP_IS_ANGLE]
+        np.add(angle, 180.0, out=angle)
+        np.mod(angle, 360.0, out=angle)
+        np.subtract(angle, 180.0, out=angle)
+        diff[_LERP_IS_ANGLE] = angle
+        both = v0 + alpha * diff
+        # Fall back to whichever endpoint is valid
+        out = np.where(valid0 & valid1, both, np.where(valid1, v1, v0))
+        out[_LERP_IS_ANGLE] %= 360
+        any_valid = valid0 | valid1
+        out[~any_valid] = np.nan
+        return sample_times, out, any_valid
+
+    def _batch_from_matrix(
         self,
-        arr: NDArray[np.float64],
-        key: str,
-        idx: int,
-        alpha: float,
-    ) -> tuple[float, bool]:
-        a0, a1 = arr[idx - 1], arr[idx]
-        valid_arr = self.validity.get(key)
-        valid0 = bool(valid_arr[idx - 1]) if valid_arr is not None else not np.isnan(a0)
-        valid1 = bool(valid_arr[idx]) if valid_arr is not None else not np.isnan(a1)
-
-        if not valid0 and not valid1:
-            return (np.nan, False)
-        if valid0 and valid1:
-            diff = a1 - a0
-            if diff > 180:
-                diff -= 360
-            elif diff < -180:
-                diff += 360
-            result = a0 + alpha * diff
-            return (float(result % 360), True)
-        if valid1:
-            return (float(a1 % 360), True)
-        return (float(a0 % 360), True)
-
-
-@dataclass
+        sample_times: NDArray[np.float64],
+        out: NDArray[np.float64],
+        out_valid: NDArray[np.bool_],
+    ) -> dict:
+        result = {"time": sample_times}
+        valid: dict[str, NDArray[np.bool_]] = {}
+        for row, key in enumerate(_LERP_CHANNELS):
+            result[key] = out[row]
+            valid[key] = out_valid[row]
+        return self._finish_batch(result, valid)
+
+    @staticmethod
+    def _finish_batch(result: dict, valid: dict[str, NDArray[np.bool_]]) -> dict:
+        """Derive total_g from the interpolated ax/ay and attach validity."""
+        valid_total = valid["ax"] & valid["ay"]
+        total_g = np.hypot(result["ax"], result["ay"])
+        total_g[~valid_total] = np.nan
+        result["total_g"] = total_g
+        valid["total_g"] = valid_total
+
+        result["valid"] = valid
+        return result
+
+
+@dataclass(slots=True)
 class RunSummary:
     """Lightweight summary of a run for listing."""
 
@@ -304,13 +504,17 @@ class RunSummary:
 
     @classmethod
     def from_run(cls, run: TelemetryRun) -> "RunSummary":
+        return cls.from_metadata(run.metadata)
+
+    @classmethod
+    def from_metadata(cls, metadata: RunMetadata) -> "RunSummary":
         return cls(
-            id=run.metadata.id,
-            name=run.metadata.name,
-            source_file=str(run.metadata.source_file),
-            recorded_at=run.metadata.recorded_at.isoformat() if run.metadata.recorded_at else None,
-            duration_s=run.metadata.duration_s,
-            sample_count=run.metadata.sample_count,
-            has_gps=run.metadata.has_gps,
-            has_imu=run.metadata.has_imu,
+            id=metadata.id,
+            name=metadata.name,
+            source_file=str(metadata.source_file),
+            recorded_at=metadata.recorded_at.isoformat() if metadata.recorded_at else None,
+            duration_s=metadata.duration_s,
+            sample_count=metadata.sample_count,
+            has_gps=metadata.has_gps,
+            has_imu=metadata.has_imu,
         )
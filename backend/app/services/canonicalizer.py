@@ -6,17 +6,21 @@ Normalizes units, coordinate frames, and validity masks.
 
 from __future__ import annotations
 
+import hashlib
 import math
 import os
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
 from typing import Optional
 
 import numpy as np
 from numpy.typing import NDArray
 
+from app.core.jit import HAVE_NUMBA, njit
 from app.models.raw import RawTelemetry
 from app.models.telemetry import (
+    CHANNEL_DTYPE,
     ChannelInfo,
     DataProvenance,
     OriginConfig,
@@ -24,13 +28,21 @@ from app.models.telemetry import (
     RunMetadata,
     TelemetryRun,
 )
-from app.utils.coordinates import gps_to_enu, compute_heading_from_positions
+from app.utils.coordinates import gps_to_enu, compute_heading_from_positions, warm_enu_kernel
 
 
 MAX_G = 4.5  # hard validation limit (G)
 START_G_THRESHOLD = float(os.getenv("AUTOCROSS_START_G", "0.25"))  # g to trim leading idle
 ANCHOR_START_XY = os.getenv("AUTOCROSS_ANCHOR_START_XY", "1") not in ("0", "false", "False")
 
+# Speed unit (lowercased) -> factor to m/s
+_SPEED_TO_MPS = {
+    "mph": 0.44704,
+    "mi/h": 0.44704,
+    "kph": 0.277778,
+    "km/h": 0.277778,
+}
+
 
 def canonicalize_raw(
     raw: RawTelemetry,
@@ -47,14 +59,17 @@ def canonicalize_raw(
 
     # GPS -> ENU (handle missing altitude)
     altitude = raw.altitude
-    if altitude is None or np.all(np.isnan(altitude)):
+    if altitude is None or _all_nan(altitude):
         altitude = np.zeros_like(raw.latitude)
 
-    gps_valid = ~(np.isnan(raw.latitude) | np.isnan(raw.longitude))
+    # ~(isnan(lat) | isnan(lon)), combined in the first isnan buffer
+    gps_valid = np.isnan(raw.latitude)
+    np.logical_or(gps_valid, np.isnan(raw.longitude), out=gps_valid)
+    np.logical_not(gps_valid, out=gps_valid)
     if not np.any(gps_valid):
-        enu_east = np.full_like(raw.latitude, np.nan)
-        enu_north = np.full_like(raw.latitude, np.nan)
-        enu_up = np.full_like(raw.latitude, np.nan)
+        # One shared placeholder: these are only read until TelemetryRun
+        # narrows each channel into its own float32 buffer
+        enu_east = enu_north = enu_up = np.full(raw.latitude.shape, np.nan)
         origin_latitude = 0.0
         origin_longitude = 0.0
         origin_altitude = 0.0
@@ -78,90 +93,66 @@ def canonicalize_raw(
     ay = _safe_array(raw.accel_y, n_samples)
     accel_prov = DataProvenance.MEASURED if not _all_nan(ax, ay) else DataProvenance.DERIVED
 
-    # Apply G validation
-    valid_ax = _valid_g(ax)
-    valid_ay = _valid_g(ay)
-    ax = np.where(valid_ax, ax, np.nan)
-    ay = np.where(valid_ay, ay, np.nan)
-
     # Yaw rate (deg/s canonical)
     yaw_rate, yaw_prov = _normalize_yaw_rate(raw, n_samples)
 
-    # Validity masks
-    validity: dict[str, NDArray[np.bool_]] = {
-        "x": gps_valid & ~np.isnan(enu_east),
-        "y": gps_valid & ~np.isnan(enu_north),
-        "speed": _valid_speed(speed),
-        "heading": ~np.isnan(heading),
-        "ax": valid_ax,
-        "ay": valid_ay,
-        "yaw_rate": ~np.isnan(yaw_rate),
-    }
-
-    # Total G validity and values
-    total_g = np.sqrt(ax**2 + ay**2)
-    valid_total = validity["ax"] & validity["ay"]
-    total_g = np.where(valid_total, total_g, np.nan)
-    validity["total_g"] = valid_total
-
-    # Trim leading samples until car starts moving (hits threshold G)
-    (
-        timestamps,
-        enu_east,
-        enu_north,
-        enu_up,
-        speed,
-        heading,
-        yaw_rate,
-        ax,
-        ay,
-        gps_accuracy,
-        gps_update,
-        lap_number,
-        total_g,
-        validity,
-    ) = _trim_leading_idle(
-        START_G_THRESHOLD,
-        timestamps,
-        enu_east,
-        enu_north,
-        enu_up,
-        speed,
-        heading,
-        yaw_rate,
-        ax,
-        ay,
-        _safe_array(raw.gps_accuracy, n_samples),
-        _safe_bool_array(raw.gps_update, n_samples),
-        raw.lap_number,
-        total_g,
-        validity,
+    # Validity masks, G/speed validation and total G
+    validity, speed, ax, ay, total_g = _validate_channels(
+        gps_valid, enu_east, enu_north, speed, heading, yaw_rate, ax, ay
     )
 
+    # No arithmetic happens on accuracy, so load it at storage precision
+    gps_accuracy = _safe_array(raw.gps_accuracy, n_samples, dtype=CHANNEL_DTYPE)
+    gps_update = _safe_bool_array(raw.gps_update, n_samples)
+    lap_number = raw.lap_number
+
+    # Trim leading samples until car starts moving (hits threshold G). Every
+    # channel becomes a prefix view; TelemetryRun narrows each into its own
+    # buffer, so the trim itself copies nothing
+    start_idx = _idle_start_index(START_G_THRESHOLD, total_g)
+    if start_idx > 0:
+        timestamps = timestamps[start_idx:]
+        # Re-zero in place; timestamps is the copy _normalize_time returned
+        np.subtract(timestamps, timestamps[0], out=timestamps)
+        (
+            enu_east, enu_north, enu_up, speed, heading, yaw_rate,
+            ax, ay, gps_accuracy, gps_update, total_g,
+        ) = (
+            arr[start_idx:]
+            for arr in (
+                enu_east, enu_north, enu_up, speed, heading, yaw_rate,
+                ax, ay, gps_accuracy, gps_update, total_g,
+            )
+        )
+        if lap_number is not None:
+            lap_number = lap_number[start_idx:]
+        validity = {key: mask[start_idx:] for key, mask in validity.items()}
+
     n_samples = len(timestamps)
     duration_s = float(timestamps[-1] - timestamps[0]) if n_samples > 1 else 0.0
-    sample_rate_hz = n_samples / max(duration_s, 0.001)
+    # Rate from sample intervals; a single-instant run has no meaningful rate
+    sample_rate_hz = (n_samples - 1) / duration_s if duration_s > 0 else 0.0
 
     # Anchor start position to (0,0) so different runs overlay at launch line
     enu_east, enu_north, validity = _anchor_start_position(enu_east, enu_north, validity)
 
     # Channel metadata
     channel_info = {
-        "x": ChannelInfo(unit="m", frame=ReferenceFrame.GLOBAL, provenance=DataProvenance.DERIVED),
-        "y": ChannelInfo(unit="m", frame=ReferenceFrame.GLOBAL, provenance=DataProvenance.DERIVED),
-        "speed": ChannelInfo(unit="m/s", provenance=speed_prov),
-        "heading": ChannelInfo(unit="deg", provenance=heading_prov),
-        "ax": ChannelInfo(unit="g", frame=ReferenceFrame.BODY, provenance=accel_prov),
-        "ay": ChannelInfo(unit="g", frame=ReferenceFrame.BODY, provenance=accel_prov),
-        "yaw_rate": ChannelInfo(unit="deg/s", frame=ReferenceFrame.BODY, provenance=yaw_prov),
-        "total_g": ChannelInfo(unit="g", frame=ReferenceFrame.BODY, provenance=DataProvenance.DERIVED),
+        "x": intern_channel_info("m", DataProvenance.DERIVED, ReferenceFrame.GLOBAL),
+        "y": intern_channel_info("m", DataProvenance.DERIVED, ReferenceFrame.GLOBAL),
+        "speed": intern_channel_info("m/s", speed_prov),
+        "heading": intern_channel_info("deg", heading_prov),
+        "ax": intern_channel_info("g", accel_prov, ReferenceFrame.BODY),
+        "ay": intern_channel_info("g", accel_prov, ReferenceFrame.BODY),
+        "yaw_rate": intern_channel_info("deg/s", yaw_prov, ReferenceFrame.BODY),
+        "total_g": intern_channel_info("g", DataProvenance.DERIVED, ReferenceFrame.BODY),
     }
 
     has_gps = bool(np.any(validity["x"] & validity["y"]))
     has_imu = bool(np.any(validity["ax"] | validity["ay"] | validity["yaw_rate"]))
     has_speed = bool(np.any(validity["speed"]))
 
-    run_id = _generate_id(raw.source_file)
+    run_id = generate_run_id(raw.source_file)
 
     metadata = RunMetadata(
         id=run_id,
@@ -190,9 +181,11 @@ def canonicalize_raw(
         x=enu_east,
         y=enu_north,
         z=enu_up,
-        speed=np.where(validity["speed"], speed, np.nan),
-        heading=np.where(validity["heading"], heading, np.nan),
-        yaw_rate=np.where(validity["yaw_rate"], yaw_rate, np.nan),
+        # Invalid speed samples were already replaced with NaN; heading and
+        # yaw rate validity is just ~isnan
+        speed=speed,
+        heading=heading,
+        yaw_rate=yaw_rate,
         ax_body=ax,
         ay_body=ay,
         gps_accuracy=gps_accuracy,
@@ -200,9 +193,32 @@ def canonicalize_raw(
         lap_number=lap_number,
         validity=validity,
         channel_info=channel_info,
+        # Seed the derived cache so total_g is not recomputed on first access
+        _total_g=total_g,
     )
 
 
+@lru_cache(maxsize=None)
+def intern_channel_info(
+    unit: str,
+    provenance: DataProvenance,
+    frame: Optional[ReferenceFrame] = None,
+) -> ChannelInfo:
+    """Interned ChannelInfo; only a handful of combinations ever occur."""
+    return ChannelInfo(unit=unit, provenance=provenance, frame=frame)
+
+
+def latest_timestamp(times: NDArray[np.float64]) -> float:
+    """
+    Largest timestamp, for unit detection on a non-empty time axis.
+
+    Logged time axes run forward, so the last sample is the maximum and
+    the full nanmax reduction is only needed when the log ends in NaN.
+    """
+    last = float(times[-1])
+    return last if math.isfinite(last) else float(np.nanmax(times))
+
+
 def _normalize_time(times: NDArray[np.float64], unit: str) -> NDArray[np.float64]:
     times = times.astype(np.float64, copy=True)
     if len(times) == 0:
@@ -210,24 +226,24 @@ def _normalize_time(times: NDArray[np.float64], unit: str) -> NDArray[np.float64
 
     # Convert based on declared unit
     unit = (unit or "s").lower()
-    if unit == "ms":
-        times = times / 1000.0
-    elif unit != "s":
-        # Unknown unit; attempt heuristics below
-        pass
+    divisor = 1000.0 if unit == "ms" else 1.0
+    # Unknown units fall through to the heuristics below
 
-    # Detect milliseconds or epoch time and normalize to seconds (fallback)
-    max_val = float(np.nanmax(times))
+    # Detect milliseconds or epoch time and normalize to seconds (fallback).
+    # Division is monotonic, so the max of the converted times is max / divisor
+    max_val = latest_timestamp(times) / divisor
     if max_val > 1.0e11:
-        times = times / 1000.0  # epoch ms -> s
+        divisor *= 1000.0  # epoch ms -> s
     elif max_val > 1.0e7:
         # epoch seconds (keep)
         pass
     elif max_val > 1.0e5:
-        times = times / 1000.0  # likely ms duration
+        divisor *= 1000.0  # likely ms duration
 
-    # Normalize to start at 0
-    times = times - times[0]
+    # Normalize to start at 0, then scale; both in place on the copy
+    np.subtract(times, times[0], out=times)
+    if divisor != 1.0:
+        np.divide(times, divisor, out=times)
     return times
 
 
@@ -240,12 +256,12 @@ def _normalize_speed(
     speed = _safe_array(raw.speed, len(timestamps))
     unit = (raw.speed_unit or "").lower()
 
-    if not np.all(np.isnan(speed)):
-        if unit in ("mph", "mi/h"):
-            speed = speed * 0.44704
-        elif unit in ("kph", "km/h"):
-            speed = speed * 0.277778
-        # else assume m/s
+    if not _all_nan(speed):
+        # Unknown units are assumed to be m/s already
+        factor = _SPEED_TO_MPS.get(unit)
+        if factor is not None:
+            # Out of place: speed may alias the caller's RawTelemetry array
+            speed = np.multiply(speed, factor)
         return speed, DataProvenance.MEASURED
 
     derived = _derive_speed(timestamps, x, y)
@@ -258,8 +274,11 @@ def _normalize_heading(
     y: NDArray[np.float64],
 ) -> tuple[NDArray[np.float64], DataProvenance]:
     heading = _safe_array(raw.heading, len(x))
-    if not np.all(np.isnan(heading)):
-        heading = np.mod(heading, 360.0)
+    if not _all_nan(heading):
+        # Most sources already report [0, 360); fmin/fmax skip NaN and are far
+        # cheaper than the modulo. Out of place: heading may alias RawTelemetry
+        if not (np.fmin.reduce(heading) >= 0.0 and np.fmax.reduce(heading) < 360.0):
+            heading = np.mod(heading, 360.0)
         return heading, DataProvenance.MEASURED
 
     derived = compute_heading_from_positions(x, y)
@@ -271,7 +290,7 @@ def _normalize_yaw_rate(raw: RawTelemetry, n_samples: int) -> tuple[NDArray[np.f
     unit = (raw.yaw_rate_unit or "").lower()
     if unit == "rad/s":
         yaw = np.degrees(yaw)
-    return yaw, (DataProvenance.MEASURED if not np.all(np.isnan(yaw)) else DataProvenance.DERIVED)
+    return yaw, (DataProvenance.MEASURED if not _all_nan(yaw) else DataProvenance.DERIVED)
 
 
 def _anchor_start_position(
@@ -285,7 +304,8 @@ def _anchor_start_position(
     if not ANCHOR_START_XY:
         return x, y, validity
 
-    valid_pos = validity.get("x", np.zeros_like(x, dtype=bool)) & validity.get("y", np.zeros_like(y, dtype=bool))
+    # The fused validity pass always provides both masks
+    valid_pos = validity["x"] & validity["y"]
     if not np.any(valid_pos):
         return x, y, validity
 
@@ -294,124 +314,93 @@ def _anchor_start_position(
 
     if math.isnan(x0) or math.isnan(y0):
         return x, y, validity
+    # Already anchored when the ENU origin is the first fix and nothing was trimmed
+    if x0 == 0.0 and y0 == 0.0:
+        return x, y, validity
 
-    x_shifted = x - x0
-    y_shifted = y - y0
+    # In place: x and y are gps_to_enu outputs (or prefix views of them) that
+    # this module owns, never the caller's RawTelemetry arrays
+    np.subtract(x, x0, out=x)
+    np.subtract(y, y0, out=y)
 
-    return x_shifted, y_shifted, validity
+    return x, y, validity
 
 
-def _trim_leading_idle(
-    threshold_g: float,
-    timestamps: NDArray[np.float64],
-    x: NDArray[np.float64],
-    y: NDArray[np.float64],
-    z: NDArray[np.float64],
-    speed: NDArray[np.float64],
-    heading: NDArray[np.float64],
-    yaw_rate: NDArray[np.float64],
-    ax: NDArray[np.float64],
-    ay: NDArray[np.float64],
-    gps_accuracy: NDArray[np.float64],
-    gps_update: NDArray[np.bool_],
-    lap_number: Optional[NDArray[np.int32]],
-    total_g: NDArray[np.float64],
-    validity: dict[str, NDArray[np.bool_]],
-):
+def _idle_start_index(threshold_g: float, total_g: NDArray[np.float64]) -> int:
     """
-    Drop leading samples until total G exceeds threshold.
-    Keeps alignment across all channels and re-zeroes timestamps.
+    Index of the first sample whose total G reaches the threshold.
+
+    Returns 0 (no trim) when trimming is disabled or no sample qualifies.
     """
-    if threshold_g <= 0 or len(timestamps) == 0:
-        return (
-            timestamps,
-            x,
-            y,
-            z,
-            speed,
-            heading,
-            yaw_rate,
-            ax,
-            ay,
-            gps_accuracy,
-            gps_update,
-            lap_number,
-            total_g,
-            validity,
-        )
+    if threshold_g <= 0 or len(total_g) == 0:
+        return 0
+    # NaN compares False, so missing samples never start the run
+    above = total_g >= threshold_g
+    return int(above.argmax()) if above.any() else 0
 
-    start_idx = None
-    for i, g in enumerate(total_g):
-        if not math.isnan(g) and g >= threshold_g:
-            start_idx = i
-            break
-
-    if start_idx is None or start_idx == 0:
-        return (
-            timestamps,
-            x,
-            y,
-            z,
-            speed,
-            heading,
-            yaw_rate,
-            ax,
-            ay,
-            gps_accuracy,
-            gps_update,
-            lap_number,
-            total_g,
-            validity,
-        )
 
-    sl = slice(start_idx, None)
-    def _trim(arr):
-        return arr[sl] if arr is not None else None
-
-    timestamps = timestamps[sl] - timestamps[sl][0]
-    x = _trim(x)
-    y = _trim(y)
-    z = _trim(z)
-    speed = _trim(speed)
-    heading = _trim(heading)
-    yaw_rate = _trim(yaw_rate)
-    ax = _trim(ax)
-    ay = _trim(ay)
-    gps_accuracy = _trim(gps_accuracy)
-    gps_update = _trim(gps_update)
-    lap_number = _trim(lap_number) if lap_number is not None else None
-    total_g = _trim(total_g)
-    validity = {k: _trim(v) for k, v in validity.items()}
-
-    return (
-        timestamps,
-        x,
-        y,
-        z,
-        speed,
-        heading,
-        yaw_rate,
-        ax,
-        ay,
-        gps_accuracy,
-        gps_update,
-        lap_number,
-        total_g,
-        validity,
-    )
+@njit(cache=True)
+def _derive_speed_kernel(timestamps, x, y):
+    """
+    Backward-difference speed in one pass (compiled when Numba is available).
+
+    Same semantics as _derive_speed_numpy: zero dt yields NaN and the first
+    sample copies the second.
+    """
+    n = timestamps.shape[0]
+    speed = np.empty(n)
+    if n == 0:
+        return speed
+    speed[0] = np.nan
+    for i in range(1, n):
+        dt = timestamps[i] - timestamps[i - 1]
+        if dt == 0:
+            speed[i] = np.nan
+        else:
+            dx = x[i] - x[i - 1]
+            dy = y[i] - y[i - 1]
+            speed[i] = math.hypot(dx, dy) / dt
+    if n > 1:
+        speed[0] = speed[1]
+    return speed
+
+
+def warm_canonical_kernels() -> None:
+    """Compile the Numba canonicalization kernels ahead of the first parse."""
+    if not HAVE_NUMBA:
+        return
+    zeros = np.zeros(2)
+    _derive_speed_kernel(np.array([0.0, 1.0]), zeros, zeros)
+    _validate_kernel(np.ones(2, dtype=np.bool_), *([zeros] * 7), MAX_G)
+    _all_nan_kernel(zeros)
+    warm_enu_kernel()
 
 
 def _derive_speed(
     timestamps: NDArray[np.float64],
     x: NDArray[np.float64],
     y: NDArray[np.float64],
+) -> NDArray[np.float64]:
+    if HAVE_NUMBA:
+        return _derive_speed_kernel(
+            np.ascontiguousarray(timestamps, dtype=np.float64),
+            np.ascontiguousarray(x, dtype=np.float64),
+            np.ascontiguousarray(y, dtype=np.float64),
+        )
+    return _derive_speed_numpy(timestamps, x, y)
+
+
+def _derive_speed_numpy(
+    timestamps: NDArray[np.float64],
+    x: NDArray[np.float64],
+    y: NDArray[np.float64],
 ) -> NDArray[np.float64]:
     dx = np.diff(x, prepend=x[0])
     dy = np.diff(y, prepend=y[0])
     dt = np.diff(timestamps, prepend=timestamps[0])
 
-    dt = np.where(dt == 0, np.nan, dt)
-    distance = np.sqrt(dx**2 + dy**2)
+    dt[dt == 0] = np.nan
+    distance = np.hypot(dx, dy)
     speed = distance / dt
 
     if len(speed) > 1:
@@ -419,18 +408,145 @@ def _derive_speed(
     return speed
 
 
+_VALIDITY_KEYS = ("x", "y", "speed", "heading", "ax", "ay", "yaw_rate", "total_g")
+
+
+@njit(cache=True)
+def _validate_kernel(gps_valid, east, north, speed, heading, yaw_rate, ax, ay, max_g):
+    """
+    Validity masks and validated channels in one pass (compiled when Numba is available).
+
+    Same semantics as _validate_channels_numpy. Returns one mask per
+    _VALIDITY_KEYS entry, then NaN-masked speed, ax, ay and total_g.
+    Every output is its own array so TelemetryRun can keep it without
+    copying.
+    """
+    n = east.shape[0]
+    valid_x = np.empty(n, dtype=np.bool_)
+    valid_y = np.empty(n, dtype=np.bool_)
+    valid_speed = np.empty(n, dtype=np.bool_)
+    valid_heading = np.empty(n, dtype=np.bool_)
+    valid_ax = np.empty(n, dtype=np.bool_)
+    valid_ay = np.empty(n, dtype=np.bool_)
+    valid_yaw = np.empty(n, dtype=np.bool_)
+    valid_total = np.empty(n, dtype=np.bool_)
+    speed_out = np.empty(n)
+    ax_out = np.empty(n)
+    ay_out = np.empty(n)
+    total_g = np.empty(n)
+    for i in range(n):
+        # NaN compares False, so each range check also rejects missing samples
+        ok_speed = speed[i] >= 0
+        ok_ax = abs(ax[i]) <= max_g
+        ok_ay = abs(ay[i]) <= max_g
+        valid_x[i] = gps_valid[i] and not np.isnan(east[i])
+        valid_y[i] = gps_valid[i] and not np.isnan(north[i])
+        valid_speed[i] = ok_speed
+        valid_heading[i] = not np.isnan(heading[i])
+        valid_ax[i] = ok_ax
+        valid_ay[i] = ok_ay
+        valid_yaw[i] = not np.isnan(yaw_rate[i])
+        valid_total[i] = ok_ax and ok_ay
+        speed_out[i] = speed[i] if ok_speed else np.nan
+        ax_out[i] = ax[i] if ok_ax else np.nan
+        ay_out[i] = ay[i] if ok_ay else np.nan
+        total_g[i] = math.hypot(ax[i], ay[i]) if ok_ax and ok_ay else np.nan
+    masks = (
+        valid_x, valid_y, valid_speed, valid_heading,
+        valid_ax, valid_ay, valid_yaw, valid_total,
+    )
+    return masks, speed_out, ax_out, ay_out, total_g
+
+
+def _validate_channels(
+    gps_valid: NDArray[np.bool_],
+    east: NDArray[np.float64],
+    north: NDArray[np.float64],
+    speed: NDArray[np.float64],
+    heading: NDArray[np.float64],
+    yaw_rate: NDArray[np.float64],
+    ax: NDArray[np.float64],
+    ay: NDArray[np.float64],
+):
+    """
+    Build per-channel validity masks and mask invalid samples with NaN.
+
+    Returns (validity, speed, ax, ay, total_g).
+    """
+    if not HAVE_NUMBA:
+        return _validate_channels_numpy(gps_valid, east, north, speed, heading, yaw_rate, ax, ay)
+    masks, speed, ax, ay, total_g = _validate_kernel(
+        np.ascontiguousarray(gps_valid, dtype=np.bool_),
+        *(
+            np.ascontiguousarray(arr, dtype=np.float64)
+            for arr in (east, north, speed, heading, yaw_rate, ax, ay)
+        ),
+        MAX_G,
+    )
+    validity = dict(zip(_VALIDITY_KEYS, masks))
+    return validity, speed, ax, ay, total_g
+
+
+def _validate_channels_numpy(
+    gps_valid: NDArray[np.bool_],
+    east: NDArray[np.float64],
+    north: NDArray[np.float64],
+    speed: NDArray[np.float64],
+    heading: NDArray[np.float64],
+    yaw_rate: NDArray[np.float64],
+    ax: NDArray[np.float64],
+    ay: NDArray[np.float64],
+):
+    valid_ax = _valid_g(ax)
+    valid_ay = _valid_g(ay)
+    validity: dict[str, NDArray[np.bool_]] = {
+        "x": gps_valid & ~np.isnan(east),
+        "y": gps_valid & ~np.isnan(north),
+        "speed": _valid_speed(speed),
+        "heading": ~np.isnan(heading),
+        "ax": valid_ax,
+        "ay": valid_ay,
+        "yaw_rate": ~np.isnan(yaw_rate),
+    }
+    speed = _mask_invalid(speed, validity["speed"])
+    ax = _mask_invalid(ax, valid_ax)
+    ay = _mask_invalid(ay, valid_ay)
+
+    total_g = np.hypot(ax, ay)
+    valid_total = valid_ax & valid_ay
+    total_g[~valid_total] = np.nan
+    validity["total_g"] = valid_total
+    return validity, speed, ax, ay, total_g
+
+
+def _mask_invalid(arr: NDArray[np.float64], valid: NDArray[np.bool_]) -> NDArray[np.float64]:
+    """Replace invalid samples with NaN, skipping the copy when all are valid."""
+    if valid.all():
+        return arr
+    # Out of place: arr may alias the caller's RawTelemetry array
+    return np.where(valid, arr, np.nan)
+
+
 def _valid_g(arr: NDArray[np.float64]) -> NDArray[np.bool_]:
-    return (~np.isnan(arr)) & (np.abs(arr) <= MAX_G)
+    # NaN compares False, so one comparison also rejects missing samples
+    return np.abs(arr) <= MAX_G
 
 
 def _valid_speed(arr: NDArray[np.float64]) -> NDArray[np.bool_]:
-    return (~np.isnan(arr)) & (arr >= 0)
+    return arr >= 0
 
 
-def _safe_array(arr: Optional[NDArray[np.float64]], n_samples: int) -> NDArray[np.float64]:
+def _safe_array(
+    arr: Optional[NDArray[np.floating]],
+    n_samples: int,
+    dtype: type = np.float64,
+) -> NDArray[np.floating]:
     if arr is None:
-        return np.full(n_samples, np.nan, dtype=np.float64)
-    return arr.astype(np.float64, copy=False)
+        # Read-only zero-stride view: absent channels are only read here, and
+        # TelemetryRun materializes each stored channel into its own buffer
+        return np.broadcast_to(dtype(np.nan), (n_samples,))
+    # One pass at most: casts and makes C-contiguous, no-op when already both
+    return np.ascontiguousarray(arr, dtype=dtype)
 
 
 def _safe_bool_array(arr: Optional[NDArray[np.bool_]], n_samples: int) -> NDArray[np.bool_]:
@@ -439,13 +555,46 @@ def _safe_bool_array(arr: Optional[NDArray[np.bool_]], n_samples: int) -> NDArra
     return arr.astype(np.bool_, copy=False)
 
 
+@njit(cache=True)
+def _all_nan_kernel(arr):
+    """True if every sample is NaN, stopping at the first that is not."""
+    for i in range(arr.shape[0]):
+        if not np.isnan(arr[i]):
+            return False
+    return True
+
+
 def _all_nan(*arrays: NDArray[np.float64]) -> bool:
-    return all(np.all(np.isnan(a)) for a in arrays if a is not None)
+    # A measured channel usually has a value in its first samples, so the
+    # compiled scan returns almost immediately instead of building a mask
+    return all(_all_nan_one(a) for a in arrays if a is not None)
 
 
-def _generate_id(filepath: Path) -> str:
-    import hashlib
+def _all_nan_one(a: NDArray[np.floating]) -> bool:
+    # Absent channels are zero-stride NaN views; one element decides those
+    if a.ndim == 1 and a.strides[0] == 0:
+        return a.size == 0 or bool(np.isnan(a[0]))
+    if HAVE_NUMBA:
+        # The kernel takes strided and float32 input as-is, so no copy
+        return _all_nan_kernel(a)
+    return bool(np.isnan(a).all())
+
+
+def generate_run_id(filepath: Path, stat: Optional[os.stat_result] = None) -> str:
+    """
+    Derive a run's ID from the file's name, size and mtime.
+
+    Pass `stat` when the caller already has it (e.g. from os.scandir).
+    """
+    if stat is None:
+        stat = filepath.stat()
+    return _run_id_digest(filepath.name, stat.st_size, stat.st_mtime)
+
 
-    stat = filepath.stat()
-    id_string = f"{filepath.name}_{stat.st_size}_{stat.st_mtime}"
+@lru_cache(maxsize=1024)
+def _run_id_digest(name: str, size: int, mtime: float) -> str:
+    # Run IDs appear in URLs and persisted UI state, so the digest must stay
+    # stable across installs; keep SHA-256 rather than an optional hash.
+    # Memoized because the folder scan and the later load hash the same file
+    id_string = f"{name}_{size}_{mtime}"
     return hashlib.sha256(id_string.encode()).hexdigest()[:16]
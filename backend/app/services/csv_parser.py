@@ -5,18 +5,42 @@ Parses CSV files exported from TrackAddict in RaceRender format into RawTelemetr
 Canonicalization happens in app.services.canonicalizer.
 """
 
+import csv
+import itertools
+import logging
+import multiprocessing
+import os
 import re
-import io
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 from datetime import datetime
 from pathlib import Path
-from typing import Optional, Protocol
+from typing import Iterable, Optional, Protocol, Sequence
 
 import numpy as np
 import pandas as pd
 from numpy.typing import NDArray
 
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.csv as pa_csv
+except ImportError:  # optional dependency
+    pa = None
+
 from app.models.raw import RawTelemetry
-from app.services.canonicalizer import canonicalize_raw
+from app.models.telemetry import RunMetadata
+from app.services.canonicalizer import canonicalize_raw, latest_timestamp
+from app.services.run_store import run_sidecar_path, save_run
+
+
+logger = logging.getLogger(__name__)
+
+# Worker pools are started from inside threaded servers; forking there can
+# copy locks held by other threads into the children, so never use fork
+_MP_CONTEXT = multiprocessing.get_context(
+    "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+)
 
 
 class TelemetryAdapter(Protocol):
@@ -84,6 +108,31 @@ COLUMN_MAPPINGS = {
     "lap": ["Lap", "lap", "LAP", "Lap Number", "lap_number"],
 }
 
+# Source column name -> (standard name, preference rank within its variants)
+_VARIANT_TO_STD = {
+    variant: (std_name, rank)
+    for std_name, variants in COLUMN_MAPPINGS.items()
+    for rank, variant in enumerate(variants)
+}
+
+# Every source column name the parser can map
+_KNOWN_COLUMNS = frozenset(_VARIANT_TO_STD)
+
+# First cell of a data row in exports with a preamble (RaceChrono)
+_NUMERIC_RE = re.compile(r"^-?\d+(?:\.\d+)?$")
+
+# Below this size pandas' C reader beats Arrow's thread and conversion setup
+_ARROW_MIN_BYTES = 1 << 20
+_ARROW_BLOCK_BYTES = 8 << 20
+
+# Recording date/time embedded in the file name, most specific first
+_FILENAME_DT_PATTERNS = [
+    re.compile(r"(\d{4})-(\d{2})-(\d{2})_(\d{2})(\d{2})(\d{2})"),
+    re.compile(r"(\d{4})(\d{2})(\d{2})_(\d{2})(\d{2})(\d{2})"),
+    re.compile(r"(\d{4})-(\d{2})-(\d{2})"),
+    re.compile(r"(\d{4})(\d{2})(\d{2})"),
+]
+
 
 class TrackAddictParser:
     """Parser for TrackAddict/RaceRender CSV files."""
@@ -100,11 +149,11 @@ class TrackAddictParser:
         alt = self._extract_column(df, col_map, "altitude", n_samples)
 
         speed, speed_unit = self._extract_speed(df, col_map, n_samples)
-        ax, ay = self._extract_acceleration(df, col_map, n_samples)
+        ax, ay = self._extract_acceleration(df, col_map)
         yaw_rate, yaw_unit = self._extract_yaw_rate(df, col_map, n_samples)
-        heading = self._extract_heading(df, col_map, n_samples)
+        heading = self._extract_heading(df, col_map)
 
-        gps_accuracy = self._extract_column(df, col_map, "gps_accuracy", n_samples)
+        gps_accuracy = self._extract_optional_column(df, col_map, "gps_accuracy")
         gps_update = self._extract_gps_update(df, col_map, n_samples)
         lap = self._extract_lap(df, col_map, n_samples)
 
@@ -131,41 +180,107 @@ class TrackAddictParser:
         )
 
     def _read_csv(self, filepath: Path) -> pd.DataFrame:
-        # Read the whole file once so we can detect non-standard headers
+        # Stream only as far as needed to locate the header, then let pandas
+        # read the file itself with the preamble skipped
         with open(filepath, "r", encoding="utf-8-sig") as f:
-            lines = f.read().splitlines()
-
-        if not lines:
-            return pd.DataFrame()
-
-        first_line = lines[0].strip()
-
-        # RaceRender export: header lines are comments starting with '#'
-        if first_line.startswith("# RaceRender"):
-            skip_rows = 0
-            for i, line in enumerate(lines):
-                if not line.strip().startswith("#"):
-                    skip_rows = i
-                    break
-            df = pd.read_csv(filepath, skiprows=skip_rows)
-            df.columns = df.columns.str.strip()
-            return df
-
-        # RaceChrono export: metadata block followed by a header row beginning with 'timestamp'
-        header_idx = self._find_header_line(lines)
-        if header_idx is not None and header_idx > 0:
-            data_start = self._find_data_start(lines, header_idx)
-            cleaned = "\n".join([lines[header_idx]] + lines[data_start:])
-            df = pd.read_csv(io.StringIO(cleaned))
-            df.columns = df.columns.str.strip()
-            return df
-
-        # Fallback: assume simple CSV with header on first line
-        df = pd.read_csv(filepath)
+            first_line = f.readline()
+            if not first_line:
+                return pd.DataFrame()
+
+            # Header row when the preamble is a plain line count, which is
+            # all the Arrow reader supports
+            header_line: Optional[str] = None
+
+            # RaceRender export: header lines are comments starting with '#'
+            if first_line.strip().startswith("# RaceRender"):
+                skip_rows = 0
+                for i, line in enumerate(f, start=1):
+                    if not line.strip().startswith("#"):
+                        skip_rows = i
+                        header_line = line
+                        break
+                read_kwargs = {"skiprows": skip_rows}
+            else:
+                # RaceChrono export: metadata block followed by a header row
+                # beginning with 'timestamp', then unit rows before the data
+                lines = itertools.chain([first_line], f)
+                header_idx = self._find_header_line(lines)
+                if header_idx is not None and header_idx > 0:
+                    # The header search stopped on the header row, so the
+                    # same iterator resumes right after it
+                    data_start = self._find_data_start(lines, header_idx)
+                    skipped = itertools.chain(range(header_idx), range(header_idx + 1, data_start))
+                    read_kwargs = {"skiprows": list(skipped), "encoding": "utf-8-sig"}
+                else:
+                    # Fallback: assume simple CSV with header on first line
+                    read_kwargs = {}
+                    header_line = first_line
+
+        if header_line is not None and pa is not None and filepath.stat().st_size >= _ARROW_MIN_BYTES:
+            df = self._read_csv_arrow(filepath, read_kwargs.get("skiprows", 0), header_line)
+            if df is not None:
+                return df
+
+        # Only parse columns some COLUMN_MAPPINGS entry can use; the callable
+        # is evaluated once per header cell, not per row
+        df = pd.read_csv(
+            filepath,
+            usecols=lambda name: name.strip() in _KNOWN_COLUMNS,
+            **read_kwargs,
+        )
         df.columns = df.columns.str.strip()
         return df
 
-    def _find_header_line(self, lines: list[str]) -> Optional[int]:
+    def _read_csv_arrow(
+        self,
+        filepath: Path,
+        skip_rows: int,
+        header_line: str,
+    ) -> Optional[pd.DataFrame]:
+        """
+        Read a large CSV with pyarrow's multithreaded reader.
+
+        Selects the same columns as the pandas path. Returns None (use
+        pandas) when the header has duplicate names or a cell will not
+        parse, since pandas coerces those per column instead.
+        """
+        names = next(csv.reader([header_line.rstrip("\r\n")]))
+        if len(set(names)) != len(names):
+            return None
+        wanted = [name for name in names if name.strip() in _KNOWN_COLUMNS]
+        time_names = set(COLUMN_MAPPINGS["time"])
+        # Declared types skip inference; time is left inferred since it may
+        # be clock-style text
+        column_types = {name: pa.float64() for name in wanted if name.strip() not in time_names}
+        try:
+            table = pa_csv.read_csv(
+                filepath,
+                read_options=pa_csv.ReadOptions(
+                    skip_rows=skip_rows + 1,
+                    column_names=names,
+                    block_size=_ARROW_BLOCK_BYTES,
+                ),
+                convert_options=pa_csv.ConvertOptions(
+                    include_columns=wanted,
+                    column_types=column_types,
+                ),
+            )
+        except pa.ArrowInvalid:
+            return None
+
+        for i, field in enumerate(table.schema):
+            # Arrow parses HH:MM:SS cells as time-of-day; hand them to the
+            # clock parser as text like the pandas path does
+            if field.name.strip() in time_names and not (
+                pa.types.is_integer(field.type) or pa.types.is_floating(field.type)
+            ):
+                table = table.set_column(i, field.name, table.column(i).cast(pa.string()))
+
+        df = table.to_pandas()
+        df.columns = df.columns.str.strip()
+        return df
+
+    def _find_header_line(self, lines: Iterable[str]) -> Optional[int]:
         """Locate the line index that contains the actual CSV header."""
         header_candidates = {"timestamp", "time", "gps time", "gps_time", "gpstime"}
         for i, line in enumerate(lines):
@@ -177,23 +292,30 @@ class TrackAddictParser:
                 return i
         return None
 
-    def _find_data_start(self, lines: list[str], header_idx: int) -> int:
-        """Find the first line after header that looks like numeric data."""
-        numeric = re.compile(r"^-?\d+(?:\.\d+)?$")
-        for i in range(header_idx + 1, len(lines)):
-            first_cell = lines[i].split(",")[0].strip()
-            if first_cell and numeric.match(first_cell):
+    def _find_data_start(self, lines: Iterable[str], header_idx: int) -> int:
+        """
+        Find the first line after header that looks like numeric data.
+
+        `lines` yields the lines following the header row.
+        """
+        for i, line in enumerate(lines, start=header_idx + 1):
+            first_cell = line.split(",")[0].strip()
+            if first_cell and _NUMERIC_RE.match(first_cell):
                 return i
         return header_idx + 1
 
     def _map_columns(self, columns: list[str]) -> dict[str, Optional[str]]:
-        col_map: dict[str, Optional[str]] = {}
-        for std_name, variants in COLUMN_MAPPINGS.items():
-            col_map[std_name] = None
-            for variant in variants:
-                if variant in columns:
-                    col_map[std_name] = variant
-                    break
+        col_map: dict[str, Optional[str]] = dict.fromkeys(COLUMN_MAPPINGS)
+        ranks: dict[str, int] = {}
+        for column in columns:
+            entry = _VARIANT_TO_STD.get(column)
+            if entry is None:
+                continue
+            std_name, rank = entry
+            # Earlier variants in COLUMN_MAPPINGS win when several are present
+            if rank < ranks.get(std_name, len(COLUMN_MAPPINGS[std_name])):
+                col_map[std_name] = column
+                ranks[std_name] = rank
         return col_map
 
     def _parse_time_column(
@@ -208,26 +330,15 @@ class TrackAddictParser:
         times = df[time_col].values
         unit = "s"
         if isinstance(times[0], str) and ":" in times[0]:
-            parsed = []
-            for t in times:
-                parts = t.split(":")
-                if len(parts) == 3:
-                    h, m, s = float(parts[0]), float(parts[1]), float(parts[2])
-                    parsed.append(h * 3600 + m * 60 + s)
-                elif len(parts) == 2:
-                    m, s = float(parts[0]), float(parts[1])
-                    parsed.append(m * 60 + s)
-                else:
-                    parsed.append(float(t))
-            times = np.array(parsed, dtype=np.float64)
+            times = self._parse_clock_times(df[time_col])
         else:
-            times = times.astype(np.float64)
+            times = df[time_col].to_numpy(dtype=np.float64, copy=False)
 
         col_key = time_col.lower().replace(" ", "")
         if col_key in ("gpstime", "gps_time"):
             unit = "ms"
         else:
-            max_val = float(np.nanmax(times)) if len(times) > 0 else 0.0
+            max_val = latest_timestamp(times) if len(times) > 0 else 0.0
             if max_val > 1.0e5 and max_val < 1.0e9:
                 unit = "ms"
 
@@ -235,6 +346,53 @@ class TrackAddictParser:
         times = times - times[0]
         return times, unit
 
+    @staticmethod
+    def _parse_clock_times(column: pd.Series) -> NDArray[np.float64]:
+        """
+        Parse [[HH:]MM:]SS strings to seconds.
+
+        Splits once in C and folds the fields left to right, so
+        H:M:S, M:S and plain seconds are handled without a per-row loop.
+        pd.to_timedelta is not used because it rejects the MM:SS form.
+        """
+        if pa is not None:
+            seconds = TrackAddictParser._parse_clock_times_arrow(column)
+            if seconds is not None:
+                return seconds
+
+        fields = column.astype(str).str.split(":", expand=True)
+        seconds = np.zeros(len(column), dtype=np.float64)
+        for _, field in fields.items():
+            part = pd.to_numeric(field, errors="coerce").to_numpy(dtype=np.float64)
+            present = field.notna().to_numpy()
+            seconds = np.where(present, seconds * 60.0 + part, seconds)
+        return seconds
+
+    @staticmethod
+    def _parse_clock_times_arrow(column: pd.Series) -> Optional[NDArray[np.float64]]:
+        """
+        _parse_clock_times with Arrow compute kernels.
+
+        pandas' str.split materializes a Python list per cell; Arrow splits
+        into one flat field array, which is weighted by each field's place
+        value (60 ** fields after it) and summed per row with bincount.
+        Returns None, deferring to the pandas path, if any field is not a
+        plain number, since pandas coerces those to NaN per cell.
+        """
+        try:
+            text = pa.array(column.astype(str), type=pa.string(), from_pandas=True)
+            parts = pc.split_pattern(text, ":")
+            fields = pc.cast(pc.list_flatten(parts), pa.float64())
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            return None
+        fields = fields.to_numpy(zero_copy_only=False)
+
+        # Missing cells are empty lists, and so sum to 0 like the pandas path
+        offsets = parts.offsets.to_numpy()
+        row = np.repeat(np.arange(len(column)), np.diff(offsets))
+        place = np.power(60.0, offsets[1:][row] - 1 - np.arange(len(fields)))
+        return np.bincount(row, weights=fields * place, minlength=len(column))
+
     def _extract_speed(
         self,
         df: pd.DataFrame,
@@ -246,8 +404,8 @@ class TrackAddictParser:
             ("speed_mph", "mph"),
             ("speed_kph", "kph"),
         ]:
-            speed = self._extract_column(df, col_map, speed_type, n_samples)
-            if not np.all(np.isnan(speed)):
+            speed = self._extract_optional_column(df, col_map, speed_type)
+            if speed is not None and not np.all(np.isnan(speed)):
                 return speed, unit
         return np.full(n_samples, np.nan, dtype=np.float64), None
 
@@ -255,10 +413,9 @@ class TrackAddictParser:
         self,
         df: pd.DataFrame,
         col_map: dict[str, Optional[str]],
-        n_samples: int,
-    ) -> tuple[NDArray[np.float64], NDArray[np.float64]]:
-        ax = self._extract_column(df, col_map, "accel_x", n_samples)
-        ay = self._extract_column(df, col_map, "accel_y", n_samples)
+    ) -> tuple[Optional[NDArray[np.float64]], Optional[NDArray[np.float64]]]:
+        ax = self._extract_optional_column(df, col_map, "accel_x")
+        ay = self._extract_optional_column(df, col_map, "accel_y")
         return ax, ay
 
     def _extract_yaw_rate(
@@ -276,16 +433,15 @@ class TrackAddictParser:
         if "rad" in col_lower:
             unit = "rad/s"
 
-        values = pd.to_numeric(df[col], errors="coerce").values.astype(np.float64)
+        values = pd.to_numeric(df[col], errors="coerce").to_numpy(dtype=np.float64, copy=False)
         return values, unit
 
     def _extract_heading(
         self,
         df: pd.DataFrame,
         col_map: dict[str, Optional[str]],
-        n_samples: int,
-    ) -> NDArray[np.float64]:
-        heading = self._extract_column(df, col_map, "heading", n_samples)
+    ) -> Optional[NDArray[np.float64]]:
+        heading = self._extract_optional_column(df, col_map, "heading")
         return heading
 
     def _extract_gps_update(
@@ -310,17 +466,11 @@ class TrackAddictParser:
         if col is None or col not in df.columns:
             return None
 
-        values = df[col].values
-        result = np.zeros(n_samples, dtype=np.int32)
-        current_lap = 0
-        for i, v in enumerate(values):
-            if pd.notna(v) and v != "":
-                try:
-                    current_lap = int(v)
-                except (ValueError, TypeError):
-                    pass
-            result[i] = current_lap
-        return result
+        # Unparseable or missing cells carry the previous lap forward; lap 0
+        # until the first value. astype truncates toward zero like int()
+        laps = pd.to_numeric(df[col], errors="coerce")
+        laps = laps.where(np.isfinite(laps))
+        return laps.ffill().fillna(0).to_numpy(dtype=np.float64).astype(np.int32)
 
     def _extract_column(
         self,
@@ -332,21 +482,28 @@ class TrackAddictParser:
         col = col_map.get(std_name)
         if col is None or col not in df.columns:
             return np.full(n_samples, np.nan, dtype=np.float64)
-        return pd.to_numeric(df[col], errors="coerce").values.astype(np.float64)
+        return pd.to_numeric(df[col], errors="coerce").to_numpy(dtype=np.float64, copy=False)
+
+    def _extract_optional_column(
+        self,
+        df: pd.DataFrame,
+        col_map: dict[str, Optional[str]],
+        std_name: str,
+    ) -> Optional[NDArray[np.float64]]:
+        # None rather than a NaN fill: the canonicalizer stands in a zero-stride
+        # view, so an absent channel costs one allocation (its stored buffer)
+        col = col_map.get(std_name)
+        if col is None or col not in df.columns:
+            return None
+        return pd.to_numeric(df[col], errors="coerce").to_numpy(dtype=np.float64, copy=False)
 
     def _extract_datetime(
         self,
         filepath: Path,
         df: pd.DataFrame,
     ) -> Optional[datetime]:
-        patterns = [
-            r"(\\d{4})-(\\d{2})-(\\d{2})_(\\d{2})(\\d{2})(\\d{2})",
-            r"(\\d{4})(\\d{2})(\\d{2})_(\\d{2})(\\d{2})(\\d{2})",
-            r"(\\d{4})-(\\d{2})-(\\d{2})",
-            r"(\\d{4})(\\d{2})(\\d{2})",
-        ]
-        for pattern in patterns:
-            match = re.search(pattern, filepath.stem)
+        for pattern in _FILENAME_DT_PATTERNS:
+            match = pattern.search(filepath.stem)
             if match:
                 groups = match.groups()
                 try:
@@ -409,7 +566,9 @@ class GenericCsvAdapter:
 
         def col(name: str, default=np.nan):
             if name in df.columns:
-                return pd.to_numeric(df[name], errors="coerce").values.astype(np.float64)
+                return pd.to_numeric(df[name], errors="coerce").to_numpy(
+                    dtype=np.float64, copy=False
+                )
             return np.full(len(df), default, dtype=np.float64)
 
         timestamps = col("time")
@@ -476,3 +635,81 @@ def parse_telemetry_file(
     adapter = _select_adapter(filepath)
     raw = adapter.parse(filepath)
     return canonicalize_raw(raw, origin_lat, origin_lon, origin_alt)
+
+
+def parse_telemetry_metadata(filepath: Path, sidecar_key: Optional[dict] = None) -> RunMetadata:
+    """
+    Parse a telemetry file for its run metadata only.
+
+    Duration and sample count are measured after the idle-start trim, so
+    the file is canonicalized as usual; the channel arrays are dropped on
+    return instead of being held by the caller. With `sidecar_key`, the
+    run is first saved to its run sidecar under that key (best effort), so
+    a later load of the same file skips the parse.
+    """
+    run = parse_telemetry_file(filepath)
+    if sidecar_key is not None:
+        try:
+            save_run(run, run_sidecar_path(filepath), sidecar_key)
+        except OSError as e:
+            # Read-only data folders still work, just without persistence
+            logger.debug(f"Could not write run cache for {filepath}: {e}")
+    return run.metadata
+
+
+def parse_telemetry_files(
+    filepaths: Sequence[Path],
+    origin_lat: Optional[float] = None,
+    origin_lon: Optional[float] = None,
+    origin_alt: Optional[float] = None,
+    max_workers: Optional[int] = None,
+):
+    """
+    Parse several telemetry files in worker processes.
+
+    Returns TelemetryRuns in the order of `filepaths`. Each worker does its
+    own CSV read and canonicalization, so only the finished arrays are
+    pickled back. A single file is parsed in-process.
+    """
+    parse = partial(
+        parse_telemetry_file,
+        origin_lat=origin_lat,
+        origin_lon=origin_lon,
+        origin_alt=origin_alt,
+    )
+    if len(filepaths) <= 1 or max_workers == 1:
+        return [parse(filepath) for filepath in filepaths]
+    with ProcessPoolExecutor(max_workers=max_workers, mp_context=_MP_CONTEXT) as pool:
+        return list(pool.map(parse, filepaths))
+
+
+def _metadata_or_error(filepath: Path, sidecar_key: Optional[dict] = None):
+    """parse_telemetry_metadata, returning the exception instead of raising."""
+    try:
+        return parse_telemetry_metadata(filepath, sidecar_key)
+    except Exception as e:
+        return e
+
+
+def parse_telemetry_metadata_files(
+    filepaths: Sequence[Path],
+    max_workers: Optional[int] = None,
+    sidecar_keys: Optional[Sequence[dict]] = None,
+) -> list:
+    """
+    Parse several telemetry files for their run metadata in worker processes.
+
+    Returns one RunMetadata per path, in order; a file that fails to parse
+    yields its exception in place, so one bad file does not sink the batch.
+    Runs in-process for a single file or a single worker. `sidecar_keys`,
+    one per path, makes each worker save its run sidecar itself.
+    """
+    if sidecar_keys is None:
+        sidecar_keys = [None] * len(filepaths)
+    workers = max_workers or os.cpu_count() or 1
+    if len(filepaths) <= 1 or workers == 1:
+        return [_metadata_or_error(*args) for args in zip(filepaths, sidecar_keys)]
+    # A few files per task amortizes pickling without starving workers
+    chunksize = max(1, len(filepaths) // (4 * workers))
+    with ProcessPoolExecutor(max_workers=workers, mp_context=_MP_CONTEXT) as pool:
+        return list(pool.map(_metadata_or_error, filepaths, sidecar_keys, chunksize=chunksize))
@@ -5,16 +5,127 @@ This abstraction layer allows the backend to work with CSV files now,
 and can be swapped for a real database later without touching the API.
 """
 
+import json
 import logging
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import asdict
 from pathlib import Path
 from typing import Optional
 
-from app.models.telemetry import TelemetryRun, RunSummary
-from app.services.csv_parser import parse_telemetry_file
+from app.models.telemetry import (
+    CANONICAL_VERSION,
+    TelemetryRun,
+    RunSummary,
+    warm_sampling_kernel,
+)
+from app.core.serialization import dumps
+from app.services.canonicalizer import (
+    ANCHOR_START_XY,
+    START_G_THRESHOLD,
+    generate_run_id,
+    warm_canonical_kernels,
+)
+from app.services.csv_parser import (
+    parse_telemetry_file,
+    parse_telemetry_metadata,
+    parse_telemetry_metadata_files,
+)
+from app.services.run_store import load_run, run_sidecar_path, save_run
 
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_PAYLOAD_CACHE_BYTES = 256 * 1024 * 1024
+
+# Persist each run's listing summary next to its CSV so restarts skip the parse
+SUMMARY_SIDECARS = os.getenv("AUTOCROSS_SUMMARY_SIDECARS", "1") not in ("0", "false", "False")
+SUMMARY_SIDECAR_SUFFIX = ".summary.json"
+# Persist each parsed run's arrays too, so get_run after a restart skips
+# parsing and canonicalization (see app.services.run_store)
+RUN_SIDECARS = os.getenv("AUTOCROSS_RUN_SIDECARS", "1") not in ("0", "false", "False")
+
+# Listings with at least this many unsummarized files parse them in worker
+# processes; below it, process startup costs more than it saves
+PARALLEL_PARSE_MIN_FILES = 8
+
+
+class ColumnarPayloadCache:
+    """
+    Byte-bounded LRU cache of serialized run payloads.
+    
+    Stores the encoded JSON body of /runs/{id}/data so repeat requests
+    for an unchanged run skip serialization entirely. Entries are keyed
+    by run ID, canonical model version and payload variant (encoding).
+    """
+    
+    def __init__(self, max_bytes: int = DEFAULT_PAYLOAD_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[str, bytes] = OrderedDict()
+        self._size = 0
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    @staticmethod
+    def _key(run_id: str, variant: str) -> str:
+        return f"{run_id}:{CANONICAL_VERSION}:{variant}"
+    
+    def get(self, run_id: str, variant: str = "json") -> Optional[bytes]:
+        """Return the cached payload for a run, or None."""
+        key = self._key(run_id, variant)
+        with self._lock:
+            payload = self._entries.get(key)
+            if payload is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return payload
+    
+    def put(self, run_id: str, payload: bytes, variant: str = "json") -> None:
+        """Cache a payload, evicting least recently used entries to fit."""
+        if len(payload) > self.max_bytes:
+            return
+        key = self._key(run_id, variant)
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._size -= len(old)
+            self._entries[key] = payload
+            self._size += len(payload)
+            while self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+                self.evictions += 1
+    
+    def invalidate(self, run_id: str) -> None:
+        """Drop all cached payload variants for a run."""
+        prefix = f"{run_id}:"
+        with self._lock:
+            for key in [key for key in self._entries if key.startswith(prefix)]:
+                self._size -= len(self._entries.pop(key))
+    
+    def clear(self) -> None:
+        """Drop all cached payloads."""
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+    
+    def stats(self) -> dict:
+        """Counters for the health endpoint."""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "size_bytes": self._size,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
 
 class RunRepository:
     """
@@ -24,16 +135,40 @@ class RunRepository:
     Caches parsed runs in memory for performance.
     """
     
-    def __init__(self, data_folder: Optional[Path] = None):
+    def __init__(
+        self,
+        data_folder: Optional[Path] = None,
+        payload_cache_bytes: int = DEFAULT_PAYLOAD_CACHE_BYTES,
+    ):
         """
         Initialize the repository.
         
         Args:
             data_folder: Folder containing CSV files. If None, must be set later.
+            payload_cache_bytes: Memory bound for cached serialized payloads
         """
         self._data_folder: Optional[Path] = data_folder
         self._cache: dict[str, TelemetryRun] = {}
         self._index: dict[str, Path] = {}  # id -> filepath mapping
+        self.payload_cache = ColumnarPayloadCache(payload_cache_bytes)
+        
+        # Materialized /runs listing, rebuilt after scans and reloads
+        self._cached_summaries: Optional[list[RunSummary]] = None
+        self._cached_summaries_json: Optional[bytes] = None
+        # Per-run summaries that outlive the listing: run_id -> (mtime, size,
+        # summary), so a rebuild only parses files that changed
+        self._summary_cache: dict[str, tuple[float, int, RunSummary]] = {}
+        
+        # Listings run in a worker thread while handlers on the event loop
+        # rescan and load runs. The lock guards every change to the dicts
+        # above; a listing parses on a snapshot and only publishes its
+        # result if no invalidation bumped the generation meanwhile
+        self._lock = threading.RLock()
+        self._generation = 0
+        
+        # Pay the JIT compile cost at startup rather than on the first request
+        warm_sampling_kernel()
+        warm_canonical_kernels()
         
         if data_folder is not None:
             self.scan_folder(data_folder)
@@ -42,6 +177,11 @@ class RunRepository:
     def data_folder(self) -> Optional[Path]:
         return self._data_folder
     
+    @property
+    def run_count(self) -> int:
+        """Number of indexed runs."""
+        return len(self._index)
+    
     def set_data_folder(self, folder: Path) -> int:
         """
         Set the data folder and scan for CSV files.
@@ -52,10 +192,14 @@ class RunRepository:
         Returns:
             Number of CSV files found
         """
-        self._data_folder = folder
-        self._cache.clear()
-        self._index.clear()
-        return self.scan_folder(folder)
+        with self._lock:
+            self._data_folder = folder
+            self._cache.clear()
+            self._index.clear()
+            self.payload_cache.clear()
+            self._summary_cache.clear()
+            self._invalidate_summaries()
+            return self.scan_folder(folder)
     
     def scan_folder(self, folder: Path) -> int:
         """
@@ -71,17 +215,27 @@ class RunRepository:
             logger.warning(f"Data folder does not exist: {folder}")
             return 0
         
-        count = 0
-        for csv_file in folder.glob("*.csv"):
-            if csv_file.is_file():
-                # Generate ID from filename for consistency
-                run_id = self._filepath_to_id(csv_file)
-                self._index[run_id] = csv_file
-                count += 1
+        found = {}
+        # scandir hands back each entry's stat, so indexing costs one stat
+        # per file instead of is_file() plus a second stat for the ID.
+        # Hidden files are skipped, as folder.glob("*.csv") did
+        with os.scandir(folder) as entries:
+            for entry in entries:
+                if entry.name.startswith(".") or not entry.name.endswith(".csv"):
+                    continue
+                if not entry.is_file():
+                    continue
+                csv_file = Path(entry.path)
+                run_id = self._direntry_to_id(entry)
+                found[run_id] = csv_file
                 logger.debug(f"Indexed run: {run_id} -> {csv_file.name}")
         
-        logger.info(f"Scanned {count} CSV files in {folder}")
-        return count
+        with self._lock:
+            self._index.update(found)
+            self._invalidate_summaries()
+        
+        logger.info(f"Scanned {len(found)} CSV files in {folder}")
+        return len(found)
     
     def list_runs(self) -> list[RunSummary]:
         """
@@ -90,19 +244,65 @@ class RunRepository:
         Returns:
             List of RunSummary objects
         """
+        with self._lock:
+            if self._cached_summaries is not None:
+                return list(self._cached_summaries)
+            generation = self._generation
+            index = list(self._index.items())
+            runs = dict(self._cache)
+            summary_cache = dict(self._summary_cache)
+        
         summaries = []
+        # Summary cache entries built by this listing: run_id -> (mtime, size, summary)
+        fresh = {}
+        # Files with no usable summary anywhere: (run_id, filepath, stat)
+        stale = []
         
-        for run_id, filepath in self._index.items():
+        for run_id, filepath in index:
+            try:
+                stat = filepath.stat()
+            except OSError as e:
+                logger.error(f"Failed to stat run {filepath}: {e}")
+                continue
+            cached = summary_cache.get(run_id)
+            if cached is not None and cached[:2] == (stat.st_mtime, stat.st_size):
+                summaries.append(cached[2])
+                continue
+            
             # Check cache first
-            if run_id in self._cache:
-                summaries.append(RunSummary.from_run(self._cache[run_id]))
+            if run_id in runs:
+                summary = RunSummary.from_run(runs[run_id])
+                self._write_summary_sidecar(filepath, stat, summary)
             else:
-                # Load minimally to get summary
+                summary = self._read_summary_sidecar(filepath, stat)
+                if summary is None:
+                    stale.append((run_id, filepath, stat))
+                    continue
+            fresh[run_id] = (stat.st_mtime, stat.st_size, summary)
+            summaries.append(summary)
+        
+        # Metadata only: listing should not pin every run's arrays in the
+        # run cache. The full parse happens anyway, so its arrays go to the
+        # run sidecar and the first get_run does not parse the file again
+        paths = [filepath for _, filepath, _ in stale]
+        keys = [self._run_sidecar_key(stat) for _, _, stat in stale]
+        if len(paths) >= PARALLEL_PARSE_MIN_FILES:
+            results = parse_telemetry_metadata_files(paths, sidecar_keys=keys)
+        else:
+            results = []
+            for filepath, key in zip(paths, keys):
                 try:
-                    run = self._load_run(filepath)
-                    summaries.append(RunSummary.from_run(run))
+                    results.append(parse_telemetry_metadata(filepath, key))
                 except Exception as e:
-                    logger.error(f"Failed to load run {filepath}: {e}")
+                    results.append(e)
+        for (run_id, filepath, stat), result in zip(stale, results):
+            if isinstance(result, Exception):
+                logger.error(f"Failed to load run {filepath}: {result}")
+                continue
+            summary = RunSummary.from_metadata(result)
+            self._write_summary_sidecar(filepath, stat, summary)
+            fresh[run_id] = (stat.st_mtime, stat.st_size, summary)
+            summaries.append(summary)
         
         # Sort by recorded time (newest first), then by name
         summaries.sort(
@@ -110,7 +310,29 @@ class RunRepository:
             reverse=True
         )
         
-        return summaries
+        with self._lock:
+            # A rescan or reload during the parse made this listing stale
+            if self._generation == generation:
+                self._summary_cache.update(fresh)
+                self._cached_summaries = summaries
+        return list(summaries)
+    
+    def list_runs_json(self) -> bytes:
+        """
+        List all available runs as a serialized JSON array.
+        
+        Returns:
+            Encoded JSON bytes, cached until the next scan or reload
+        """
+        with self._lock:
+            if self._cached_summaries_json is not None:
+                return self._cached_summaries_json
+            generation = self._generation
+        body = dumps([asdict(s) for s in self.list_runs()])
+        with self._lock:
+            if self._generation == generation:
+                self._cached_summaries_json = body
+        return body
     
     def get_run(self, run_id: str) -> Optional[TelemetryRun]:
         """
@@ -123,15 +345,16 @@ class RunRepository:
             TelemetryRun if found, None otherwise
         """
         # Check cache
-        if run_id in self._cache:
-            return self._cache[run_id]
+        run = self._cache.get(run_id)
+        if run is not None:
+            return run
         
         # Check index
-        if run_id not in self._index:
+        filepath = self._index.get(run_id)
+        if filepath is None:
             return None
         
         # Load and cache
-        filepath = self._index[run_id]
         try:
             run = self._load_run(filepath)
             return run
@@ -149,7 +372,9 @@ class RunRepository:
         Returns:
             TelemetryRun if found, None otherwise
         """
-        for run_id, filepath in self._index.items():
+        with self._lock:
+            index = list(self._index.items())
+        for run_id, filepath in index:
             if filepath.stem == name:
                 return self.get_run(run_id)
         return None
@@ -173,27 +398,94 @@ class RunRepository:
         Returns:
             TelemetryRun if found, None otherwise
         """
-        if run_id not in self._index:
+        filepath = self._index.get(run_id)
+        if filepath is None:
             return None
         
-        filepath = self._index[run_id]
-        
-        # Remove from cache
-        if run_id in self._cache:
-            del self._cache[run_id]
-        
+        # The old run stays cached, and its payloads valid, until the new
+        # one replaces it, so readers never fall back to a cold parse
         try:
             run = self._load_run(filepath, origin_lat, origin_lon, origin_alt)
-            return run
         except Exception as e:
             logger.error(f"Failed to reload run {run_id}: {e}")
-            return None
+            with self._lock:
+                self._cache.pop(run_id, None)
+            run = None
+        
+        with self._lock:
+            self.payload_cache.invalidate(run_id)
+            self._summary_cache.pop(run_id, None)
+            self._invalidate_summaries()
+        return run
     
     def clear_cache(self) -> None:
         """Clear the in-memory cache."""
-        self._cache.clear()
+        with self._lock:
+            self._cache.clear()
+            self.payload_cache.clear()
+            # Per-run summaries stay: list_runs revalidates each against the
+            # file's mtime and size, so a rescan does not re-parse every file
+            self._invalidate_summaries()
         logger.info("Run cache cleared")
     
+    @staticmethod
+    def _sidecar_key(stat: os.stat_result) -> dict:
+        """What a persisted summary was derived from; any change makes it stale."""
+        return {
+            "mtime": stat.st_mtime,
+            "size": stat.st_size,
+            "canonical_version": CANONICAL_VERSION,
+            # Duration and sample count are measured after the idle trim
+            "start_g": START_G_THRESHOLD,
+            "anchor_start_xy": ANCHOR_START_XY,
+        }
+    
+    def _run_sidecar_key(self, stat: os.stat_result) -> Optional[dict]:
+        """Key for a default-origin run sidecar, or None when they are disabled."""
+        return self._sidecar_key(stat) if RUN_SIDECARS else None
+    
+    def _read_summary_sidecar(self, filepath: Path, stat: os.stat_result) -> Optional[RunSummary]:
+        """Load a run's persisted summary if it is still fresh."""
+        if not SUMMARY_SIDECARS:
+            return None
+        try:
+            with open(filepath.with_suffix(SUMMARY_SIDECAR_SUFFIX), "rb") as f:
+                stored = json.load(f)
+            if stored.get("key") != self._sidecar_key(stat):
+                return None
+            # The folder may have been opened under a different path since
+            return RunSummary(**{**stored["summary"], "source_file": str(filepath)})
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.debug(f"Ignoring unreadable summary for {filepath}: {e}")
+            return None
+    
+    def _write_summary_sidecar(
+        self,
+        filepath: Path,
+        stat: os.stat_result,
+        summary: RunSummary,
+    ) -> None:
+        """Persist a run's summary next to its CSV; best effort."""
+        if not SUMMARY_SIDECARS:
+            return
+        sidecar = filepath.with_suffix(SUMMARY_SIDECAR_SUFFIX)
+        tmp = sidecar.with_name(f".{sidecar.name}.tmp")
+        try:
+            tmp.write_bytes(dumps({"key": self._sidecar_key(stat), "summary": asdict(summary)}))
+            # Atomic swap so a concurrent reader never sees a partial file
+            os.replace(tmp, sidecar)
+        except OSError as e:
+            # Read-only data folders still work, just without persistence
+            logger.debug(f"Could not write summary for {filepath}: {e}")
+    
+    def _invalidate_summaries(self) -> None:
+        # Callers hold self._lock
+        self._generation += 1
+        self._cached_summaries = None
+        self._cached_summaries_json = None
+    
     def _load_run(
         self,
         filepath: Path,
@@ -201,26 +493,38 @@ class RunRepository:
         origin_lon: Optional[float] = None,
         origin_alt: Optional[float] = None,
     ) -> TelemetryRun:
-        """Load a run from CSV and cache it."""
-        run = parse_telemetry_file(filepath, origin_lat, origin_lon, origin_alt)
-        
-        # Update cache
-        self._cache[run.metadata.id] = run
+        """Load a run from CSV (or its fresh run sidecar) and cache it."""
+        # Only the default origin is persisted; manual overrides always parse
+        default_origin = origin_lat is None and origin_lon is None and origin_alt is None
+        run = None
+        if RUN_SIDECARS and default_origin:
+            stat = filepath.stat()
+            run = load_run(run_sidecar_path(filepath), self._sidecar_key(stat), filepath)
+        if run is None:
+            run = parse_telemetry_file(filepath, origin_lat, origin_lon, origin_alt)
+            if RUN_SIDECARS and default_origin:
+                try:
+                    save_run(run, run_sidecar_path(filepath), self._sidecar_key(stat))
+                except OSError as e:
+                    # Read-only data folders still work, just without persistence
+                    logger.debug(f"Could not write run cache for {filepath}: {e}")
         
-        # Update index if needed (in case ID changed)
-        if run.metadata.id not in self._index:
-            self._index[run.metadata.id] = filepath
+        with self._lock:
+            # Update cache
+            self._cache[run.metadata.id] = run
+            
+            # Update index if needed (in case ID changed)
+            if run.metadata.id not in self._index:
+                self._index[run.metadata.id] = filepath
         
         logger.debug(f"Loaded and cached run: {run.metadata.id}")
         return run
     
-    def _filepath_to_id(self, filepath: Path) -> str:
-        """Generate a consistent ID from filepath."""
-        # Use filename + size + mtime hash for consistency
-        import hashlib
-        stat = filepath.stat()
-        id_string = f"{filepath.name}_{stat.st_size}_{stat.st_mtime}"
-        return hashlib.sha256(id_string.encode()).hexdigest()[:16]
+    def _direntry_to_id(self, entry: os.DirEntry) -> str:
+        """Generate a consistent ID from a scanned directory entry."""
+        # Same derivation as the canonicalizer so scanned IDs match loaded
+        # runs; the entry's cached stat saves a syscall per file
+        return generate_run_id(Path(entry.path), entry.stat())
 
 
 # Global repository instance (set up by app initialization)
@@ -0,0 +1,146 @@
+"""
+On-disk cache of canonicalized runs.
+
+Stores every array of a TelemetryRun in an uncompressed .npz next to its
+CSV so a restart loads the run with a few memcpys instead of re-parsing.
+Scalar state (metadata, origin, channel info) travels as a JSON member;
+nothing is pickled, so a tampered sidecar cannot execute code.
+"""
+
+import json
+import logging
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+from app.models.telemetry import (
+    FLOAT_CHANNELS,
+    DataProvenance,
+    OriginConfig,
+    ReferenceFrame,
+    RunMetadata,
+    TelemetryRun,
+)
+from app.services.canonicalizer import intern_channel_info
+
+
+logger = logging.getLogger(__name__)
+
+RUN_SIDECAR_SUFFIX = ".run.npz"
+
+_META_KEY = "meta"
+_VALIDITY_PREFIX = "valid__"
+
+
+def run_sidecar_path(filepath: Path) -> Path:
+    """Where the cached arrays for a CSV live."""
+    return filepath.with_suffix(RUN_SIDECAR_SUFFIX)
+
+
+def save_run(run: TelemetryRun, path: Path, key: dict) -> None:
+    """
+    Write a run's arrays to path, tagged with the key it was derived from.
+
+    Raises OSError if the file cannot be written.
+    """
+    metadata = run.metadata
+    meta = {
+        "key": key,
+        "metadata": {
+            "id": metadata.id,
+            "name": metadata.name,
+            "recorded_at": metadata.recorded_at.isoformat() if metadata.recorded_at else None,
+            "duration_s": metadata.duration_s,
+            "sample_count": metadata.sample_count,
+            "sample_rate_hz": metadata.sample_rate_hz,
+            "has_gps": metadata.has_gps,
+            "has_imu": metadata.has_imu,
+            "has_speed": metadata.has_speed,
+            "canonical_version": metadata.canonical_version,
+        },
+        "origin": {
+            "lat": run.origin.lat,
+            "lon": run.origin.lon,
+            "alt": run.origin.alt,
+            "manual_override": run.origin.manual_override,
+        },
+        "channel_info": {
+            name: [info.unit, info.provenance.value, info.frame.value if info.frame else None]
+            for name, info in run.channel_info.items()
+        },
+    }
+
+    arrays = {name: getattr(run, name) for name in FLOAT_CHANNELS}
+    arrays["timestamps"] = run.timestamps
+    arrays["gps_update"] = run.gps_update
+    arrays["total_g"] = run.total_g
+    if run.lap_number is not None:
+        arrays["lap_number"] = run.lap_number
+    for name, mask in run.validity.items():
+        arrays[_VALIDITY_PREFIX + name] = mask
+    # Stored as raw bytes so loading never needs allow_pickle
+    arrays[_META_KEY] = np.frombuffer(json.dumps(meta).encode("utf-8"), dtype=np.uint8)
+
+    tmp = path.with_name(f".{path.name}.tmp")
+    try:
+        with open(tmp, "wb") as f:
+            np.savez(f, **arrays)
+        # Atomic swap so a concurrent reader never sees a partial file
+        os.replace(tmp, path)
+    except OSError:
+        tmp.unlink(missing_ok=True)
+        raise
+
+
+def load_run(path: Path, key: dict, source_file: Path) -> Optional[TelemetryRun]:
+    """Load a cached run if path exists and was written under the same key."""
+    try:
+        with np.load(path, allow_pickle=False) as stored:
+            meta = json.loads(stored[_META_KEY].tobytes())
+            if meta.get("key") != key:
+                return None
+            arrays = {name: stored[name] for name in stored.files if name != _META_KEY}
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError, KeyError) as e:
+        logger.debug(f"Ignoring unreadable run cache {path}: {e}")
+        return None
+
+    try:
+        fields = meta["metadata"]
+        recorded_at = fields.pop("recorded_at")
+        metadata = RunMetadata(
+            source_file=source_file,
+            recorded_at=datetime.fromisoformat(recorded_at) if recorded_at else None,
+            **fields,
+        )
+        channel_info = {
+            name: intern_channel_info(
+                unit,
+                DataProvenance(provenance),
+                ReferenceFrame(frame) if frame else None,
+            )
+            for name, (unit, provenance, frame) in meta["channel_info"].items()
+        }
+        validity = {
+            name[len(_VALIDITY_PREFIX):]: arrays.pop(name)
+            for name in list(arrays)
+            if name.startswith(_VALIDITY_PREFIX)
+        }
+        return TelemetryRun(
+            metadata=metadata,
+            origin=OriginConfig(**meta["origin"]),
+            timestamps=arrays["timestamps"],
+            gps_update=arrays["gps_update"],
+            lap_number=arrays.get("lap_number"),
+            validity=validity,
+            channel_info=channel_info,
+            _total_g=arrays["total_g"],
+            **{name: arrays[name] for name in FLOAT_CHANNELS},
+        )
+    except (KeyError, TypeError, ValueError) as e:
+        logger.debug(f"Ignoring stale run cache {path}: {e}")
+        return None
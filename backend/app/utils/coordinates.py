@@ -5,19 +5,26 @@ Converts GPS coordinates (WGS84 lat/lon) to local East-North-Up (ENU)
 Cartesian coordinates, using the first valid point as origin by default.
 """
 
+import math
 import numpy as np
-from numpy.typing import NDArray
+from numpy.typing import ArrayLike, NDArray
 from dataclasses import dataclass
+from functools import lru_cache
 from typing import Optional
 
+from app.core.jit import HAVE_NUMBA, njit
+
 # WGS84 ellipsoid constants
 WGS84_A = 6378137.0              # Semi-major axis (meters)
 WGS84_F = 1 / 298.257223563      # Flattening
 WGS84_B = WGS84_A * (1 - WGS84_F)  # Semi-minor axis
 WGS84_E2 = 1 - (WGS84_B**2 / WGS84_A**2)  # First eccentricity squared
+_WGS84_EP2 = (WGS84_A**2 - WGS84_B**2) / WGS84_B**2  # Second eccentricity squared
+
+EARTH_MEAN_RADIUS = 6371000.0  # Spherical Earth for distance estimates (meters)
 
 
-@dataclass
+@dataclass(slots=True)
 class ENUCoordinates:
     """Result of GPS to ENU conversion."""
     east: NDArray[np.float64]    # East (X) in meters
@@ -44,17 +51,81 @@ def geodetic_to_ecef(
     Returns:
         Tuple of (X, Y, Z) ECEF coordinates in meters
     """
-    lat_rad = np.radians(lat)
-    lon_rad = np.radians(lon)
-    
-    # Prime vertical radius of curvature
-    N = WGS84_A / np.sqrt(1 - WGS84_E2 * np.sin(lat_rad)**2)
-    
-    X = (N + alt) * np.cos(lat_rad) * np.cos(lon_rad)
-    Y = (N + alt) * np.cos(lat_rad) * np.sin(lon_rad)
-    Z = (N * (1 - WGS84_E2) + alt) * np.sin(lat_rad)
-    
-    return X, Y, Z
+    # float64 throughout so the trig buffers can hold the outputs. Every
+    # buffer is passed as out=, so scalar input stays a 0-d array rather
+    # than decaying to a NumPy scalar that cannot be written into
+    lat_rad = np.radians(lat, out=np.empty(np.shape(lat)))
+    lon_rad = np.radians(lon, out=np.empty(np.shape(lon)))
+    sin_lat = np.sin(lat_rad, out=np.empty_like(lat_rad))
+    sin_lon = np.sin(lon_rad, out=np.empty_like(lon_rad))
+    # The radian buffers are not needed once their cosines are taken
+    cos_lat = np.cos(lat_rad, out=lat_rad)
+    cos_lon = np.cos(lon_rad, out=lon_rad)
+    
+    # Prime vertical radius of curvature: A / sqrt(1 - E2 * sin^2(lat))
+    N = np.multiply(sin_lat, sin_lat, out=np.empty_like(sin_lat))
+    N *= WGS84_E2
+    np.subtract(1, N, out=N)
+    np.sqrt(N, out=N)
+    np.divide(WGS84_A, N, out=N)
+    
+    # Same operation order as the closed-form expressions, written into the
+    # trig buffers: X = (N + alt) cos(lat) cos(lon), Y = ... sin(lon),
+    # Z = (N (1 - E2) + alt) sin(lat)
+    r = np.add(N, alt)
+    r *= cos_lat
+    X = np.multiply(r, cos_lon, out=cos_lon)
+    Y = np.multiply(r, sin_lon, out=sin_lon)
+    N *= 1 - WGS84_E2
+    N += alt
+    Z = np.multiply(N, sin_lat, out=sin_lat)
+    
+    # [()] unwraps 0-d results to scalars and leaves arrays as they are
+    return X[()], Y[()], Z[()]
+
+
+@lru_cache(maxsize=128)
+def _geodetic_to_ecef_scalar(lat: float, lon: float, alt: float) -> tuple[float, float, float]:
+    """
+    geodetic_to_ecef for a single point, e.g. the ENU origin.
+
+    Scalar math avoids NumPy dispatch on 1-element arrays; cached because
+    reloads with the same (manual) origin repeat the same conversion.
+    """
+    lat_rad = math.radians(lat)
+    lon_rad = math.radians(lon)
+    sin_lat = math.sin(lat_rad)
+    cos_lat = math.cos(lat_rad)
+    N = WGS84_A / math.sqrt(1 - WGS84_E2 * sin_lat * sin_lat)
+    r = (N + alt) * cos_lat
+    return (
+        r * math.cos(lon_rad),
+        r * math.sin(lon_rad),
+        (N * (1 - WGS84_E2) + alt) * sin_lat,
+    )
+
+
+@lru_cache(maxsize=128)
+def _enu_rotation(lat0: float, lon0: float) -> NDArray[np.float64]:
+    """
+    3x3 rotation taking ECEF offsets to ENU at the given origin.
+
+    Cached like _geodetic_to_ecef_scalar, so gps_to_enu and enu_to_gps
+    share one matrix per origin; the result is read-only.
+    """
+    lat0_rad = math.radians(lat0)
+    lon0_rad = math.radians(lon0)
+    sin_lat = math.sin(lat0_rad)
+    cos_lat = math.cos(lat0_rad)
+    sin_lon = math.sin(lon0_rad)
+    cos_lon = math.cos(lon0_rad)
+    rotation = np.array([
+        [-sin_lon, cos_lon, 0.0],
+        [-sin_lat * cos_lon, -sin_lat * sin_lon, cos_lat],
+        [cos_lat * cos_lon, cos_lat * sin_lon, sin_lat],
+    ])
+    rotation.setflags(write=False)
+    return rotation
 
 
 def ecef_to_enu(
@@ -78,27 +149,88 @@ def ecef_to_enu(
     Returns:
         Tuple of (East, North, Up) coordinates in meters
     """
-    lat0_rad = np.radians(lat0)
-    lon0_rad = np.radians(lon0)
+    # Offsets from origin as the rows of one (3, N) block
+    shape = np.shape(X)
+    offsets = np.empty((3, *shape))
+    np.subtract(X, X0, out=offsets[0, ...])
+    np.subtract(Y, Y0, out=offsets[1, ...])
+    np.subtract(Z, Z0, out=offsets[2, ...])
     
-    # Offset from origin
-    dX = X - X0
-    dY = Y - Y0
-    dZ = Z - Z0
-    
-    # Rotation matrix from ECEF to ENU
-    sin_lat = np.sin(lat0_rad)
-    cos_lat = np.cos(lat0_rad)
-    sin_lon = np.sin(lon0_rad)
-    cos_lon = np.cos(lon0_rad)
-    
-    east = -sin_lon * dX + cos_lon * dY
-    north = -sin_lat * cos_lon * dX - sin_lat * sin_lon * dY + cos_lat * dZ
-    up = cos_lat * cos_lon * dX + cos_lat * sin_lon * dY + sin_lat * dZ
+    # One matmul with the ECEF -> ENU rotation replaces nine scaled adds
+    enu = _enu_rotation(lat0, lon0) @ offsets.reshape(3, -1)
+    east, north, up = enu.reshape(offsets.shape)
     
     return east, north, up
 
 
+@njit(cache=True)
+def _gps_to_enu_kernel(lat, lon, alt, X0, Y0, Z0, sin_lat0, cos_lat0, sin_lon0, cos_lon0):
+    """
+    Geodetic -> ECEF -> ENU in one pass (compiled when Numba is available).
+
+    Same expressions as geodetic_to_ecef and ecef_to_enu, evaluated per
+    sample in registers; samples without a lat/lon fix come out as NaN.
+    """
+    n = lat.shape[0]
+    east = np.empty(n)
+    north = np.empty(n)
+    up = np.empty(n)
+    deg2rad = np.pi / 180.0
+    for i in range(n):
+        if np.isnan(lat[i]) or np.isnan(lon[i]):
+            east[i] = np.nan
+            north[i] = np.nan
+            up[i] = np.nan
+            continue
+        lat_rad = lat[i] * deg2rad
+        lon_rad = lon[i] * deg2rad
+        sin_lat = np.sin(lat_rad)
+        cos_lat = np.cos(lat_rad)
+        sin_lon = np.sin(lon_rad)
+        cos_lon = np.cos(lon_rad)
+        N = WGS84_A / np.sqrt(1 - WGS84_E2 * (sin_lat * sin_lat))
+        r = (N + alt[i]) * cos_lat
+        dX = r * cos_lon - X0
+        dY = r * sin_lon - Y0
+        dZ = (N * (1 - WGS84_E2) + alt[i]) * sin_lat - Z0
+        east[i] = dX * -sin_lon0 + dY * cos_lon0
+        north[i] = dX * (-sin_lat0 * cos_lon0) - dY * (sin_lat0 * sin_lon0) + dZ * cos_lat0
+        up[i] = dX * (cos_lat0 * cos_lon0) + dY * (cos_lat0 * sin_lon0) + dZ * sin_lat0
+    return east, north, up
+
+
+def warm_enu_kernel() -> None:
+    """Compile the Numba ENU kernel ahead of the first parse."""
+    if not HAVE_NUMBA:
+        return
+    zeros = np.zeros(1)
+    _gps_to_enu_kernel(zeros, zeros, zeros, 0.0, 0.0, 0.0, 0.0, 1.0, 0.0, 1.0)
+
+
+def _gps_to_enu_numpy(
+    lat: NDArray[np.float64],
+    lon: NDArray[np.float64],
+    alt: NDArray[np.float64],
+    valid_mask: NDArray[np.bool_],
+    X0: float,
+    Y0: float,
+    Z0: float,
+    lat0: float,
+    lon0: float,
+) -> tuple[NDArray[np.float64], NDArray[np.float64], NDArray[np.float64]]:
+    """NumPy fallback for _gps_to_enu_kernel."""
+    X, Y, Z = geodetic_to_ecef(lat, lon, alt)
+    east, north, up = ecef_to_enu(X, Y, Z, X0, Y0, Z0, lat0, lon0)
+    
+    # Preserve NaN for invalid points (in place; ecef_to_enu returns new arrays)
+    invalid = ~valid_mask
+    if invalid.any():
+        east[invalid] = np.nan
+        north[invalid] = np.nan
+        up[invalid] = np.nan
+    return east, north, up
+
+
 def gps_to_enu(
     lat: NDArray[np.float64],
     lon: NDArray[np.float64],
@@ -128,7 +260,9 @@ def gps_to_enu(
         alt = np.zeros_like(lat)
     
     # Find first valid point for origin if not specified
-    valid_mask = ~(np.isnan(lat) | np.isnan(lon))
+    valid_mask = np.isnan(lat)
+    np.logical_or(valid_mask, np.isnan(lon), out=valid_mask)
+    np.logical_not(valid_mask, out=valid_mask)
     
     if not np.any(valid_mask):
         # No valid GPS data - return zeros
@@ -150,23 +284,24 @@ def gps_to_enu(
     if origin_alt is None:
         origin_alt = float(alt[first_valid_idx]) if not np.isnan(alt[first_valid_idx]) else 0.0
     
-    # Convert all points to ECEF
-    X, Y, Z = geodetic_to_ecef(lat, lon, alt)
-    
     # Convert origin to ECEF
-    X0, Y0, Z0 = geodetic_to_ecef(
-        np.array([origin_lat]),
-        np.array([origin_lon]),
-        np.array([origin_alt])
-    )
-    
-    # Convert to ENU
-    east, north, up = ecef_to_enu(X, Y, Z, X0[0], Y0[0], Z0[0], origin_lat, origin_lon)
-    
-    # Preserve NaN for invalid points
-    east = np.where(valid_mask, east, np.nan)
-    north = np.where(valid_mask, north, np.nan)
-    up = np.where(valid_mask, up, np.nan)
+    X0, Y0, Z0 = _geodetic_to_ecef_scalar(origin_lat, origin_lon, origin_alt)
+    
+    if HAVE_NUMBA:
+        # The origin's sines and cosines, read back from the cached rotation
+        rotation = _enu_rotation(origin_lat, origin_lon)
+        east, north, up = _gps_to_enu_kernel(
+            np.ascontiguousarray(lat, dtype=np.float64),
+            np.ascontiguousarray(lon, dtype=np.float64),
+            np.ascontiguousarray(alt, dtype=np.float64),
+            X0, Y0, Z0,
+            float(rotation[2, 2]), float(rotation[1, 2]),
+            float(-rotation[0, 0]), float(rotation[0, 1]),
+        )
+    else:
+        east, north, up = _gps_to_enu_numpy(
+            lat, lon, alt, valid_mask, X0, Y0, Z0, origin_lat, origin_lon
+        )
     
     return ENUCoordinates(
         east=east,
@@ -199,63 +334,68 @@ def enu_to_gps(
     Returns:
         Tuple of (lat, lon, alt) arrays
     """
-    lat0_rad = np.radians(origin_lat)
-    lon0_rad = np.radians(origin_lon)
-    
-    sin_lat = np.sin(lat0_rad)
-    cos_lat = np.cos(lat0_rad)
-    sin_lon = np.sin(lon0_rad)
-    cos_lon = np.cos(lon0_rad)
-    
-    # Rotation matrix from ENU to ECEF (transpose of the one above)
-    dX = -sin_lon * east - sin_lat * cos_lon * north + cos_lat * cos_lon * up
-    dY = cos_lon * east - sin_lat * sin_lon * north + cos_lat * sin_lon * up
-    dZ = cos_lat * north + sin_lat * up
-    
-    # Get origin ECEF
-    X0, Y0, Z0 = geodetic_to_ecef(
-        np.array([origin_lat]),
-        np.array([origin_lon]),
-        np.array([origin_alt])
-    )
-    
-    # Add offset
-    X = dX + X0[0]
-    Y = dY + Y0[0]
-    Z = dZ + Z0[0]
-    
-    # Convert ECEF back to geodetic
-    # Using iterative method for accuracy
+    # Rotate ENU -> ECEF offsets (transpose of the ECEF -> ENU rotation)
+    local = np.stack(np.broadcast_arrays(east, north, up)).astype(np.float64, copy=False)
+    X, Y, Z = (_enu_rotation(origin_lat, origin_lon).T @ local.reshape(3, -1)).reshape(local.shape)
+    
+    # Add the origin ECEF offset in place on the rotated rows
+    X0, Y0, Z0 = _geodetic_to_ecef_scalar(origin_lat, origin_lon, origin_alt)
+    X += X0
+    Y += Y0
+    Z += Z0
+    
+    # Convert ECEF back to geodetic with Bowring's closed form: one pass,
+    # sub-millimetre for terrestrial altitudes, no Newton iterations
     lon = np.degrees(np.arctan2(Y, X))
     
-    # Iterative latitude calculation
-    p = np.sqrt(X**2 + Y**2)
-    lat = np.arctan2(Z, p * (1 - WGS84_E2))  # Initial estimate
-    
-    for _ in range(5):  # Usually converges in 2-3 iterations
-        N = WGS84_A / np.sqrt(1 - WGS84_E2 * np.sin(lat)**2)
-        lat = np.arctan2(Z + WGS84_E2 * N * np.sin(lat), p)
-    
-    lat = np.degrees(lat)
+    p = np.hypot(X, Y)
+    theta = np.arctan2(Z * WGS84_A, p * WGS84_B)
+    sin_theta = np.sin(theta)
+    cos_theta = np.cos(theta)
+    lat_rad = np.arctan2(
+        Z + _WGS84_EP2 * WGS84_B * sin_theta**3,
+        p - WGS84_E2 * WGS84_A * cos_theta**3,
+    )
     
-    N = WGS84_A / np.sqrt(1 - WGS84_E2 * np.sin(np.radians(lat))**2)
-    alt = p / np.cos(np.radians(lat)) - N
+    # Height form that stays well conditioned near the poles
+    sin_lat = np.sin(lat_rad)
+    alt = p * np.cos(lat_rad) + Z * sin_lat - WGS84_A * np.sqrt(1 - WGS84_E2 * sin_lat**2)
+    lat = np.degrees(lat_rad)
     
     return lat, lon, alt
 
 
-def haversine_distance(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+def _as_scalar_or_array(values: NDArray[np.float64]):
+    """Unwrap 0-d results so scalar callers keep getting a float."""
+    return float(values) if values.ndim == 0 else values
+
+
+def haversine_distance(
+    lat1: ArrayLike,
+    lon1: ArrayLike,
+    lat2: ArrayLike,
+    lon2: ArrayLike,
+):
     """
-    Calculate great-circle distance between two points.
+    Calculate great-circle distance between points.
+    
+    Inputs broadcast like NumPy ufuncs, so a whole track can be measured
+    against one point (or against itself shifted by one sample) in a
+    single call.
     
     Args:
         lat1, lon1: First point coordinates in degrees
         lat2, lon2: Second point coordinates in degrees
         
     Returns:
-        Distance in meters
+        Distance in meters: a float for scalar inputs, else an array
     """
-    R = 6371000  # Earth's mean radius in meters
+    R = EARTH_MEAN_RADIUS
+    
+    lat1 = np.asarray(lat1, dtype=np.float64)
+    lon1 = np.asarray(lon1, dtype=np.float64)
+    lat2 = np.asarray(lat2, dtype=np.float64)
+    lon2 = np.asarray(lon2, dtype=np.float64)
     
     lat1_rad = np.radians(lat1)
     lat2_rad = np.radians(lat2)
@@ -265,7 +405,62 @@ def haversine_distance(lat1: float, lon1: float, lat2: float, lon2: float) -> fl
     a = np.sin(dlat/2)**2 + np.cos(lat1_rad) * np.cos(lat2_rad) * np.sin(dlon/2)**2
     c = 2 * np.arctan2(np.sqrt(a), np.sqrt(1-a))
     
-    return R * c
+    return _as_scalar_or_array(R * c)
+
+
+def haversine_cumulative(
+    lat: NDArray[np.float64],
+    lon: NDArray[np.float64],
+) -> NDArray[np.float64]:
+    """
+    Distance travelled along a track, in one vectorized haversine call.
+    
+    Args:
+        lat, lon: Track coordinates in degrees
+        
+    Returns:
+        Cumulative distance in meters, starting at 0. Steps to or from a
+        sample without a fix add nothing.
+    """
+    lat = np.asarray(lat, dtype=np.float64)
+    lon = np.asarray(lon, dtype=np.float64)
+    distance = np.zeros(lat.shape)
+    if len(lat) > 1:
+        steps = haversine_distance(lat[:-1], lon[:-1], lat[1:], lon[1:])
+        np.nancumsum(steps, out=distance[1:])
+    return distance
+
+
+def equirectangular_distance(
+    lat1: ArrayLike,
+    lon1: ArrayLike,
+    lat2: ArrayLike,
+    lon2: ArrayLike,
+):
+    """
+    Approximate distance between nearby points.
+    
+    Treats the sphere as flat at the pair's mean latitude: one cosine and
+    one square root instead of haversine's four trig calls. Within ~0.1%
+    of haversine_distance over an autocross course (up to a few km); use
+    haversine_distance for anything longer. Broadcasts like
+    haversine_distance.
+    
+    Args:
+        lat1, lon1: First point coordinates in degrees
+        lat2, lon2: Second point coordinates in degrees
+        
+    Returns:
+        Distance in meters: a float for scalar inputs, else an array
+    """
+    lat1 = np.asarray(lat1, dtype=np.float64)
+    lon1 = np.asarray(lon1, dtype=np.float64)
+    lat2 = np.asarray(lat2, dtype=np.float64)
+    lon2 = np.asarray(lon2, dtype=np.float64)
+    
+    x = np.radians(lon2 - lon1) * np.cos(np.radians((lat1 + lat2) / 2))
+    y = np.radians(lat2 - lat1)
+    return _as_scalar_or_array(EARTH_MEAN_RADIUS * np.sqrt(x * x + y * y))
 
 
 def compute_heading_from_positions(
@@ -282,16 +477,24 @@ def compute_heading_from_positions(
     Returns:
         Heading array in degrees (0=North, 90=East)
     """
-    dx = np.diff(x, prepend=x[0])
-    dy = np.diff(y, prepend=y[0])
-    
+    n = len(x)
+    dx = np.empty(n, dtype=np.float64)
+    dy = np.empty(n, dtype=np.float64)
+    heading = np.empty(n, dtype=np.float64)
+    if n == 0:
+        return heading
+
+    np.subtract(x[1:], x[:-1], out=dx[1:])
+    np.subtract(y[1:], y[:-1], out=dy[1:])
+    # The first point reuses the first step so it gets the second point's
+    # heading; a lone point has no step and reads as North
+    dx[0] = dx[1] if n > 1 else 0.0
+    dy[0] = dy[1] if n > 1 else 0.0
+
     # atan2 gives angle from positive X axis (East)
-    # Convert to compass heading (from North, clockwise)
-    heading = np.degrees(np.arctan2(dx, dy))
-    heading = heading % 360
-    
-    # Handle first point (use second point's heading)
-    if len(heading) > 1:
-        heading[0] = heading[1]
-    
+    # Convert to compass heading (from North, clockwise). Unlike gps_to_enu
+    # this has no Numba kernel: NumPy's SIMD arctan2 beats a scalar loop
+    np.arctan2(dx, dy, out=heading)
+    np.degrees(heading, out=heading)
+    np.mod(heading, 360.0, out=heading)
     return heading
@@ -6,8 +6,154 @@ Generates realistic-looking autocross telemetry data in TrackAddict/RaceRender f
 
 import math
 import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from datetime import datetime
+from typing import Any, Callable, Optional
+
+
+# Decimal places per exported column, matching TrackAddict's own precision
+_COLUMN_DECIMALS = {
+    "Time": 3,
+    "Latitude": 7,
+    "Longitude": 7,
+    "Altitude": 1,
+    "MPH": 1,
+    "Heading": 1,
+    "X": 3,
+    "Y": 3,
+    "Accuracy": 1,
+}
+
+
+_WRITE_BUFFER_BYTES = 1 << 20
+
+# Spherical approximation used to place generated paths on the map
+_METERS_PER_DEG_LAT = 111000.0
+
+
+def _add_noise(
+    rng: np.random.Generator,
+    values: np.ndarray,
+    sigma: float,
+    buffer: np.ndarray,
+) -> None:
+    """Add N(0, sigma) noise to values in place, drawing into a reused buffer."""
+    rng.standard_normal(out=buffer)
+    buffer *= sigma
+    values += buffer
+
+
+def _write_racerender_csv(
+    output_path: Path,
+    timestamps: np.ndarray,
+    lat: np.ndarray,
+    lon: np.ndarray,
+    speed_mph: np.ndarray,
+    heading: np.ndarray,
+    long_g: np.ndarray,
+    lateral_g: np.ndarray,
+) -> None:
+    """Write a RaceRender-format CSV with pandas' C writer."""
+    n_samples = len(timestamps)
+    df = pd.DataFrame({
+        "Time": timestamps,
+        "Latitude": lat,
+        "Longitude": lon,
+        "Altitude": np.full(n_samples, 10.0),  # Constant altitude
+        "MPH": speed_mph,
+        "Heading": heading,
+        "X": long_g,
+        "Y": lateral_g,
+        "GPS_Update": np.ones(n_samples, dtype=np.int8),
+        "Accuracy": np.full(n_samples, 3.0),  # GPS accuracy
+    })
+    # Round per column rather than one float_format, so each column keeps
+    # its own precision
+    df = df.round(_COLUMN_DECIMALS)
+    
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    # to_csv already formats and encodes in chunks; a large buffer turns a
+    # typical run into a single write
+    with open(output_path, 'w', newline='', buffering=_WRITE_BUFFER_BYTES) as f:
+        f.write("# RaceRender Data\n")
+        df.to_csv(f, index=False, lineterminator="\n")
+
+
+def _local_to_gps(
+    x_local: np.ndarray,
+    y_local: np.ndarray,
+    center_lat: float,
+    center_lon: float,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Latitude/longitude of local east/north offsets around a center point."""
+    # Approximate conversion at this latitude; the scales are scalars, so
+    # math avoids a round trip through 0-d arrays
+    meters_per_deg_lon = _METERS_PER_DEG_LAT * math.cos(math.radians(center_lat))
+    lat = y_local / _METERS_PER_DEG_LAT
+    lat += center_lat
+    lon = x_local / meters_per_deg_lon
+    lon += center_lon
+    return lat, lon
+
+
+def _path_speed_heading(
+    x_local: np.ndarray,
+    y_local: np.ndarray,
+    dt: float,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Raw speed (m/s) and compass heading (degrees) from local positions."""
+    dx = np.diff(x_local, prepend=x_local[0])
+    dy = np.diff(y_local, prepend=y_local[0])
+    
+    speed_ms = np.sqrt(dx**2 + dy**2)
+    speed_ms /= dt
+    speed_ms[0] = speed_ms[1]  # Fix first sample
+    
+    heading = np.arctan2(dx, dy)
+    np.degrees(heading, out=heading)
+    np.mod(heading, 360.0, out=heading)
+    return speed_ms, heading
+
+
+def _accelerations(
+    speed_ms: np.ndarray,
+    heading: np.ndarray,
+    dt: float,
+    lateral_limit: float,
+    long_limit: float,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Lateral and longitudinal G from speed and heading, clipped to limits."""
+    g = 9.81
+    
+    # Lateral acceleration from curvature: a_lat = v^2 / r
+    # Approximate curvature from heading change
+    heading_rad = np.radians(heading)
+    dheading = np.diff(heading_rad, prepend=heading_rad[0])
+    
+    # Handle wraparound: shortest signed turn in [-pi, pi)
+    np.add(dheading, np.pi, out=dheading)
+    np.mod(dheading, 2*np.pi, out=dheading)
+    np.subtract(dheading, np.pi, out=dheading)
+    
+    # Curvature = d(heading)/ds where ds = speed * dt
+    ds = speed_ms * dt
+    np.maximum(ds, 1e-6, out=ds)  # Avoid division by zero
+    dheading /= ds
+    
+    # Lateral G = v^2 * curvature / g
+    lateral_g = speed_ms**2
+    lateral_g *= dheading
+    lateral_g /= g
+    np.clip(lateral_g, -lateral_limit, lateral_limit, out=lateral_g)
+    
+    # Longitudinal acceleration from speed change
+    long_g = np.diff(speed_ms, prepend=speed_ms[0])
+    long_g /= dt
+    long_g /= g
+    np.clip(long_g, -long_limit, long_limit, out=long_g)
+    return lateral_g, long_g
 
 
 def generate_figure_eight_run(
@@ -18,13 +164,17 @@ def generate_figure_eight_run(
     center_lon: float = -89.7898,
     loop_radius_m: float = 30.0,
     max_speed_mph: float = 45.0,
+    seed: Optional[int] = None,
 ) -> Path:
     """
     Generate a figure-8 shaped autocross run.
     
     This creates a realistic test file with GPS, speed, and acceleration data.
+    Pass `seed` for reproducible noise.
     """
     n_samples = int(duration_s * sample_rate_hz)
+    rng = np.random.default_rng(seed)
+    noise = np.empty(n_samples)
     timestamps = np.linspace(0, duration_s, n_samples)
     
     # Figure-8 parametric curve (lemniscate of Gerono)
@@ -36,85 +186,30 @@ def generate_figure_eight_run(
     y_local = loop_radius_m * np.sin(t_param) * np.cos(t_param)
     
     # Add some noise to make it realistic
-    x_local += np.random.normal(0, 0.5, n_samples)
-    y_local += np.random.normal(0, 0.5, n_samples)
+    _add_noise(rng, x_local, 0.5, noise)
+    _add_noise(rng, y_local, 0.5, noise)
     
     # Convert local meters to GPS coordinates
-    # Approximate conversion at this latitude
-    meters_per_deg_lat = 111000
-    meters_per_deg_lon = 111000 * np.cos(np.radians(center_lat))
+    lat, lon = _local_to_gps(x_local, y_local, center_lat, center_lon)
     
-    lat = center_lat + y_local / meters_per_deg_lat
-    lon = center_lon + x_local / meters_per_deg_lon
-    
-    # Calculate speed from position changes
-    dx = np.diff(x_local, prepend=x_local[0])
-    dy = np.diff(y_local, prepend=y_local[0])
+    # Calculate speed and heading from position changes
     dt = 1.0 / sample_rate_hz
-    
-    speed_ms = np.sqrt(dx**2 + dy**2) / dt
-    speed_ms[0] = speed_ms[1]  # Fix first sample
+    speed_ms, heading = _path_speed_heading(x_local, y_local, dt)
     
     # Scale to target max speed
     speed_scale = (max_speed_mph * 0.44704) / np.max(speed_ms)
     speed_ms *= speed_scale * 0.8  # Leave some headroom
     speed_mph = speed_ms / 0.44704
     
-    # Calculate heading
-    heading = np.degrees(np.arctan2(dx, dy)) % 360
-    
-    # Calculate acceleration
-    # Lateral acceleration from curvature: a_lat = v^2 / r
-    # Approximate curvature from heading change
-    heading_rad = np.radians(heading)
-    dheading = np.diff(heading_rad, prepend=heading_rad[0])
-    
-    # Handle wraparound
-    dheading = np.where(dheading > np.pi, dheading - 2*np.pi, dheading)
-    dheading = np.where(dheading < -np.pi, dheading + 2*np.pi, dheading)
-    
-    # Curvature = d(heading)/ds where ds = speed * dt
-    ds = speed_ms * dt
-    ds = np.where(ds == 0, 0.001, ds)  # Avoid division by zero
-    curvature = dheading / ds
-    
-    # Lateral G = v^2 * curvature / g
-    g = 9.81
-    lateral_g = speed_ms**2 * curvature / g
-    lateral_g = np.clip(lateral_g, -2.0, 2.0)  # Realistic limits
-    
-    # Longitudinal acceleration from speed change
-    dspeed = np.diff(speed_ms, prepend=speed_ms[0])
-    long_g = dspeed / dt / g
-    long_g = np.clip(long_g, -1.5, 1.5)
+    lateral_g, long_g = _accelerations(speed_ms, heading, dt, 2.0, 1.5)
     
     # Add noise to accelerations
-    lateral_g += np.random.normal(0, 0.05, n_samples)
-    long_g += np.random.normal(0, 0.03, n_samples)
-    
-    # Build CSV content
-    lines = ["# RaceRender Data"]
-    lines.append("Time,Latitude,Longitude,Altitude,MPH,Heading,X,Y,GPS_Update,Accuracy")
-    
-    for i in range(n_samples):
-        line = (
-            f"{timestamps[i]:.3f},"
-            f"{lat[i]:.7f},"
-            f"{lon[i]:.7f},"
-            f"10.0,"  # Constant altitude
-            f"{speed_mph[i]:.1f},"
-            f"{heading[i]:.1f},"
-            f"{long_g[i]:.3f},"
-            f"{lateral_g[i]:.3f},"
-            f"1,"
-            f"3.0"  # GPS accuracy
-        )
-        lines.append(line)
+    _add_noise(rng, lateral_g, 0.05, noise)
+    _add_noise(rng, long_g, 0.03, noise)
     
-    # Write file
-    output_path.parent.mkdir(parents=True, exist_ok=True)
-    with open(output_path, 'w') as f:
-        f.write('\n'.join(lines))
+    _write_racerender_csv(
+        output_path, timestamps, lat, lon, speed_mph, heading, long_g, lateral_g
+    )
     
     return output_path
 
@@ -128,11 +223,14 @@ def generate_slalom_run(
     cone_spacing_m: float = 15.0,
     n_cones: int = 8,
     max_speed_mph: float = 35.0,
+    seed: Optional[int] = None,
 ) -> Path:
     """
-    Generate a slalom run through cones.
+    Generate a slalom run through cones. Pass `seed` for reproducible noise.
     """
     n_samples = int(duration_s * sample_rate_hz)
+    rng = np.random.default_rng(seed)
+    noise = np.empty(n_samples)
     timestamps = np.linspace(0, duration_s, n_samples)
     
     # Sinusoidal path through cones
@@ -144,116 +242,69 @@ def generate_slalom_run(
     y_local = weave_amp * np.sin(2 * np.pi * x_local / cone_spacing_m)
     
     # Add realistic noise
-    x_local += np.random.normal(0, 0.3, n_samples)
-    y_local += np.random.normal(0, 0.3, n_samples)
+    _add_noise(rng, x_local, 0.3, noise)
+    _add_noise(rng, y_local, 0.3, noise)
     
     # Convert to GPS
-    meters_per_deg_lat = 111000
-    meters_per_deg_lon = 111000 * np.cos(np.radians(center_lat))
-    
-    lat = center_lat + y_local / meters_per_deg_lat
-    lon = center_lon + x_local / meters_per_deg_lon
+    lat, lon = _local_to_gps(x_local, y_local, center_lat, center_lon)
     
-    # Calculate speed
-    dx = np.diff(x_local, prepend=x_local[0])
-    dy = np.diff(y_local, prepend=y_local[0])
+    # Calculate speed and heading
     dt = 1.0 / sample_rate_hz
-    
-    speed_ms = np.sqrt(dx**2 + dy**2) / dt
-    speed_ms[0] = speed_ms[1]
+    speed_ms, heading = _path_speed_heading(x_local, y_local, dt)
     
     # Scale speed
     target_avg_speed = max_speed_mph * 0.44704 * 0.7
     speed_ms = speed_ms / np.mean(speed_ms) * target_avg_speed
     speed_mph = speed_ms / 0.44704
     
-    # Heading
-    heading = np.degrees(np.arctan2(dx, dy)) % 360
+    lateral_g, long_g = _accelerations(speed_ms, heading, dt, 1.5, 1.0)
     
-    # Accelerations
-    heading_rad = np.radians(heading)
-    dheading = np.diff(heading_rad, prepend=heading_rad[0])
-    dheading = np.where(dheading > np.pi, dheading - 2*np.pi, dheading)
-    dheading = np.where(dheading < -np.pi, dheading + 2*np.pi, dheading)
-    
-    ds = speed_ms * dt
-    ds = np.where(ds == 0, 0.001, ds)
-    curvature = dheading / ds
-    
-    g = 9.81
-    lateral_g = speed_ms**2 * curvature / g
-    lateral_g = np.clip(lateral_g, -1.5, 1.5)
+    _add_noise(rng, lateral_g, 0.05, noise)
+    _add_noise(rng, long_g, 0.03, noise)
     
-    dspeed = np.diff(speed_ms, prepend=speed_ms[0])
-    long_g = dspeed / dt / g
-    long_g = np.clip(long_g, -1.0, 1.0)
-    
-    lateral_g += np.random.normal(0, 0.05, n_samples)
-    long_g += np.random.normal(0, 0.03, n_samples)
-    
-    # Build CSV
-    lines = ["# RaceRender Data"]
-    lines.append("Time,Latitude,Longitude,Altitude,MPH,Heading,X,Y,GPS_Update,Accuracy")
-    
-    for i in range(n_samples):
-        lines.append(
-            f"{timestamps[i]:.3f},"
-            f"{lat[i]:.7f},"
-            f"{lon[i]:.7f},"
-            f"10.0,"
-            f"{speed_mph[i]:.1f},"
-            f"{heading[i]:.1f},"
-            f"{long_g[i]:.3f},"
-            f"{lateral_g[i]:.3f},"
-            f"1,"
-            f"3.0"
-        )
-    
-    output_path.parent.mkdir(parents=True, exist_ok=True)
-    with open(output_path, 'w') as f:
-        f.write('\n'.join(lines))
+    _write_racerender_csv(
+        output_path, timestamps, lat, lon, speed_mph, heading, long_g, lateral_g
+    )
     
     return output_path
 
 
-def generate_test_data_set(output_folder: Path) -> list[Path]:
-    """Generate a set of test data files."""
-    output_folder.mkdir(parents=True, exist_ok=True)
-    
-    files = []
-    
+# (generator, file name, keyword arguments) for generate_test_data_set
+_TEST_DATA_SET: list[tuple[Callable[..., Path], str, dict[str, Any]]] = [
     # Figure-8 runs with different characteristics
-    files.append(generate_figure_eight_run(
-        output_folder / "run_001_figure8_fast.csv",
-        duration_s=45.0,
-        max_speed_mph=50.0,
-        loop_radius_m=35.0,
-    ))
-    
-    files.append(generate_figure_eight_run(
-        output_folder / "run_002_figure8_tight.csv",
-        duration_s=60.0,
-        max_speed_mph=35.0,
-        loop_radius_m=20.0,
-    ))
-    
+    (generate_figure_eight_run, "run_001_figure8_fast.csv",
+     dict(duration_s=45.0, max_speed_mph=50.0, loop_radius_m=35.0)),
+    (generate_figure_eight_run, "run_002_figure8_tight.csv",
+     dict(duration_s=60.0, max_speed_mph=35.0, loop_radius_m=20.0)),
     # Slalom runs
-    files.append(generate_slalom_run(
-        output_folder / "run_003_slalom_8cone.csv",
-        duration_s=25.0,
-        n_cones=8,
-        max_speed_mph=40.0,
-    ))
+    (generate_slalom_run, "run_003_slalom_8cone.csv",
+     dict(duration_s=25.0, n_cones=8, max_speed_mph=40.0)),
+    (generate_slalom_run, "run_004_slalom_12cone.csv",
+     dict(duration_s=35.0, n_cones=12, cone_spacing_m=12.0, max_speed_mph=35.0)),
+]
+
+
+def generate_test_data_set(output_folder: Path, max_workers: int = 1) -> list[Path]:
+    """
+    Generate a set of test data files.
     
-    files.append(generate_slalom_run(
-        output_folder / "run_004_slalom_12cone.csv",
-        duration_s=35.0,
-        n_cones=12,
-        cone_spacing_m=12.0,
-        max_speed_mph=35.0,
-    ))
+    With max_workers > 1 the files are generated in worker processes. The
+    default set is small enough that process start-up outweighs the work,
+    so it runs serially unless asked otherwise.
+    """
+    output_folder.mkdir(parents=True, exist_ok=True)
     
-    return files
+    if max_workers <= 1:
+        return [
+            generator(output_folder / name, **kwargs)
+            for generator, name, kwargs in _TEST_DATA_SET
+        ]
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        futures = [
+            pool.submit(generator, output_folder / name, **kwargs)
+            for generator, name, kwargs in _TEST_DATA_SET
+        ]
+        return [future.result() for future in futures]
 
 
 if __name__ == "__main__":
@@ -0,0 +1,37 @@
+"""
+Shared fixtures for the backend test suite.
+
+The standard sample CSV is written and parsed once per session. Tests
+that add, rewrite or rescan files build their own folder under tmp_path.
+"""
+
+import pytest
+
+from app.services.csv_parser import parse_trackaddict_csv
+
+
+@pytest.fixture(scope="session")
+def sample_csv_content():
+    """Standard RaceRender format CSV content."""
+    return """# RaceRender Data
+Time,Latitude,Longitude,Altitude,MPH,Heading,X,Y,GPS_Update,Accuracy
+0.000,32.9857000,-89.7898000,10.0,0.0,0.0,0.000,0.000,1,3.0
+0.100,32.9857100,-89.7897900,10.0,15.5,45.0,0.100,0.050,1,3.0
+0.200,32.9857200,-89.7897800,10.0,25.3,48.0,0.150,0.080,1,3.0
+0.300,32.9857300,-89.7897700,10.0,30.1,50.0,0.180,0.100,1,3.0
+0.400,32.9857400,-89.7897600,10.0,32.5,52.0,0.200,0.110,1,3.0
+"""
+
+
+@pytest.fixture(scope="session")
+def sample_csv_file(sample_csv_content, tmp_path_factory):
+    """The sample CSV on disk; shared, so tests must not modify it."""
+    csv_file = tmp_path_factory.mktemp("sample") / "test_run.csv"
+    csv_file.write_text(sample_csv_content)
+    return csv_file
+
+
+@pytest.fixture(scope="session")
+def sample_run(sample_csv_file):
+    """The sample CSV parsed once; shared, so tests must not modify it."""
+    return parse_trackaddict_csv(sample_csv_file)
@@ -2,32 +2,36 @@
 Tests for API endpoints.
 """
 
+import base64
+import json
 import tempfile
+import threading
 from pathlib import Path
 
+import numpy as np
 import pytest
 from fastapi.testclient import TestClient
 
 from app.main import app
+from app.services import repository
 from app.services.repository import init_repository, get_repository
 
 
-@pytest.fixture
-def sample_csv_content():
-    """Standard RaceRender format CSV content."""
-    return """# RaceRender Data
-Time,Latitude,Longitude,Altitude,MPH,Heading,X,Y,GPS_Update,Accuracy
-0.000,32.9857000,-89.7898000,10.0,0.0,0.0,0.000,0.000,1,3.0
-0.100,32.9857100,-89.7897900,10.0,15.5,45.0,0.100,0.050,1,3.0
-0.200,32.9857200,-89.7897800,10.0,25.3,48.0,0.150,0.080,1,3.0
-0.300,32.9857300,-89.7897700,10.0,30.1,50.0,0.180,0.100,1,3.0
-0.400,32.9857400,-89.7897600,10.0,32.5,52.0,0.200,0.110,1,3.0
-"""
+@pytest.fixture(scope="module")
+def client():
+    """One test client for the module; repository state is reset per test."""
+    return TestClient(app)
+
+
+@pytest.fixture(autouse=True)
+def reset_repository(monkeypatch):
+    """Start each test without a global repository."""
+    monkeypatch.setattr(repository, "_repository", None)
 
 
 @pytest.fixture
 def test_data_folder(sample_csv_content, tmp_path):
-    """Create a test data folder with sample CSVs."""
+    """Create a test data folder with sample CSVs (per test: tests rescan and rewrite it)."""
     data_folder = tmp_path / "runs"
     data_folder.mkdir()
     
@@ -39,19 +43,23 @@ def test_data_folder(sample_csv_content, tmp_path):
 
 
 @pytest.fixture
-def client_with_data(test_data_folder):
-    """Create test client with initialized repository."""
-    # Initialize repository with test data
+def client_with_data(client, test_data_folder):
+    """Test client with a repository initialized on the test data."""
     init_repository(test_data_folder)
-    
-    client = TestClient(app)
-    yield client
+    return client
 
 
 @pytest.fixture
-def client():
-    """Create test client without initialized repository."""
-    return TestClient(app)
+def parsed_metadata(monkeypatch):
+    """Names of the files parsed for run metadata, in call order."""
+    parsed = []
+    original = repository.parse_telemetry_metadata
+    monkeypatch.setattr(
+        repository,
+        "parse_telemetry_metadata",
+        lambda path, *args: parsed.append(path.name) or original(path, *args),
+    )
+    return parsed
 
 
 class TestHealthEndpoints:
@@ -80,10 +88,6 @@ class TestFolderEndpoints:
     
     def test_get_folder_info_empty(self, client):
         """Should return empty info when no folder set."""
-        # Reset repository
-        from app.services import repository
-        repository._repository = None
-        
         response = client.get("/folder")
         
         assert response.status_code == 200
@@ -119,6 +123,139 @@ class TestFolderEndpoints:
         assert response.status_code == 200
         data = response.json()
         assert data["run_count"] == 3
+    
+    def test_rescan_skips_hidden_and_non_csv_entries(self, client_with_data, test_data_folder):
+        """Only visible .csv files should be indexed, under their run IDs."""
+        content = (test_data_folder / "run_001.csv").read_text()
+        (test_data_folder / ".run_hidden.csv").write_text(content)
+        (test_data_folder / "notes.txt").write_text("not a run")
+        (test_data_folder / "archive.csv").mkdir()
+        
+        response = client_with_data.post("/folder/rescan")
+        
+        assert response.json()["run_count"] == 2
+        for run in client_with_data.get("/runs").json():
+            assert client_with_data.get(f"/runs/{run['id']}").status_code == 200
+    
+    def test_rescan_refreshes_run_listing(self, client_with_data, test_data_folder):
+        """The cached /runs listing should be rebuilt after a rescan."""
+        assert len(client_with_data.get("/runs").json()) == 2
+        
+        (test_data_folder / "run_003.csv").write_text(
+            (test_data_folder / "run_001.csv").read_text()
+        )
+        client_with_data.post("/folder/rescan")
+        
+        assert len(client_with_data.get("/runs").json()) == 3
+
+    def test_rescan_reuses_unchanged_run_summaries(
+        self, client_with_data, test_data_folder, parsed_metadata
+    ):
+        """Rebuilding the listing should only parse files not summarized yet."""
+        client_with_data.get("/runs")
+        parsed_metadata.clear()
+        (test_data_folder / "run_003.csv").write_text(
+            (test_data_folder / "run_001.csv").read_text()
+        )
+        client_with_data.post("/folder/rescan")
+        
+        assert len(client_with_data.get("/runs").json()) == 3
+        assert parsed_metadata == ["run_003.csv"]
+    
+    def test_rescan_during_listing_is_not_overwritten(
+        self, client_with_data, test_data_folder, monkeypatch
+    ):
+        """A listing that overlaps a rescan must not publish its stale result."""
+        started, release = threading.Event(), threading.Event()
+        original = repository.parse_telemetry_metadata
+
+        def blocking_parse(path, *args):
+            started.set()
+            release.wait(timeout=10)
+            return original(path, *args)
+
+        monkeypatch.setattr(repository, "parse_telemetry_metadata", blocking_parse)
+        errors = []
+
+        def list_in_background():
+            try:
+                get_repository().list_runs_json()
+            except Exception as e:
+                errors.append(e)
+
+        listing = threading.Thread(target=list_in_background)
+        listing.start()
+        assert started.wait(timeout=10)
+        (test_data_folder / "run_003.csv").write_text(
+            (test_data_folder / "run_001.csv").read_text()
+        )
+        client_with_data.post("/folder/rescan")
+        release.set()
+        listing.join(timeout=10)
+
+        assert not listing.is_alive() and errors == []
+        assert len(client_with_data.get("/runs").json()) == 3
+    
+    def test_restart_reads_persisted_summaries(
+        self, client_with_data, test_data_folder, parsed_metadata
+    ):
+        """A fresh repository should list unchanged runs without parsing them."""
+        listing = client_with_data.get("/runs").json()
+        parsed_metadata.clear()
+        (test_data_folder / "run_002.csv").write_text(
+            (test_data_folder / "run_002.csv").read_text()
+            + "0.500,32.9857500,-89.7897500,10.0,33.0,53.0,0.200,0.110,1,3.0\n"
+        )
+        init_repository(test_data_folder)
+        
+        relisted = client_with_data.get("/runs").json()
+        assert parsed_metadata == ["run_002.csv"]
+        assert [run for run in relisted if run["name"] == "run_001"] == [
+            run for run in listing if run["name"] == "run_001"
+        ]
+    
+    def test_listing_saves_run_sidecars(self, client_with_data, monkeypatch):
+        """A cold listing should leave each run loadable without a second parse."""
+        run_id = client_with_data.get("/runs").json()[0]["id"]
+
+        def fail(*args, **kwargs):
+            raise AssertionError("run was re-parsed")
+
+        monkeypatch.setattr(repository, "parse_telemetry_file", fail)
+
+        assert get_repository().get_run(run_id) is not None
+    
+    def test_listing_does_not_cache_runs(self, client_with_data):
+        """Listing should summarize runs without holding their arrays."""
+        client_with_data.get("/runs")
+        
+        assert get_repository()._cache == {}
+
+    def test_restart_loads_persisted_runs(
+        self, client_with_data, test_data_folder, monkeypatch
+    ):
+        """A fresh repository should load an unchanged run without parsing it."""
+        run_id = client_with_data.get("/runs").json()[0]["id"]
+        first = get_repository().get_run(run_id)
+
+        def fail(*args, **kwargs):
+            raise AssertionError("run was re-parsed")
+
+        monkeypatch.setattr(repository, "parse_telemetry_file", fail)
+        init_repository(test_data_folder)
+
+        second = get_repository().get_run(run_id)
+        assert second is not None and second is not first
+        assert second.metadata == first.metadata
+        assert second.channel_info == first.channel_info
+        # Loaded channel info shares the parse path's interned instances
+        assert second.channel_info["x"] is first.channel_info["x"]
+        for name in ("timestamps", "x", "speed", "heading", "gps_update"):
+            assert getattr(second, name).dtype == getattr(first, name).dtype
+            np.testing.assert_array_equal(getattr(second, name), getattr(first, name))
+        assert second.validity.keys() == first.validity.keys()
+        np.testing.assert_array_equal(second.total_g, first.total_g)
+        assert client_with_data.get(f"/runs/{run_id}/data").status_code == 200
 
 
 class TestRunsEndpoints:
@@ -179,6 +316,74 @@ class TestRunsEndpoints:
         # Check lengths match
         assert len(data["timestamps"]) == data["metadata"]["sample_count"]
     
+    def test_get_run_data_served_from_payload_cache(self, client_with_data):
+        """Repeat /data requests should reuse the cached payload until reload."""
+        runs = client_with_data.get("/runs").json()
+        run_id = runs[0]["id"]
+        cache = get_repository().payload_cache
+        
+        first = client_with_data.get(f"/runs/{run_id}/data")
+        second = client_with_data.get(f"/runs/{run_id}/data")
+        
+        assert second.content == first.content
+        assert cache.stats()["hits"] == 1
+        assert cache.stats()["entries"] == 1
+        
+        client_with_data.post(
+            f"/runs/{run_id}/reload",
+            json={"origin_lat": 32.986, "origin_lon": -89.790}
+        )
+        assert cache.get(run_id) is None
+        
+        reloaded = client_with_data.get(f"/runs/{run_id}/data").json()
+        assert reloaded["metadata"]["origin"]["manual_override"] == True
+    
+    def test_get_run_data_gzip(self, client_with_data):
+        """Gzip-capable clients should receive a compressed /data body."""
+        runs = client_with_data.get("/runs").json()
+        run_id = runs[0]["id"]
+        
+        compressed = client_with_data.get(
+            f"/runs/{run_id}/data", headers={"Accept-Encoding": "gzip"}
+        )
+        plain = client_with_data.get(
+            f"/runs/{run_id}/data", headers={"Accept-Encoding": "identity"}
+        )
+        
+        refused = client_with_data.get(
+            f"/runs/{run_id}/data", headers={"Accept-Encoding": "gzip;q=0, identity"}
+        )
+        
+        assert compressed.headers["content-encoding"] == "gzip"
+        assert "content-encoding" not in plain.headers
+        assert "content-encoding" not in refused.headers
+        for response in (compressed, plain, refused):
+            assert "Accept-Encoding" in response.headers["vary"]
+        assert compressed.json() == plain.json() == refused.json()
+    
+    def test_get_run_data_ndjson(self, client_with_data):
+        """format=ndjson should stream a header line then one line per array."""
+        runs = client_with_data.get("/runs").json()
+        run_id = runs[0]["id"]
+        
+        response = client_with_data.get(
+            f"/runs/{run_id}/data", params={"format": "ndjson"}
+        )
+        
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        
+        header = lines[0]
+        assert header["metadata"]["id"] == run_id
+        channels = {line["channel"]: line["data"] for line in lines if "channel" in line}
+        validity = {line["validity"]: line["data"] for line in lines if "validity" in line}
+        
+        full = client_with_data.get(f"/runs/{run_id}/data").json()
+        assert channels["timestamps"] == full["timestamps"]
+        assert channels["speed"] == full["speed"]
+        assert validity == full["validity"]
+    
     def test_reload_run_with_origin_override(self, client_with_data):
         """Should reload run with new origin."""
         runs = client_with_data.get("/runs").json()
@@ -196,6 +401,21 @@ class TestRunsEndpoints:
         data = response.json()
         assert data["origin"]["manual_override"] == True
         assert data["origin"]["lat"] == 32.986
+    
+    def test_reload_run_replaces_cached_payload(self, client_with_data):
+        """Data served after a reload should reflect the new origin."""
+        runs = client_with_data.get("/runs").json()
+        run_id = runs[0]["id"]
+        client_with_data.get(f"/runs/{run_id}/data")
+        
+        client_with_data.post(
+            f"/runs/{run_id}/reload",
+            json={"origin_lat": 32.986, "origin_lon": -89.790},
+        )
+        
+        origin = client_with_data.get(f"/runs/{run_id}/data").json()["metadata"]["origin"]
+        assert origin["manual_override"] == True
+        assert origin["lat"] == 32.986
 
 
 class TestPlaybackEndpoints:
@@ -211,6 +431,28 @@ class TestPlaybackEndpoints:
         assert response.status_code == 200
         data = response.json()
         
+        assert data["run_id"] == run_id
+        assert data["format"] == "columns"
+        assert len(data["time"]) > 0
+        
+        # Every channel is a parallel array with matching validity
+        for key in ("x", "y", "speed", "heading", "ax", "ay", "yaw_rate", "total_g"):
+            assert len(data[key]) == len(data["time"])
+            assert len(data["valid"][key]) == len(data["time"])
+    
+    def test_get_playback_data_rows(self, client_with_data):
+        """Should return per-sample rows when format=rows."""
+        runs = client_with_data.get("/runs").json()
+        run_id = runs[0]["id"]
+        
+        response = client_with_data.get(
+            f"/runs/{run_id}/playback",
+            params={"format": "rows"}
+        )
+        
+        assert response.status_code == 200
+        data = response.json()
+        
         assert data["run_id"] == run_id
         assert "samples" in data
         assert len(data["samples"]) > 0
@@ -221,6 +463,74 @@ class TestPlaybackEndpoints:
         assert "x" in sample
         assert "y" in sample
         assert "speed" in sample
+        
+        columns = client_with_data.get(f"/runs/{run_id}/playback").json()
+        # Rows carry the float32 values widened to float64
+        rows_x = np.array([s["x"] for s in data["samples"]], dtype=np.float32)
+        np.testing.assert_array_equal(rows_x, np.array(columns["x"], dtype=np.float32))
+    
+    def test_get_playback_data_b64_f32(self, client_with_data):
+        """encoding=b64.f32le should return decodable float32 columns."""
+        runs = client_with_data.get("/runs").json()
+        run_id = runs[0]["id"]
+        
+        plain = client_with_data.get(f"/runs/{run_id}/playback").json()
+        response = client_with_data.get(
+            f"/runs/{run_id}/playback",
+            params={"encoding": "b64.f32le"}
+        )
+        
+        assert response.status_code == 200
+        data = response.json()
+        assert data["encoding"] == "b64.f32le"
+        
+        n = data["length"]
+        time = np.frombuffer(base64.b64decode(data["time"]), dtype="<f8")
+        np.testing.assert_array_equal(time, plain["time"])
+        
+        # Both encodings carry the same float32 values
+        speed = np.frombuffer(base64.b64decode(data["speed"]), dtype="<f4")
+        np.testing.assert_array_equal(speed, np.array(plain["speed"], dtype=np.float32))
+        
+        bits = np.frombuffer(base64.b64decode(data["valid"]["speed"]), dtype=np.uint8)
+        valid = np.unpackbits(bits, bitorder="little")[:n].astype(bool)
+        assert valid.tolist() == plain["valid"]["speed"]
+    
+    def test_get_playback_data_q_i16(self, client_with_data):
+        """encoding=q.i16 should round-trip within one quantization step."""
+        runs = client_with_data.get("/runs").json()
+        run_id = runs[0]["id"]
+        
+        plain = client_with_data.get(f"/runs/{run_id}/playback").json()
+        response = client_with_data.get(
+            f"/runs/{run_id}/playback",
+            params={"encoding": "q.i16"}
+        )
+        
+        assert response.status_code == 200
+        data = response.json()
+        assert data["encoding"] == "q.i16"
+        
+        for key in ("x", "y", "speed", "heading"):
+            channel = data[key]
+            codes = np.frombuffer(base64.b64decode(channel["data"]), dtype="<i2")
+            decoded = codes * channel["scale"] + channel["offset"]
+            valid = np.array(plain["valid"][key])
+            np.testing.assert_allclose(
+                decoded[valid], np.array(plain[key])[valid], atol=channel["scale"]
+            )
+    
+    def test_playback_rows_reject_binary_encoding(self, client_with_data):
+        """Binary encodings are only available for the columnar layout."""
+        runs = client_with_data.get("/runs").json()
+        run_id = runs[0]["id"]
+        
+        response = client_with_data.get(
+            f"/runs/{run_id}/playback",
+            params={"format": "rows", "encoding": "b64.f32le"}
+        )
+        
+        assert response.status_code == 400
     
     def test_playback_with_custom_rate(self, client_with_data):
         """Should respect custom sample rate."""
@@ -251,9 +561,9 @@ class TestPlaybackEndpoints:
         data = response.json()
         
         # All samples should be in range
-        for sample in data["samples"]:
-            assert sample["time"] >= 0.1
-            assert sample["time"] <= 0.3
+        for t in data["time"]:
+            assert t >= 0.1
+            assert t <= 0.3
     
     def test_playback_invalid_range(self, client_with_data):
         """Should return error for invalid time range."""
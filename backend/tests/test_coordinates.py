@@ -11,6 +11,8 @@ from app.utils.coordinates import (
     enu_to_gps,
     geodetic_to_ecef,
     haversine_distance,
+    haversine_cumulative,
+    equirectangular_distance,
     compute_heading_from_positions,
 )
 
@@ -88,6 +90,27 @@ class TestGPSToENU:
         assert np.isnan(result.east[1])
         assert np.isnan(result.north[1])
     
+    def test_kernel_matches_numpy(self):
+        """The fused ENU kernel should agree with the NumPy fallback."""
+        from app.utils.coordinates import _geodetic_to_ecef_scalar, _gps_to_enu_numpy
+
+        lat = np.array([32.9857, 32.9860, np.nan, 32.9870, 32.9901])
+        lon = np.array([-89.7898, -89.7890, -89.7880, np.nan, -89.7805])
+        alt = np.array([10.0, 11.0, 12.0, 13.0, np.nan])
+        valid = ~(np.isnan(lat) | np.isnan(lon))
+
+        result = gps_to_enu(lat, lon, alt)
+        X0, Y0, Z0 = _geodetic_to_ecef_scalar(
+            result.origin_lat, result.origin_lon, result.origin_alt
+        )
+        expected = _gps_to_enu_numpy(
+            lat, lon, alt, valid, X0, Y0, Z0, result.origin_lat, result.origin_lon
+        )
+
+        for actual, want in zip((result.east, result.north, result.up), expected):
+            assert_allclose(actual, want, rtol=0, atol=1e-9)
+            np.testing.assert_array_equal(np.isnan(actual), np.isnan(want))
+    
     def test_all_nan_returns_zeros(self):
         """All-NaN input should return zeros."""
         lat = np.array([np.nan, np.nan])
@@ -99,6 +122,55 @@ class TestGPSToENU:
         assert result.origin_lon == 0.0
 
 
+class TestGeodeticToECEF:
+    """Tests for geodetic to ECEF conversion."""
+
+    def test_matches_closed_form(self):
+        """Buffer-reusing implementation should equal the textbook formulas."""
+        lat = np.array([0.0, 32.9857, -45.0, np.nan])
+        lon = np.array([0.0, -89.7898, 170.0, 10.0])
+        alt = np.array([0.0, 10.0, 250.0, 0.0])
+        original = (lat.copy(), lon.copy(), alt.copy())
+
+        X, Y, Z = geodetic_to_ecef(lat, lon, alt)
+
+        a, e2 = 6378137.0, 6.69437999014e-3
+        lat_rad, lon_rad = np.radians(lat), np.radians(lon)
+        n = a / np.sqrt(1 - e2 * np.sin(lat_rad) ** 2)
+        assert_allclose(X, (n + alt) * np.cos(lat_rad) * np.cos(lon_rad), rtol=1e-12)
+        assert_allclose(Y, (n + alt) * np.cos(lat_rad) * np.sin(lon_rad), rtol=1e-12)
+        assert_allclose(Z, (n * (1 - e2) + alt) * np.sin(lat_rad), rtol=1e-12, atol=1e-6)
+        # Inputs are left untouched
+        for before, after in zip(original, (lat, lon, alt)):
+            np.testing.assert_array_equal(before, after)
+
+    def test_scalar_input(self):
+        """Plain float input should return scalars, not raise."""
+        X, Y, Z = geodetic_to_ecef(45.0, 10.0, 100.0)
+
+        assert np.ndim(X) == np.ndim(Y) == np.ndim(Z) == 0
+        assert_allclose((X, Y, Z), (4449028.16, 784483.70, 4487419.12), atol=0.01)
+
+    def test_scalar_origin_matches_array(self):
+        """The cached scalar conversion used for origins matches the array path."""
+        from app.utils.coordinates import _geodetic_to_ecef_scalar
+
+        point = (32.9857, -89.7898, 10.0)
+        expected = geodetic_to_ecef(*(np.array([v]) for v in point))
+
+        assert_allclose(_geodetic_to_ecef_scalar(*point), [v[0] for v in expected], rtol=1e-15)
+
+    def test_enu_rotation_is_cached_and_read_only(self):
+        """One shared rotation per origin, protected from in-place edits."""
+        from app.utils.coordinates import _enu_rotation
+
+        rotation = _enu_rotation(32.9857, -89.7898)
+
+        assert _enu_rotation(32.9857, -89.7898) is rotation
+        assert not rotation.flags.writeable
+        assert_allclose(rotation @ rotation.T, np.eye(3), atol=1e-15)
+
+
 class TestENUToGPS:
     """Tests for ENU to GPS conversion (inverse)."""
     
@@ -122,6 +194,23 @@ class TestENUToGPS:
         assert_allclose(lon_back, lon_orig, rtol=1e-6)
         assert_allclose(alt_back, alt_orig, rtol=1e-3)
 
+    def test_closed_form_round_trip_is_sub_millimetre(self):
+        """Bowring's inverse should recover positions to well under 1 mm,
+        including near the pole and at altitude."""
+        lat_orig = np.array([0.0, 45.0, 60.0, 89.9, -33.9])
+        lon_orig = np.array([0.0, 7.5, -120.0, 10.0, 151.2])
+        alt_orig = np.array([0.0, 500.0, 3000.0, 100.0, -50.0])
+        
+        for lat0, lon0 in zip(lat_orig, lon_orig):
+            enu = gps_to_enu(lat_orig, lon_orig, alt_orig, lat0, lon0, 0.0)
+            lat_back, lon_back, alt_back = enu_to_gps(
+                enu.east, enu.north, enu.up, lat0, lon0, 0.0
+            )
+            # 1e-8 degrees is about 1 mm on the ground
+            assert_allclose(lat_back, lat_orig, rtol=0, atol=1e-8)
+            assert_allclose(lon_back, lon_orig, rtol=0, atol=1e-8)
+            assert_allclose(alt_back, alt_orig, rtol=0, atol=1e-3)
+
 
 class TestHaversineDistance:
     """Tests for haversine distance calculation."""
@@ -141,6 +230,36 @@ class TestHaversineDistance:
         d1 = haversine_distance(32.0, -89.0, 33.0, -88.0)
         d2 = haversine_distance(33.0, -88.0, 32.0, -89.0)
         assert_allclose(d1, d2, rtol=1e-10)
+    
+    def test_array_inputs_match_scalar_calls(self):
+        """Array inputs should broadcast and match per-pair scalar calls."""
+        lat = np.array([32.9857, 32.9860, 32.9870])
+        lon = np.array([-89.7898, -89.7890, -89.7880])
+        
+        dist = haversine_distance(32.9857, -89.7898, lat, lon)
+        
+        assert isinstance(haversine_distance(32.0, -89.0, 33.0, -89.0), float)
+        assert dist.shape == (3,)
+        expected = [haversine_distance(32.9857, -89.7898, la, lo) for la, lo in zip(lat, lon)]
+        assert_allclose(dist, expected, rtol=1e-12)
+    
+    def test_cumulative_sums_steps_and_skips_gaps(self):
+        """Cumulative distance should add step lengths, skipping missing fixes."""
+        lat = np.array([32.0, 32.001, np.nan, 32.002, 32.003])
+        lon = np.full(5, -89.0)
+        step = haversine_distance(32.0, -89.0, 32.001, -89.0)
+        
+        distance = haversine_cumulative(lat, lon)
+        
+        assert_allclose(distance, [0.0, step, step, step, 2 * step], rtol=1e-9)
+        assert_allclose(haversine_cumulative(lat[:1], lon[:1]), [0.0])
+    
+    def test_equirectangular_matches_at_course_scale(self):
+        """The flat approximation should agree within 0.1% under a few km."""
+        for dlat, dlon in [(0.0, 0.0), (0.001, 0.0), (0.0, 0.005), (0.01, -0.02)]:
+            expected = haversine_distance(32.9857, -89.7898, 32.9857 + dlat, -89.7898 + dlon)
+            approx = equirectangular_distance(32.9857, -89.7898, 32.9857 + dlat, -89.7898 + dlon)
+            assert_allclose(approx, expected, rtol=1e-3)
 
 
 class TestHeadingFromPositions:
@@ -182,3 +301,14 @@ class TestHeadingFromPositions:
         heading = compute_heading_from_positions(x, y)
         
         assert_allclose(heading[1:], 270.0, atol=0.1)
+
+    def test_first_point_and_short_inputs(self):
+        """First sample copies the second; empty and single-point inputs work."""
+        x = np.array([0.0, 10.0, 10.0])
+        y = np.array([0.0, 0.0, 10.0])
+
+        heading = compute_heading_from_positions(x, y)
+
+        assert_allclose(heading, [90.0, 90.0, 0.0], atol=1e-9)
+        assert len(compute_heading_from_positions(np.array([]), np.array([]))) == 0
+        assert_allclose(compute_heading_from_positions(np.array([5.0]), np.array([5.0])), [0.0])
@@ -2,7 +2,9 @@
 Tests for TrackAddict CSV parser.
 """
 
+import dataclasses
 import tempfile
+from datetime import datetime
 from pathlib import Path
 
 import numpy as np
@@ -11,27 +13,6 @@ import pytest
 from app.services.csv_parser import TrackAddictParser, parse_trackaddict_csv
 
 
-@pytest.fixture
-def sample_csv_content():
-    """Standard RaceRender format CSV content."""
-    return """# RaceRender Data
-Time,Latitude,Longitude,Altitude,MPH,Heading,X,Y,GPS_Update,Accuracy
-0.000,32.9857000,-89.7898000,10.0,0.0,0.0,0.000,0.000,1,3.0
-0.100,32.9857100,-89.7897900,10.0,15.5,45.0,0.100,0.050,1,3.0
-0.200,32.9857200,-89.7897800,10.0,25.3,48.0,0.150,0.080,1,3.0
-0.300,32.9857300,-89.7897700,10.0,30.1,50.0,0.180,0.100,1,3.0
-0.400,32.9857400,-89.7897600,10.0,32.5,52.0,0.200,0.110,1,3.0
-"""
-
-
-@pytest.fixture
-def sample_csv_file(sample_csv_content, tmp_path):
-    """Create a temporary CSV file."""
-    csv_file = tmp_path / "test_run.csv"
-    csv_file.write_text(sample_csv_content)
-    return csv_file
-
-
 @pytest.fixture
 def simple_csv_content():
     """Simple CSV without RaceRender header."""
@@ -71,6 +52,76 @@ class TestTrackAddictParser:
         assert len(raw.timestamps) == 3
         assert not np.all(np.isnan(raw.latitude))
     
+    def test_map_columns_prefers_earlier_variants(self):
+        """When several variants exist, COLUMN_MAPPINGS order decides."""
+        col_map = TrackAddictParser()._map_columns(["Speed", "Time", "Speed (m/s)", "Extra"])
+
+        assert col_map["speed_ms"] == "Speed (m/s)"
+        assert col_map["time"] == "Time"
+        assert col_map["latitude"] is None
+
+    def test_lap_numbers_carry_forward(self, tmp_path):
+        """Blank or unparseable lap cells keep the previous lap."""
+        csv_file = tmp_path / "laps.csv"
+        csv_file.write_text(
+            "Time,Latitude,Longitude,Lap\n"
+            "0.0,32.9857,-89.7898,\n"
+            "0.1,32.9858,-89.7897,1\n"
+            "0.2,32.9859,-89.7896,\n"
+            "0.3,32.9860,-89.7895,x\n"
+            "0.4,32.9861,-89.7894,2\n"
+        )
+        raw = TrackAddictParser().parse_file(csv_file)
+        
+        np.testing.assert_array_equal(raw.lap_number, [0, 1, 1, 1, 2])
+        assert raw.lap_number.dtype == np.int32
+    
+    def test_arrow_reader_matches_pandas(self, sample_csv_file, tmp_path, monkeypatch):
+        """The pyarrow path should produce the same raw channels as pandas."""
+        pytest.importorskip("pyarrow")
+        import app.services.csv_parser as csv_parser
+        
+        monkeypatch.setattr(csv_parser, "_ARROW_MIN_BYTES", 0)
+        via_arrow = TrackAddictParser().parse_file(sample_csv_file)
+        monkeypatch.setattr(csv_parser, "_ARROW_MIN_BYTES", float("inf"))
+        via_pandas = TrackAddictParser().parse_file(sample_csv_file)
+        
+        for field in dataclasses.fields(via_arrow):
+            arrow_value = getattr(via_arrow, field.name)
+            if isinstance(arrow_value, np.ndarray):
+                pandas_value = getattr(via_pandas, field.name)
+                assert arrow_value.dtype == pandas_value.dtype, field.name
+                np.testing.assert_array_equal(arrow_value, pandas_value)
+        
+        # Cells Arrow cannot type fall back to pandas' per-column coercion
+        monkeypatch.setattr(csv_parser, "_ARROW_MIN_BYTES", 0)
+        csv_file = tmp_path / "laps.csv"
+        csv_file.write_text(
+            "Time,Latitude,Longitude,Lap\n"
+            "0.0,32.9857,-89.7898,1\n"
+            "0.1,32.9858,-89.7897,x\n"
+        )
+        np.testing.assert_array_equal(TrackAddictParser().parse_file(csv_file).lap_number, [1, 1])
+    
+    def test_parse_racechrono_format(self, tmp_path):
+        """Parser should skip RaceChrono metadata and unit rows."""
+        csv_file = tmp_path / "racechrono.csv"
+        csv_file.write_text(
+            "This file is created using RaceChrono\n"
+            "Format,3\n"
+            "\n"
+            "timestamp,latitude,longitude,speed,lateral_acc,longitudinal_acc\n"
+            "unix time,deg,deg,m/s,G,G\n"
+            ",,,,100: acc,100: acc\n"
+            "1700000000.0,32.9857,-89.7898,10.0,0.1,0.2\n"
+            "1700000000.1,32.9858,-89.7897,11.0,0.2,0.3\n"
+        )
+        raw = TrackAddictParser().parse_file(csv_file)
+        
+        assert len(raw.timestamps) == 2
+        np.testing.assert_allclose(raw.latitude, [32.9857, 32.9858])
+        np.testing.assert_allclose(raw.accel_y, [0.1, 0.2])
+    
     def test_timestamps_normalized(self, sample_csv_file):
         """Timestamps should start at 0."""
         parser = TrackAddictParser()
@@ -78,9 +129,9 @@ class TestTrackAddictParser:
 
         assert raw.timestamps[0] == 0.0
     
-    def test_gps_converted_to_enu(self, sample_csv_file):
+    def test_gps_converted_to_enu(self, sample_run):
         """GPS coordinates should be converted to ENU."""
-        run = parse_trackaddict_csv(sample_csv_file)
+        run = sample_run
         
         # First point should be at origin
         assert abs(run.x[0]) < 1e-6
@@ -89,9 +140,9 @@ class TestTrackAddictParser:
         # Later points should have moved
         assert run.x[-1] != 0.0 or run.y[-1] != 0.0
     
-    def test_speed_converted_to_ms(self, sample_csv_file):
+    def test_speed_converted_to_ms(self, sample_run):
         """Speed should be converted to m/s."""
-        run = parse_trackaddict_csv(sample_csv_file)
+        run = sample_run
         
         # MPH values in file: 0, 15.5, 25.3, 30.1, 32.5
         # At index 1: 15.5 MPH ≈ 6.93 m/s
@@ -131,20 +182,35 @@ class TestTrackAddictParser:
         run2 = parse_trackaddict_csv(sample_csv_file)
         
         assert run1.metadata.id == run2.metadata.id
+
+    def test_recorded_at_from_filename(self, simple_csv_file, tmp_path):
+        """A date/time in the file name becomes recorded_at."""
+        dated = tmp_path / "session_2024-05-01_101112.csv"
+        dated.write_text(simple_csv_file.read_text())
+
+        run = parse_trackaddict_csv(dated)
+
+        assert run.metadata.recorded_at == datetime(2024, 5, 1, 10, 11, 12)
+    
+    def test_sample_rate_from_intervals(self, simple_csv_file, tmp_path):
+        """Sample rate counts intervals; a single sample has no rate."""
+        run = parse_trackaddict_csv(simple_csv_file)
+        assert run.metadata.sample_rate_hz == pytest.approx(1.0)
+        
+        single = tmp_path / "single.csv"
+        single.write_text("Time,Latitude,Longitude\n0.0,32.9857,-89.7898\n")
+        assert parse_trackaddict_csv(single).metadata.sample_rate_hz == 0.0
     
-    def test_bounding_box(self, sample_csv_file):
+    def test_bounding_box(self, sample_run):
         """Bounding box should encompass all points."""
-        run = parse_trackaddict_csv(sample_csv_file)
+        run = sample_run
         
         min_x, min_y, max_x, max_y = run.get_bounding_box()
         
-        valid_x = run.x[~np.isnan(run.x)]
-        valid_y = run.y[~np.isnan(run.y)]
-        
-        assert min_x <= np.min(valid_x)
-        assert max_x >= np.max(valid_x)
-        assert min_y <= np.min(valid_y)
-        assert max_y >= np.max(valid_y)
+        assert min_x <= np.nanmin(run.x)
+        assert max_x >= np.nanmax(run.x)
+        assert min_y <= np.nanmin(run.y)
+        assert max_y >= np.nanmax(run.y)
 
 
 class TestParseConvenienceFunction:
@@ -157,6 +223,32 @@ class TestParseConvenienceFunction:
         assert run.metadata.sample_count == 5
         assert run.metadata.source_file == sample_csv_file
 
+    def test_parse_files_in_worker_processes(self, sample_csv_file, simple_csv_file):
+        """Batch parsing should return runs in input order, matching serial parses."""
+        from app.services.csv_parser import parse_telemetry_file, parse_telemetry_files
+
+        paths = [simple_csv_file, sample_csv_file]
+        runs = parse_telemetry_files(paths, max_workers=2)
+
+        assert [run.metadata.source_file for run in runs] == paths
+        for run, path in zip(runs, paths):
+            serial = parse_telemetry_file(path)
+            assert run.metadata.id == serial.metadata.id
+            np.testing.assert_array_equal(run.x, serial.x)
+            np.testing.assert_array_equal(run.total_g, serial.total_g)
+
+    def test_parse_metadata_in_worker_processes(self, sample_csv_file, simple_csv_file, tmp_path):
+        """Batch metadata parsing keeps input order and returns failures in place."""
+        from app.services.csv_parser import parse_telemetry_metadata, parse_telemetry_metadata_files
+
+        missing = tmp_path / "missing.csv"
+        paths = [simple_csv_file, missing, sample_csv_file]
+        results = parse_telemetry_metadata_files(paths, max_workers=2)
+
+        assert results[0] == parse_telemetry_metadata(simple_csv_file)
+        assert isinstance(results[1], Exception)
+        assert results[2] == parse_telemetry_metadata(sample_csv_file)
+
 
 class TestTimeFormats:
     """Tests for different time format handling."""
@@ -177,7 +269,36 @@ class TestTimeFormats:
         assert run.timestamps[0] == 0.0
         assert run.timestamps[1] == 1.0
         assert run.timestamps[2] == 90.5  # 1:30.5
-    
+
+    def test_ms_time_format(self, tmp_path):
+        """Parser should handle mm:ss.nn times, including past the hour."""
+        content = """Time,Latitude,Longitude,MPH
+59:59.50,32.9857,-89.7898,0.0
+60:00.00,32.9858,-89.7897,20.0
+1:00:01.00,32.9859,-89.7896,25.0
+"""
+        csv_file = tmp_path / "ms_clock_time.csv"
+        csv_file.write_text(content)
+
+        run = parse_trackaddict_csv(csv_file)
+
+        assert run.timestamps.tolist() == [0.0, 0.5, 1.5]
+
+    def test_clock_times_arrow_matches_pandas(self, monkeypatch):
+        """The Arrow clock parser should agree with the pandas fallback."""
+        pytest.importorskip("pyarrow")
+        import pandas as pd
+        import app.services.csv_parser as csv_parser
+
+        column = pd.Series(["00:00:00.00", "01:30.50", "7.25", None, "1:00:01.00"])
+        via_arrow = TrackAddictParser._parse_clock_times_arrow(column)
+        # Cells pandas would coerce to NaN are left to the pandas path
+        assert TrackAddictParser._parse_clock_times_arrow(pd.Series(["00:01", "bad"])) is None
+        monkeypatch.setattr(csv_parser, "pa", None)
+        via_pandas = TrackAddictParser._parse_clock_times(column)
+
+        np.testing.assert_array_equal(via_arrow, via_pandas)
+
     def test_milliseconds_time_format(self, tmp_path):
         """Parser should handle raw millisecond times."""
         content = """GPS Time,Latitude,Longitude,MPH
@@ -193,6 +314,13 @@ class TestTimeFormats:
         assert run.timestamps[0] == 0.0
         assert run.timestamps[1] == 1.0
 
+    def test_latest_timestamp_skips_trailing_nan(self):
+        """Unit detection should fall back to nanmax when the log ends in NaN."""
+        from app.services.canonicalizer import latest_timestamp
+
+        assert latest_timestamp(np.array([0.0, 1500.0, 3000.0])) == 3000.0
+        assert latest_timestamp(np.array([0.0, 3000.0, np.nan])) == 3000.0
+
 
 class TestMissingData:
     """Tests for handling missing data."""
@@ -220,10 +348,14 @@ class TestMissingData:
         csv_file = tmp_path / "no_accel.csv"
         csv_file.write_text(content)
         
+        raw = TrackAddictParser().parse_file(csv_file)
+        assert raw.accel_x is None and raw.accel_y is None
+
         run = parse_trackaddict_csv(csv_file)
         
         assert run.metadata.has_imu == False
         assert np.all(np.isnan(run.ax_body))
+        assert run.ax_body.flags.writeable and run.ax_body.strides == (run.ax_body.itemsize,)
     
     def test_missing_speed_derived(self, tmp_path):
         """Speed should be derived from position if missing."""
@@ -239,14 +371,99 @@ class TestMissingData:
         # Speed should be derived (not all zeros or NaN)
         assert not np.all(run.speed == 0)
         assert not np.all(np.isnan(run.speed))
+    
+    def test_absent_raw_channels_become_owned_arrays(self, tmp_path):
+        """Channels missing from RawTelemetry are stored as writable NaN arrays."""
+        from app.models.raw import RawTelemetry
+        from app.services.canonicalizer import canonicalize_raw
+
+        csv_file = tmp_path / "absent.csv"
+        csv_file.write_text("x\n")
+        for n in (1, 3):
+            coords = np.linspace(0.0, 1e-4, n)
+            raw = RawTelemetry(
+                source="test",
+                source_file=csv_file,
+                name="absent",
+                timestamps=np.arange(n, dtype=np.float64),
+                latitude=32.9857 + coords,
+                longitude=-89.7898 + coords,
+                altitude=np.zeros(n),
+                speed=np.full(n, 5.0),
+            )
+            run = canonicalize_raw(raw)
+            for channel in (run.ax_body, run.ay_body, run.yaw_rate, run.gps_accuracy):
+                assert channel.flags.writeable and channel.flags.c_contiguous
+                assert np.isnan(channel).all()
+    
+    def test_measured_heading_wrapped_to_360(self, tmp_path):
+        """Out-of-range headings are wrapped; in-range ones pass through."""
+        content = """Time,Latitude,Longitude,MPH,Heading
+0.0,32.9857,-89.7898,10.0,370.0
+1.0,32.9858,-89.7897,20.0,-10.0
+2.0,32.9859,-89.7896,25.0,
+"""
+        csv_file = tmp_path / "heading.csv"
+        csv_file.write_text(content)
+
+        run = parse_trackaddict_csv(csv_file)
+
+        np.testing.assert_allclose(run.heading[:2], [10.0, 350.0])
+        assert np.isnan(run.heading[2])
+    
+    def test_derive_speed_kernel_matches_numpy(self):
+        """The compiled speed kernel should agree with the NumPy fallback."""
+        from app.services.canonicalizer import _derive_speed, _derive_speed_numpy
+        
+        timestamps = np.array([0.0, 0.1, 0.1, 0.3, 0.4])
+        x = np.array([0.0, 1.0, 1.5, np.nan, 4.0])
+        y = np.array([0.0, 0.5, 0.5, 2.0, 3.0])
+        
+        np.testing.assert_array_equal(
+            _derive_speed(timestamps, x, y), _derive_speed_numpy(timestamps, x, y)
+        )
+
+    def test_all_nan_kernel(self):
+        """The early-exit NaN scan should match np.isnan(...).all()."""
+        from app.services.canonicalizer import _all_nan_kernel
+
+        for arr in (np.full(4, np.nan), np.array([np.nan, np.nan, 1.0]),
+                    np.array([np.inf, np.nan]), np.empty(0)):
+            assert _all_nan_kernel(arr) == np.isnan(arr).all()
+
+    def test_validate_kernel_matches_numpy(self):
+        """The fused validity kernel should agree with the NumPy fallback."""
+        from app.services.canonicalizer import (
+            _validate_channels,
+            _validate_channels_numpy,
+        )
+        
+        gps_valid = np.array([True, True, False, True, True])
+        east = np.array([0.0, np.nan, 2.0, 3.0, 4.0])
+        north = np.array([0.0, 1.0, 2.0, np.nan, 4.0])
+        speed = np.array([1.0, -0.5, np.nan, 2.0, 0.0])
+        heading = np.array([10.0, np.nan, 30.0, 40.0, 350.0])
+        yaw_rate = np.array([0.1, 0.2, np.nan, 0.4, 0.5])
+        ax = np.array([0.2, 5.0, np.nan, -0.3, 4.5])
+        ay = np.array([0.1, 0.2, 0.3, -4.6, 0.0])
+        channels = (gps_valid, east, north, speed, heading, yaw_rate, ax, ay)
+        
+        validity, *arrays = _validate_channels(*channels)
+        ref_validity, *ref_arrays = _validate_channels_numpy(*channels)
+        
+        assert list(validity) == list(ref_validity)
+        for key, mask in ref_validity.items():
+            np.testing.assert_array_equal(validity[key], mask)
+        for arr, ref in zip(arrays, ref_arrays):
+            np.testing.assert_array_equal(arr, ref)
 
 
 class TestTelemetryRunMethods:
     """Tests for TelemetryRun methods."""
     
-    def test_sample_at_time_interpolation(self, sample_csv_file):
+    def test_sample_at_time_interpolation(self, sample_run):
         """sample_at_time should interpolate between samples."""
-        run = parse_trackaddict_csv(sample_csv_file)
+        run = sample_run
         
         # Get sample at t=0.15 (between 0.1 and 0.2)
         sample = run.sample_at_time(0.15)
@@ -257,19 +474,115 @@ class TestTelemetryRunMethods:
         # (exact interpolation depends on data)
         assert sample["valid"].get("speed", False)
     
-    def test_total_g_property(self, sample_csv_file):
+    def test_sample_batch_matches_sample_at_time(self, sample_run):
+        """sample_batch should agree with per-time sample_at_time."""
+        run = sample_run
+        
+        times = np.array([-1.0, 0.0, 0.05, 0.15, 0.25, 0.4, 1.0])
+        batch = run.sample_batch(times)
+        
+        for i, t in enumerate(times):
+            sample = run.sample_at_time(t)
+            assert batch["time"][i] == sample["time"]
+            for key, valid in sample["valid"].items():
+                assert batch["valid"][key][i] == valid
+                np.testing.assert_allclose(batch[key][i], sample[key], equal_nan=True)
+    
+    def test_sample_batch_matches_numpy_path(self, sample_run):
+        """The compiled sampling kernel should agree with the NumPy fallback."""
+        run = sample_run
+        
+        ascending = np.linspace(-0.5, 1.5, 41)
+        # Monotonic cursor path, one starting mid-run, then a sequence
+        # that steps backwards
+        for times in (
+            ascending,
+            ascending[25:],
+            np.concatenate([ascending, ascending[::-3]]),
+        ):
+            batch = run.sample_batch(times)
+            reference = run._sample_batch_numpy(times)
+            
+            np.testing.assert_array_equal(batch["time"], reference["time"])
+            for key, valid in reference["valid"].items():
+                np.testing.assert_array_equal(batch["valid"][key], valid)
+                np.testing.assert_allclose(batch[key], reference[key], equal_nan=True)
+        
+        # The cached sampling block stays at storage precision
+        values, _ = run._get_lerp_matrix()
+        assert values.dtype == np.float32
+    
+    def test_channels_are_standalone_contiguous(self, sample_run):
+        """Channels built from a samples x channels matrix get their own buffers."""
+        run = sample_run
+        matrix = np.column_stack([run.x, run.y, run.speed])
+        
+        rebuilt = dataclasses.replace(
+            run, x=matrix[:, 0], y=matrix[:, 1], speed=matrix[:, 2]
+        )
+        
+        for arr in (rebuilt.x, rebuilt.y, rebuilt.speed):
+            assert arr.flags["C_CONTIGUOUS"]
+            assert not np.shares_memory(arr, matrix)
+        np.testing.assert_array_equal(rebuilt.speed, run.speed)
+
+    def test_storage_precision(self, tmp_path):
+        """Channels are float32 and timestamps float64; km-scale ENU stays within 1 cm."""
+        from app.utils.coordinates import gps_to_enu
+
+        rows = ["Time,Latitude,Longitude,MPH,X,Y"]
+        for i in range(50):
+            lat, lon = 32.9857 + i * 1e-3, -89.7898 + i * 1e-3
+            rows.append(f"{i * 0.1:.1f},{lat:.7f},{lon:.7f},60.0,0.5,0.1")
+        csv_file = tmp_path / "long_track.csv"
+        csv_file.write_text("\n".join(rows) + "\n")
+
+        run = parse_trackaddict_csv(csv_file)
+
+        assert run.timestamps.dtype == np.float64
+        for arr in (run.x, run.y, run.speed, run.heading, run.ax_body, run.total_g):
+            assert arr.dtype == np.float32
+        raw = TrackAddictParser().parse_file(csv_file)
+        enu = gps_to_enu(raw.latitude, raw.longitude, np.zeros_like(raw.latitude))
+        assert abs(enu.east[-1]) > 4000
+        np.testing.assert_allclose(run.x, enu.east - enu.east[0], atol=0.01)
+        np.testing.assert_allclose(run.y, enu.north - enu.north[0], atol=0.01)
+    
+    def test_total_g_property(self, sample_run):
         """total_g should be computed from ax and ay."""
-        run = parse_trackaddict_csv(sample_csv_file)
+        run = sample_run
         
         total_g = run.total_g
         
         # Should be sqrt(ax^2 + ay^2)
         expected = np.sqrt(run.ax_body**2 + run.ay_body**2)
         np.testing.assert_allclose(total_g, expected, equal_nan=True)
+
+    def test_total_g_seeded_at_parse(self, sample_csv_file):
+        """Parsing should hand over total_g, so accessing it computes nothing."""
+        run = parse_trackaddict_csv(sample_csv_file)
+        
+        seeded = run._total_g
+        
+        assert seeded is not None
+        assert run.total_g is seeded
+        assert run.total_g is run.total_g
     
-    def test_time_range(self, sample_csv_file):
+    def test_metadata_dict_is_memoized(self, sample_run):
+        """metadata_dict should be built once and match the run's metadata."""
+        run = sample_run
+        
+        meta = run.metadata_dict()
+        
+        assert run.metadata_dict() is meta
+        assert meta["id"] == run.metadata.id
+        assert meta["sample_count"] == len(run.timestamps)
+        assert meta["bounding_box"] == run.get_bounding_box()
+        assert meta["time_range"] == run.get_time_range()
+    
+    def test_time_range(self, sample_run):
         """get_time_range should return correct bounds."""
-        run = parse_trackaddict_csv(sample_csv_file)
+        run = sample_run
         
         start, end = run.get_time_range()
         
@@ -17,6 +17,7 @@ import type {
   ViewportState,
   MapOverlaySettings,
   MarkerMode,
+  PlaybackData,
   TrackMarker,
   SectorMarker,
 } from '@/types';
@@ -313,12 +314,12 @@ export const App: React.FC = () => {
     }[] = [];
 
     visibleRunData.forEach((run, idx) => {
-      const samples = run.playback?.samples || [];
-      if (!samples.length) return;
+      const playback = run.playback;
+      if (!playback || !playback.time.length) return;
       const times: number[] = [];
       markers.forEach((m, idxMarker) => {
         const prev = idxMarker === 0 ? null : markers[idxMarker - 1];
-        const tCross = getCrossingTime(samples, m, prev);
+        const tCross = getCrossingTime(playback, m, prev);
         times.push(tCross ?? NaN);
       });
 
@@ -350,8 +351,14 @@ export const App: React.FC = () => {
   }, [sectorResults]);
 
 // Utility: precise gate crossing using line intersection
-function getCrossingTime(samples: any[], marker: TrackMarker, prev: TrackMarker | null): number | null {
-  if (!samples.length) return null;
+function getCrossingTime(
+  playback: PlaybackData,
+  marker: TrackMarker,
+  prev: TrackMarker | null
+): number | null {
+  const { time, x, y } = playback;
+  const n = time.length;
+  if (!n) return null;
   const gateLen = 6.096; // 20 ft
   const angle = ((marker.angleDeg ?? 0) * Math.PI) / 180;
   const dx = Math.cos(angle) * (gateLen / 2);
@@ -359,35 +366,31 @@ function getCrossingTime(samples: any[], marker: TrackMarker, prev: TrackMarker
   const g1 = { x: marker.x - dx, y: marker.y - dy };
   const g2 = { x: marker.x + dx, y: marker.y + dy };
 
-  for (let i = 0; i < samples.length - 1; i++) {
-    const s0 = samples[i];
-    const s1 = samples[i + 1];
-    if (!Number.isFinite(s0.x) || !Number.isFinite(s0.y) || !Number.isFinite(s1.x) || !Number.isFinite(s1.y)) {
+  for (let i = 0; i < n - 1; i++) {
+    const x0 = x[i];
+    const y0 = y[i];
+    const x1 = x[i + 1];
+    const y1 = y[i + 1];
+    if (!Number.isFinite(x0) || !Number.isFinite(y0) || !Number.isFinite(x1) || !Number.isFinite(y1)) {
       continue;
     }
-    const inter = segmentIntersection(
-      { x: s0.x, y: s0.y },
-      { x: s1.x, y: s1.y },
-      g1,
-      g2
-    );
+    const inter = segmentIntersection({ x: x0, y: y0 }, { x: x1, y: y1 }, g1, g2);
     if (inter) {
-      const segDx = s1.x - s0.x;
-      const segDy = s1.y - s0.y;
+      const segDx = x1 - x0;
+      const segDy = y1 - y0;
       const len2 = segDx * segDx + segDy * segDy || 1;
-      const t = ((inter.x - s0.x) * segDx + (inter.y - s0.y) * segDy) / len2;
-      const time = s0.time + t * (s1.time - s0.time);
-      return time;
+      const t = ((inter.x - x0) * segDx + (inter.y - y0) * segDy) / len2;
+      return time[i] + t * (time[i + 1] - time[i]);
     }
   }
   // fallback: closest point
   let best = Number.POSITIVE_INFINITY;
   let bestTime = null;
-  for (const s of samples) {
-    const dist2 = pointSegDist2({ x: s.x, y: s.y }, g1, g2);
+  for (let i = 0; i < n; i++) {
+    const dist2 = pointSegDist2({ x: x[i], y: y[i] }, g1, g2);
     if (dist2 < best) {
       best = dist2;
-      bestTime = s.time;
+      bestTime = time[i];
     }
   }
   return bestTime;
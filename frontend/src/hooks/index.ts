@@ -170,8 +170,9 @@ export function usePlayback(
   // Get sample at specific time with interpolation
   const getSampleAtTime = useCallback(
     (playback: PlaybackData, time: number): PlaybackSample => {
-      const samples = playback.samples;
-      if (samples.length === 0) {
+      const times = playback.time;
+      const n = times.length;
+      if (n === 0) {
         return {
           time,
           x: 0,
@@ -186,20 +187,23 @@ export function usePlayback(
         };
       }
 
-      // Find bracketing samples
-      let i0 = 0;
-      let i1 = samples.length - 1;
-
-      for (let i = 0; i < samples.length - 1; i++) {
-        if (samples[i].time <= time && samples[i + 1].time >= time) {
-          i0 = i;
-          i1 = i + 1;
-          break;
+      // Find bracketing samples: binary search for the last sample at or
+      // before `time`, keeping i0 one short of the end so i1 exists
+      let lo = 0;
+      let hi = n - 1;
+      while (lo < hi) {
+        const mid = (lo + hi + 1) >> 1;
+        if (times[mid] <= time) {
+          lo = mid;
+        } else {
+          hi = mid - 1;
         }
       }
+      const i0 = Math.max(Math.min(lo, n - 2), 0);
+      const i1 = Math.min(i0 + 1, n - 1);
 
-      const s0 = samples[i0];
-      const s1 = samples[i1];
+      const s0 = api.playbackSampleAt(playback, i0);
+      const s1 = api.playbackSampleAt(playback, i1);
 
       // Clamp to bounds
       if (time <= s0.time) return s0;
@@ -6,9 +6,15 @@ import type {
   RunSummary,
   RunMetadata,
   RunData,
+  PlaybackColumns,
+  PlaybackColumnsB64,
+  PlaybackColumnsQ16,
   PlaybackData,
+  PlaybackSample,
+  QuantizedChannel,
   FolderInfo,
 } from '@/types';
+import { PLAYBACK_CHANNELS } from '@/types';
 
 // Base URL - in development, Vite proxies /api to localhost:8000
 const API_BASE = '/api';
@@ -113,7 +119,7 @@ export async function getPlaybackData(
     targetRate?: number;
   }
 ): Promise<PlaybackData> {
-  const params = new URLSearchParams();
+  const params = new URLSearchParams({ encoding: 'q.i16' });
   
   if (options?.startTime !== undefined) {
     params.set('start_time', options.startTime.toString());
@@ -128,7 +134,80 @@ export async function getPlaybackData(
   const query = params.toString();
   const endpoint = `/runs/${runId}/playback${query ? `?${query}` : ''}`;
   
-  return apiFetch<PlaybackData>(endpoint);
+  const encoded = await apiFetch<PlaybackColumnsB64 | PlaybackColumnsQ16>(endpoint);
+  return decodePlaybackColumns(encoded);
+}
+
+function decodeBase64(data: string): ArrayBuffer {
+  const binary = atob(data);
+  const bytes = new Uint8Array(binary.length);
+  for (let i = 0; i < binary.length; i++) {
+    bytes[i] = binary.charCodeAt(i);
+  }
+  return bytes.buffer;
+}
+
+/** Unpack LSB-first validity bits into booleans. */
+function decodeBits(data: string, length: number): boolean[] {
+  const bytes = new Uint8Array(decodeBase64(data));
+  const out: boolean[] = new Array(length);
+  for (let i = 0; i < length; i++) {
+    out[i] = (bytes[i >> 3] & (1 << (i & 7))) !== 0;
+  }
+  return out;
+}
+
+/** Dequantize an int16 channel; missing codes decode to 0.0 like JSON columns. */
+function decodeQuantized(channel: QuantizedChannel): Float32Array {
+  const codes = new Int16Array(decodeBase64(channel.data));
+  const out = new Float32Array(codes.length);
+  for (let i = 0; i < codes.length; i++) {
+    out[i] = codes[i] === -32768 ? 0 : codes[i] * channel.scale + channel.offset;
+  }
+  return out;
+}
+
+/** Decode binary or quantized playback columns into typed arrays. */
+export function decodePlaybackColumns(
+  encoded: PlaybackColumnsB64 | PlaybackColumnsQ16
+): PlaybackColumns {
+  const decoded = {
+    run_id: encoded.run_id,
+    duration_s: encoded.duration_s,
+    sample_rate_hz: encoded.sample_rate_hz,
+    format: 'columns',
+    time: new Float64Array(decodeBase64(encoded.time)),
+    valid: {},
+  } as PlaybackColumns;
+  
+  for (const key of PLAYBACK_CHANNELS) {
+    decoded[key] =
+      encoded.encoding === 'q.i16'
+        ? decodeQuantized(encoded[key])
+        : new Float32Array(decodeBase64(encoded[key]));
+    decoded.valid[key] = decodeBits(encoded.valid[key], encoded.length);
+  }
+  return decoded;
+}
+
+/** Read sample `i` of columnar playback as a single sample object. */
+export function playbackSampleAt(playback: PlaybackData, i: number): PlaybackSample {
+  const valid: Record<string, boolean> = {};
+  for (const key of PLAYBACK_CHANNELS) {
+    valid[key] = playback.valid[key][i];
+  }
+  return {
+    time: playback.time[i],
+    x: playback.x[i],
+    y: playback.y[i],
+    speed: playback.speed[i],
+    heading: playback.heading[i],
+    ax: playback.ax[i],
+    ay: playback.ay[i],
+    yaw_rate: playback.yaw_rate[i],
+    total_g: playback.total_g[i],
+    valid,
+  };
 }
 
 // ============================================================================
@@ -80,13 +80,69 @@ export interface PlaybackSample {
   valid: Record<string, boolean>;
 }
 
-export interface PlaybackData {
+export const PLAYBACK_CHANNELS = [
+  'x',
+  'y',
+  'speed',
+  'heading',
+  'ax',
+  'ay',
+  'yaw_rate',
+  'total_g',
+] as const;
+
+export type PlaybackChannel = (typeof PLAYBACK_CHANNELS)[number];
+
+/** Columnar playback: one parallel array per channel. */
+export interface PlaybackColumns extends Record<PlaybackChannel, ArrayLike<number>> {
   run_id: string;
   duration_s: number;
   sample_rate_hz: number;
-  samples: PlaybackSample[];
+  format: 'columns';
+  time: ArrayLike<number>;
+  valid: Record<PlaybackChannel, ArrayLike<boolean>>;
 }
 
+/**
+ * Wire format of /runs/{id}/playback?encoding=b64.f32le: base64
+ * little-endian float32 channels, float64 time, LSB-first validity bits.
+ */
+export interface PlaybackColumnsB64 extends Record<PlaybackChannel, string> {
+  run_id: string;
+  duration_s: number;
+  sample_rate_hz: number;
+  format: 'columns';
+  encoding: 'b64.f32le';
+  length: number;
+  time: string;
+  valid: Record<PlaybackChannel, string>;
+}
+
+/** int16-quantized channel: value = data * scale + offset, -32768 = missing. */
+export interface QuantizedChannel {
+  scale: number;
+  offset: number;
+  data: string;
+}
+
+/** Wire format of /runs/{id}/playback?encoding=q.i16. */
+export interface PlaybackColumnsQ16 extends Record<PlaybackChannel, QuantizedChannel> {
+  run_id: string;
+  duration_s: number;
+  sample_rate_hz: number;
+  format: 'columns';
+  encoding: 'q.i16';
+  length: number;
+  time: string;
+  valid: Record<PlaybackChannel, string>;
+}
+
+/**
+ * Decoded playback, kept columnar: consumers index the parallel arrays
+ * (see playbackSampleAt) instead of holding one object per sample.
+ */
+export type PlaybackData = PlaybackColumns;
+
 // ============================================================================
 // UI State Types
 // ============================================================================